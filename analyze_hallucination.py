@@ -5,9 +5,12 @@
 목표: v4의 할루시네이션 문제를 발견하고 제거하여 점수 향상
 """
 
+import numpy as np
 import pandas as pd
-import re
-from collections import Counter
+
+from dialogue_store import DialogueStore
+from grounding import GroundingIndex
+from hallucination_scanner import HallucinationScanner
 
 print("\n" + "="*80)
 print("🔍 할루시네이션 감지 및 분석")
@@ -16,90 +19,34 @@ print("="*80)
 # 파일 로드
 v4 = pd.read_csv('./prediction/submit_solar_v4.csv')
 v3_micro = pd.read_csv('./prediction/submit_solar_v3_microtuned.csv')
-dev_df = pd.read_csv('./data/dev.csv')
+store = DialogueStore()
+dev_df = store.frame('dev')
 
 print(f"\n📂 파일 로드 완료")
 
-def detect_hallucinations(summary: str, dialogue: str = None) -> dict:
-    """
-    할루시네이션 패턴 감지
-    
-    1. 과도한 세부사항 (숫자, 날짜, 구체적 정보)
-    2. 불확실한 추측성 표현
-    3. 원문에 없는 인과관계
-    4. 과도한 감정/의견 표현
-    """
-    
-    issues = {
-        'excessive_details': [],
-        'speculation': [],
-        'unsupported_claims': [],
-        'quality_score': 0
-    }
-    
-    # 1) 과도한 숫자/날짜 (원문 없이 구체적인 정보)
-    numbers = re.findall(r'\d+', summary)
-    if len(numbers) > 5:
-        issues['excessive_details'].append(f'과도한 숫자: {len(numbers)}개')
-    
-    # 2) 추측성 표현
-    speculation_patterns = [
-        r'것으로\s*보입니다',
-        r'것으로\s*생각됩니다',
-        r'것으로\s*추정됩니다',
-        r'인\s*것\s*같습니다',
-        r'듯\s*합니다',
-        r'아마도',
-        r'추측',
-    ]
-    
-    for pattern in speculation_patterns:
-        if re.search(pattern, summary):
-            issues['speculation'].append(pattern)
-    
-    # 3) 과도하게 긴 문장 (30단어 이상 = 할루시네이션 가능성)
-    sentences = re.split(r'[.!?]', summary)
-    long_sentences = [s for s in sentences if len(s.split()) > 30]
-    if long_sentences:
-        issues['excessive_details'].append(f'과도하게 긴 문장: {len(long_sentences)}개')
-    
-    # 4) 과도한 접속사 (불필요한 정보 연결)
-    conjunctions = ['그리고', '또한', '하지만', '그러나', '따라서', '그래서']
-    conj_count = sum(summary.count(c) for c in conjunctions)
-    if conj_count > 3:
-        issues['unsupported_claims'].append(f'과도한 접속사: {conj_count}개')
-    
-    # 5) 품질 점수 계산 (0~100)
-    quality_score = 100
-    quality_score -= len(issues['excessive_details']) * 10
-    quality_score -= len(issues['speculation']) * 15
-    quality_score -= len(issues['unsupported_claims']) * 10
-    issues['quality_score'] = max(0, quality_score)
-    
-    return issues
+# 할루시네이션 패턴 (hallucination_scanner.py: 정규식 1회 스캔으로 모든 특징 계산)
+# 1. 과도한 세부사항 (숫자 5개 초과, 30단어 초과 문장)
+# 2. 불확실한 추측성 표현
+# 3. 원문에 없는 인과관계 (접속사 3개 초과)
+# 품질 점수 = 100 - 세부사항 10 - 추측 15 - 주장 10
+scanner = HallucinationScanner()
 
 # v4와 v3 비교 분석
 print(f"\n📊 할루시네이션 분석 중...\n")
 
-v4_issues = []
-v3_issues = []
+features = scanner.scan_versions({'v4': v4['summary'], 'v3': v3_micro['summary'].iloc[:len(v4)]})
+v4_counts, v3_counts = scanner.issue_counts(features['v4']), scanner.issue_counts(features['v3'])
+v4_quality, v3_quality = scanner.quality_scores(features['v4']), scanner.quality_scores(features['v3'])
 
-for idx in range(len(v4)):
-    v4_issue = detect_hallucinations(v4.iloc[idx]['summary'])
-    v3_issue = detect_hallucinations(v3_micro.iloc[idx]['summary'])
-    
-    v4_issues.append(v4_issue)
-    v3_issues.append(v3_issue)
+# 통계 계산 (issue_counts 열: 과도한 세부사항, 추측 표현, 근거 없는 주장)
+v4_avg_quality = v4_quality.mean()
+v3_avg_quality = v3_quality.mean()
 
-# 통계 계산
-v4_avg_quality = sum(i['quality_score'] for i in v4_issues) / len(v4_issues)
-v3_avg_quality = sum(i['quality_score'] for i in v3_issues) / len(v3_issues)
+v4_with_speculation = int((v4_counts[:, 1] > 0).sum())
+v3_with_speculation = int((v3_counts[:, 1] > 0).sum())
 
-v4_with_speculation = sum(1 for i in v4_issues if i['speculation'])
-v3_with_speculation = sum(1 for i in v3_issues if i['speculation'])
-
-v4_excessive = sum(1 for i in v4_issues if i['excessive_details'])
-v3_excessive = sum(1 for i in v3_issues if i['excessive_details'])
+v4_excessive = int((v4_counts[:, 0] > 0).sum())
+v3_excessive = int((v3_counts[:, 0] > 0).sum())
 
 print(f"{'='*80}")
 print(f"📈 할루시네이션 분석 결과")
@@ -118,14 +65,26 @@ print(f"\n과도한 세부사항:")
 print(f"  v4: {v4_excessive}개 케이스 ({100*v4_excessive/len(v4):.1f}%)")
 print(f"  v3: {v3_excessive}개 케이스 ({100*v3_excessive/len(v3_micro):.1f}%)")
 
+# 원본 대화 근거 검사 (fname으로 dialogue 조인 → 대화에 없는 숫자/자리표시자/어간 문장)
+v4_grounding = GroundingIndex(store.lookup(v4['fname'], 'dialogue')).check_many(v4['summary'])
+v3_grounding = GroundingIndex(store.lookup(v3_micro['fname'], 'dialogue')).check_many(v3_micro['summary'])
+
+print(f"\n대화 근거 없는 문장 포함:")
+for name, report, df in [('v4', v4_grounding, v4), ('v3', v3_grounding, v3_micro)]:
+    ungrounded = int((report['unsupported_sentences'] > 0).sum())
+    print(f"  {name}: {ungrounded}개 케이스 ({100*ungrounded/len(df):.1f}%), "
+          f"근거 없는 숫자 {int(report['unsupported_numbers'].sum())}개, "
+          f"평균 어간 근거 비율 {report['coverage'].mean():.2f}")
+
 # 할루시네이션 의심 샘플 찾기
 print(f"\n{'='*80}")
 print(f"🚨 할루시네이션 의심 케이스 (상위 5개)")
 print(f"{'='*80}\n")
 
-v4_suspicious = sorted(enumerate(v4_issues), key=lambda x: x[1]['quality_score'])[:5]
+v4_suspicious = np.argsort(v4_quality, kind='stable')[:5]
 
-for idx, (original_idx, issue) in enumerate(v4_suspicious, 1):
+for idx, original_idx in enumerate(v4_suspicious, 1):
+    issue = scanner.issues(features['v4'][original_idx])
     summary = v4.iloc[original_idx]['summary']
     fname = v4.iloc[original_idx]['fname']
     
@@ -138,6 +97,8 @@ for idx, (original_idx, issue) in enumerate(v4_suspicious, 1):
         print(f"  ⚠️ 과도한 세부사항: {', '.join(issue['excessive_details'][:2])}")
     if issue['unsupported_claims']:
         print(f"  ⚠️ 근거 없는 주장: {', '.join(issue['unsupported_claims'][:2])}")
+    if v4_grounding.at[original_idx, 'unsupported_sentences']:
+        print(f"  ⚠️ 대화 근거 없는 문장: {v4_grounding.at[original_idx, 'unsupported_sentences']}개")
     print()
 
 print(f"{'='*80}")
@@ -7,20 +7,28 @@ v4가 v3보다 낮은 품질인 이유를 다각도로 분석
 
 import pandas as pd
 import numpy as np
-from evaluate import load
-import re
-from collections import Counter
+
+from dialogue_store import DialogueStore
+from fast_rouge import FastRouge
+from feature_store import FeatureStore
 
 print("\n" + "="*100)
 print("📊 v4 품질 저하 원인 종합 분석")
 print("="*100)
 
 # 데이터 로드
-v4 = pd.read_csv('./prediction/submit_solar_v4.csv')
-v3_micro = pd.read_csv('./prediction/submit_solar_v3_microtuned.csv')
-v3_orig = pd.read_csv('./prediction/submit_solar_v3.csv')
-dev_df = pd.read_csv('./data/dev.csv')
-test_df = pd.read_csv('./data/test.csv')
+paths = {
+    'v4_original': './prediction/submit_solar_v4.csv',
+    'v3_microtuned': './prediction/submit_solar_v3_microtuned.csv',
+    'v3_original': './prediction/submit_solar_v3.csv',
+    'dev': './data/dev.csv',
+}
+v4 = pd.read_csv(paths['v4_original'])
+v3_micro = pd.read_csv(paths['v3_microtuned'])
+v3_orig = pd.read_csv(paths['v3_original'])
+store = DialogueStore()
+dev_df = store.frame('dev')
+test_df = store.frame('test')
 
 print(f"\n📂 데이터 로드 완료")
 
@@ -31,7 +39,8 @@ print(f"\n" + "="*100)
 print(f"1. ROUGE 점수 비교 분석")
 print(f"="*100)
 
-rouge = load("rouge")
+# dev 참조 요약은 한 번만 토큰화
+rouge = FastRouge(dev_df['summary'])
 
 versions = {
     'v3_original': v3_orig['summary'].tolist(),
@@ -41,17 +50,18 @@ versions = {
 
 print(f"\n⏳ ROUGE 평가 중...\n")
 
+# 전체 버전을 한 번에 채점 (코퍼스 평균 + 샘플별 행렬, 5절에서 재사용)
+corpus_scores, sample_matrix = rouge.score_versions(versions)
+
 results = {}
-for name, summaries in versions.items():
-    print(f"  평가 중: {name:20s}", end='', flush=True)
-    scores = rouge.compute(predictions=summaries, references=dev_df['summary'].tolist())
+for name, scores in corpus_scores.items():
     results[name] = {
         'rouge1': scores['rouge1'] * 100,
         'rouge2': scores['rouge2'] * 100,
         'rougeL': scores['rougeL'] * 100,
         'combined': (scores['rouge1'] + scores['rouge2'] + scores['rougeL']) / 3 * 100
     }
-    print(" ✅")
+    print(f"  평가 완료: {name:20s} ✅")
 
 print(f"\n{'='*100}")
 print(f"ROUGE 점수 상세 비교")
@@ -94,9 +104,14 @@ print(f"\n" + "="*100)
 print(f"2. 텍스트 길이 및 구조 분석")
 print(f"="*100)
 
-v3_lengths = v3_micro['summary'].apply(lambda x: len(str(x).split()))
-v4_lengths = v4['summary'].apply(lambda x: len(str(x).split()))
-dev_lengths = dev_df['summary'].apply(lambda x: len(str(x).split()))
+# 샘플별 특징은 (파일, 내용 해시) 단위로 한 번만 계산 → 이후 실행은 Parquet 캐시에서 로드
+features = FeatureStore()
+feature_table = features.compare(paths)
+by_version = {name: group.reset_index(drop=True) for name, group in feature_table.groupby('version', observed=True)}
+
+v3_lengths = by_version['v3_microtuned']['words']
+v4_lengths = by_version['v4_original']['words']
+dev_lengths = by_version['dev']['words']
 
 print(f"\n📏 길이 통계:\n")
 print(f"  {'Version':<20s} {'평균':>8s} {'중앙값':>8s} {'표준편차':>8s} {'최소':>8s} {'최대':>8s}")
@@ -111,8 +126,8 @@ print(f"  Dev 정답과의 차이: v3는 {v3_lengths.mean() - dev_lengths.mean()
 print(f"  → v4는 불필요한 정보를 더 많이 포함")
 
 # 문장 수 분석
-v3_sentences = v3_micro['summary'].apply(lambda x: len(re.split(r'[.!?]', str(x).strip())))
-v4_sentences = v4['summary'].apply(lambda x: len(re.split(r'[.!?]', str(x).strip())))
+v3_sentences = by_version['v3_microtuned']['sentences']
+v4_sentences = by_version['v4_original']['sentences']
 
 print(f"\n📝 문장 수 통계:\n")
 print(f"  v3_microtuned: 평균 {v3_sentences.mean():.1f}개 문장")
@@ -126,30 +141,13 @@ print(f"\n" + "="*100)
 print(f"3. 어휘 다양성 및 반복 패턴 분석")
 print(f"="*100)
 
-def calculate_lexical_diversity(summaries):
-    """어휘 다양성 계산 (unique words / total words)"""
-    all_words = []
-    for summary in summaries:
-        words = str(summary).split()
-        all_words.extend(words)
-    
-    return len(set(all_words)) / len(all_words) if all_words else 0
-
-def count_repetitions(summaries):
-    """반복되는 바이그램 수 계산"""
-    repetitions = 0
-    for summary in summaries:
-        words = str(summary).split()
-        bigrams = [' '.join(words[i:i+2]) for i in range(len(words)-1)]
-        bigram_counts = Counter(bigrams)
-        repetitions += sum(1 for count in bigram_counts.values() if count > 1)
-    return repetitions
-
-v3_diversity = calculate_lexical_diversity(v3_micro['summary'])
-v4_diversity = calculate_lexical_diversity(v4['summary'])
+# 어휘 다양성 (unique words / total words): 파일 단위 집계
+# 반복 바이그램: 요약 안에서 2번 이상 나온 바이그램 수의 합
+v3_diversity = features.corpus_stats(paths['v3_microtuned'])['lexical_diversity']
+v4_diversity = features.corpus_stats(paths['v4_original'])['lexical_diversity']
 
-v3_reps = count_repetitions(v3_micro['summary'])
-v4_reps = count_repetitions(v4['summary'])
+v3_reps = int(by_version['v3_microtuned']['repeated_bigrams'].sum())
+v4_reps = int(by_version['v4_original']['repeated_bigrams'].sum())
 
 print(f"\n📚 어휘 다양성 (높을수록 좋음):")
 print(f"  v3_microtuned: {v3_diversity:.4f}")
@@ -200,21 +198,19 @@ v4_dev = v4.head(len(dev_df))
 
 print(f"\n🔍 품질 차이가 큰 상위 5개 샘플:\n")
 
-sample_scores = []
-for idx in range(min(len(dev_df), len(v3_dev), len(v4_dev))):
-    dev_summary = dev_df.iloc[idx]['summary']
-    v3_summary = v3_dev.iloc[idx]['summary']
-    v4_summary = v4_dev.iloc[idx]['summary']
-    
-    # 각 샘플의 ROUGE-2 계산
-    v3_score = rouge.compute(predictions=[v3_summary], references=[dev_summary])['rouge2']
-    v4_score = rouge.compute(predictions=[v4_summary], references=[dev_summary])['rouge2']
-    
-    diff = v3_score - v4_score
-    sample_scores.append((idx, diff, v3_score, v4_score, dev_summary, v3_summary, v4_summary))
+# 각 샘플의 ROUGE-2 (1절의 샘플별 행렬에서 조회)
+version_names = list(versions)
+n_samples = min(len(dev_df), len(v3_dev), len(v4_dev))
+v3_sample_r2 = sample_matrix[version_names.index('v3_microtuned'), :n_samples, 1]
+v4_sample_r2 = sample_matrix[version_names.index('v4_original'), :n_samples, 1]
+sample_diff = v3_sample_r2 - v4_sample_r2
 
 # 차이가 큰 순으로 정렬
-sample_scores_sorted = sorted(sample_scores, key=lambda x: x[1], reverse=True)[:5]
+sample_scores_sorted = [
+    (idx, sample_diff[idx], v3_sample_r2[idx], v4_sample_r2[idx],
+     dev_df.iloc[idx]['summary'], v3_dev.iloc[idx]['summary'], v4_dev.iloc[idx]['summary'])
+    for idx in np.argsort(-sample_diff, kind='stable')[:5]
+]
 
 for rank, (idx, diff, v3_score, v4_score, dev_sum, v3_sum, v4_sum) in enumerate(sample_scores_sorted, 1):
     print(f"[{rank}] 샘플 {idx} (v3가 {diff*100:.1f}%p 더 높음)")
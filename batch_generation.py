@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+SOLAR 배치 추론 엔진
+=====================
+프롬프트 1개씩 model.generate()를 호출하던 run_inference / generate_summary 대체
+
+- 왼쪽 패딩으로 배치 생성 (decoder-only 모델은 프롬프트 끝이 정렬돼야 함)
+  → 토크나이저의 padding_side는 건드리지 않고 엔진이 직접 패딩 (학습 셀의 right 패딩 유지)
+- 프롬프트 길이순 정렬 후 토큰 예산(max_batch_tokens) 안에서 배치 구성 → 패딩 낭비 최소화
+- 결과는 입력 순서로 복원
+- PeftModel로 감싼 SOLAR, CPU 테스트용 소형 causal LM 모두 지원
+- 요약 추출은 기존 노트북과 동일: 전체 시퀀스 디코딩 후 "### Assistant:\\n" 뒤를 사용
+- KV 캐시 재사용 (reuse_cache=True)
+  · 템플릿 공통 접두부("### User:\\n...")의 past_key_values를 (생성기, 접두부 토큰)당 1회만 계산
+    → 배치는 [접두부 | 패딩 | 대화 부분] 배치로 구성 (패딩은 attention_mask로 가림, position은 마스크 누적합)
+  · summarize_many: 배치마다 프롬프트 prefill을 1회만 하고 디코딩 설정(num_beams, 패널티 등)별로 복사해 재사용
+- 생성 결과 디스크 캐시 (cache=GenerationCache(...), generation_cache.py)
+  · 캐시에 있는 (프롬프트, 설정)은 생성하지 않고, 없는 행만 모아 배치 생성 후 배치마다 저장
+- 스트리밍 (iter_generate_many / iter_summarize): 배치가 끝날 때마다 결과 반환 → 제출 파일에 바로 기록
+
+사용:
+    generator = BatchGenerator(model, tokenizer, max_batch_tokens=16384)
+    summaries = generator.summarize(test_df['dialogue'], PROMPTS['basic'], max_new_tokens=150, num_beams=3)
+
+    # 같은 대화를 여러 디코딩 설정으로 (prefill 1회, 디코딩만 반복)
+    per_config = generator.summarize_many(eval_df['dialogue'], PROMPTS['basic'], [params_a, params_b])
+"""
+
+import copy
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import torch
+
+from generation_cache import GenerationCache, is_cacheable, model_fingerprint, request_key
+
+ASSISTANT_MARKER = "### Assistant:\n"
+
+
+def template_prefix(prompt_template: str) -> str:
+    """프롬프트 템플릿에서 {dialogue} 앞의 고정 접두부"""
+    return prompt_template.split('{dialogue}', 1)[0]
+
+
+def _expand_size(params: Dict) -> int:
+    """generate()가 입력 행을 복제하는 배수 (빔 서치: num_beams, 샘플링: num_return_sequences)"""
+    if params.get('num_beams', 1) > 1:
+        return params['num_beams']
+    return params.get('num_return_sequences', 1)
+
+
+def extract_summary(generated_text: str) -> str:
+    """디코딩 결과에서 어시스턴트 응답만 추출 (없으면 전체 텍스트)"""
+    parts = generated_text.split(ASSISTANT_MARKER)
+    if len(parts) > 1:
+        return parts[1].strip()
+    return generated_text
+
+
+class BatchGenerator:
+    """
+    길이 버킷 + 왼쪽 패딩 배치 생성기
+
+    Args:
+        model: AutoModelForCausalLM 또는 PeftModel
+        tokenizer: 대응 토크나이저 (패딩 토큰은 pad_token_id 참고)
+        max_batch_tokens: 배치당 토큰 예산 = 행 수 × (최장 프롬프트 + max_new_tokens) × num_beams
+        max_batch_size: 배치당 최대 프롬프트 수
+        progress: tqdm 진행 표시
+        reuse_cache: 접두부 KV 캐시 + 설정 간 prefill 재사용 (False면 배치마다 generate()만 호출)
+        cache: 생성 결과 디스크 캐시 (None이면 항상 새로 생성)
+    """
+
+    def __init__(self, model, tokenizer, max_batch_tokens: int = 16384, max_batch_size: int = 32,
+                 progress: bool = True, reuse_cache: bool = True, cache: Optional[GenerationCache] = None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.progress = progress
+        self.reuse_cache = reuse_cache
+        self.cache = cache
+        self._prefix_caches: Dict[Tuple[int, ...], object] = {}
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def pad_token_id(self) -> int:
+        """
+        배치 패딩 토큰: eos가 아닌 특수 토큰 우선 (unk → pad → eos)
+
+        repetition_penalty는 input_ids 속 패딩도 이미 나온 토큰으로 취급하므로
+        eos로 패딩하면 짧은 프롬프트 행만 eos가 깎여 batch=1보다 요약이 길어짐
+        """
+        eos_token_id = self.tokenizer.eos_token_id
+        for token_id in (self.tokenizer.unk_token_id, self.tokenizer.pad_token_id):
+            if token_id is not None and token_id != eos_token_id:
+                return token_id
+        return eos_token_id
+
+    @property
+    def device(self) -> torch.device:
+        device = getattr(self.model, 'device', None)
+        if device is None:
+            device = next(self.model.parameters()).device
+        return device
+
+    @property
+    def fingerprint(self) -> str:
+        """생성 캐시 키용 모델 지문 (LoRA 가중치 체크섬 포함, 생성기당 1회 계산)"""
+        if self._fingerprint is None:
+            self._fingerprint = model_fingerprint(self.model, self.tokenizer)
+        return self._fingerprint
+
+    def clear_cache(self):
+        """접두부 KV 캐시와 모델 지문 비우기 (모델 가중치/어댑터를 바꾼 뒤 호출)"""
+        self._prefix_caches.clear()
+        self._fingerprint = None
+
+    def _batches(self, lengths: List[int], param_list: Sequence[Dict]) -> List[List[int]]:
+        """긴 프롬프트부터 정렬해 토큰 예산 안에서 묶은 인덱스 배치들 (설정 중 최악 기준)"""
+        new_tokens = max(params.get('max_new_tokens', 128) for params in param_list)
+        beams = max(_expand_size(params) for params in param_list)
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+
+        batches, current, longest = [], [], 0
+        for i in order:
+            width = max(longest, lengths[i]) + new_tokens
+            if current and (len(current) >= self.max_batch_size
+                            or (len(current) + 1) * width * beams > self.max_batch_tokens):
+                batches.append(current)
+                current, longest = [], 0
+            current.append(i)
+            longest = max(longest, lengths[i])
+        if current:
+            batches.append(current)
+        return batches
+
+    def _pad(self, sequences: List[List[int]], prefix_len: int = 0):
+        """
+        [접두부 | 패딩 | 나머지] 배치 (prefix_len=0이면 일반 왼쪽 패딩)
+
+        접두부가 모든 행의 같은 위치에 있어야 접두부 KV 캐시를 그대로 붙일 수 있음
+        """
+        width = max(len(s) for s in sequences)
+        input_ids = torch.full((len(sequences), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(sequences), width), dtype=torch.long)
+        for row, ids in enumerate(sequences):
+            start = width - len(ids) + prefix_len
+            input_ids[row, :prefix_len] = torch.tensor(ids[:prefix_len], dtype=torch.long)
+            input_ids[row, start:] = torch.tensor(ids[prefix_len:], dtype=torch.long)
+            attention_mask[row, :prefix_len] = 1
+            attention_mask[row, start:] = 1
+        return input_ids.to(self.device), attention_mask.to(self.device)
+
+    # ------------------------------------------------------------------
+    # KV 캐시
+    # ------------------------------------------------------------------
+
+    def _shared_prefix(self, prefix: Optional[str], encoded: List[List[int]]) -> Tuple[int, ...]:
+        """접두부 텍스트의 토큰 중 모든 프롬프트가 그대로 공유하는 부분 (마지막 토큰은 항상 남김)"""
+        if not prefix or not self.reuse_cache:
+            return ()
+        ids = self.tokenizer(prefix)['input_ids']
+        n = len(ids)
+        for seq in encoded:
+            n = min(n, len(seq) - 1)
+            k = 0
+            while k < n and seq[k] == ids[k]:
+                k += 1
+            n = k
+        return tuple(ids[:n])
+
+    def _forward(self, input_ids, attention_mask, past_key_values=None):
+        """
+        prefill만 수행하고 KV 캐시 반환
+
+        position_ids는 generate()와 같게 attention_mask 누적합으로 계산
+        (중간 패딩이 있어도 실제 토큰 위치는 패딩 없는 프롬프트와 동일)
+        """
+        past = 0 if past_key_values is None else past_key_values.get_seq_length()
+        full_mask = attention_mask[:, :past + input_ids.shape[1]]
+        position_ids = full_mask.cumsum(-1) - 1
+        position_ids = position_ids.masked_fill(full_mask == 0, 1)[:, past:]
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=input_ids,
+                attention_mask=full_mask,
+                position_ids=position_ids,
+                past_key_values=past_key_values,
+                use_cache=True,
+            )
+        return outputs.past_key_values
+
+    def _prefix_cache(self, prefix: Tuple[int, ...]):
+        cache = self._prefix_caches.get(prefix)
+        if cache is None:
+            input_ids = torch.tensor([prefix], dtype=torch.long, device=self.device)
+            cache = self._prefix_caches[prefix] = self._forward(input_ids, torch.ones_like(input_ids))
+        return cache
+
+    def _prefill(self, input_ids, attention_mask, prefix: Tuple[int, ...]):
+        """마지막 토큰 직전까지의 KV 캐시 (접두부는 캐시 복사본에서 시작)"""
+        cache = None
+        if prefix:
+            cache = copy.deepcopy(self._prefix_cache(prefix))
+            cache.batch_repeat_interleave(input_ids.shape[0])
+        start = len(prefix)
+        if input_ids.shape[1] - 1 > start:
+            cache = self._forward(input_ids[:, start:-1], attention_mask, cache)
+        return cache
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+
+    def _generate(self, input_ids, attention_mask, params: Dict, cache=None, rows: Optional[List[int]] = None):
+        """배치(또는 그 중 rows 행만) 생성 → 디코딩 텍스트"""
+        if rows is not None:
+            index = torch.tensor(rows, device=input_ids.device)
+            input_ids, attention_mask = input_ids[index], attention_mask[index]
+        if cache is not None:
+            cache = copy.deepcopy(cache)
+            if rows is not None:
+                cache.batch_select_indices(index)
+            cache.batch_repeat_interleave(_expand_size(params))
+            params = {**params, 'past_key_values': cache}
+        with torch.no_grad():
+            generated = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                **params,
+                pad_token_id=self.pad_token_id,
+                eos_token_id=self.tokenizer.eos_token_id,
+            )
+        return self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+    def iter_generate_many(self, prompts: Sequence[str], param_list: Sequence[Dict],
+                           prefix: Optional[str] = None) -> Iterator[Tuple[int, List[int], List[str]]]:
+        """
+        generate_many의 스트리밍 버전: 캐시 적중분을 먼저, 이후 배치마다 결과 반환
+
+        Yields:
+            (설정 위치, 프롬프트 위치들, 디코딩 결과들)
+        """
+        prompts = list(prompts)
+        param_list = list(param_list)
+        done = [[False] * len(prompts) for _ in param_list]
+
+        # 디스크 캐시 조회 → 남은 (설정, 행)만 생성
+        keys: List[List[Optional[str]]] = [[None] * len(prompts) for _ in param_list]
+        if self.cache is not None:
+            for k, params in enumerate(param_list):
+                if is_cacheable(params):
+                    keys[k] = [request_key(self.fingerprint, prompt, params) for prompt in prompts]
+            found = self.cache.get_many([key for row in keys for key in row if key is not None])
+            for k, row in enumerate(keys):
+                hits = [i for i, key in enumerate(row) if key in found]
+                if hits:
+                    for i in hits:
+                        done[k][i] = True
+                    yield k, hits, [found[row[i]] for i in hits]
+        todo = [i for i in range(len(prompts)) if not all(row[i] for row in done)]
+        if not todo:
+            return
+
+        encoded = self.tokenizer([prompts[i] for i in todo])['input_ids']
+        shared = self._shared_prefix(prefix, encoded)
+        batches = self._batches([len(ids) for ids in encoded], param_list)
+        if self.progress:
+            from tqdm import tqdm
+            batches = tqdm(batches, desc='Batched inference', leave=False)
+
+        for batch in batches:
+            input_ids, attention_mask = self._pad([encoded[j] for j in batch], len(shared))
+            cache = self._prefill(input_ids, attention_mask, shared) if self.reuse_cache else None
+            for k, params in enumerate(param_list):
+                rows = [r for r, j in enumerate(batch) if not done[k][todo[j]]]
+                if not rows:
+                    continue
+                texts = self._generate(input_ids, attention_mask, params, cache,
+                                       None if len(rows) == len(batch) else rows)
+                positions = [todo[batch[r]] for r in rows]
+                if self.cache is not None:
+                    self.cache.put_many({keys[k][i]: text for i, text in zip(positions, texts)
+                                         if keys[k][i] is not None})
+                for i in positions:
+                    done[k][i] = True
+                yield k, positions, texts
+
+    def generate_many(self, prompts: Sequence[str], param_list: Sequence[Dict],
+                      prefix: Optional[str] = None) -> List[List[str]]:
+        """
+        같은 프롬프트들을 여러 디코딩 설정으로 생성
+
+        Args:
+            prompts: 프롬프트 리스트
+            param_list: generate() 파라미터 dict 리스트
+            prefix: 모든 프롬프트가 공유하는 접두부 텍스트 (KV 캐시를 1회만 계산)
+
+        Returns:
+            설정별 디코딩 결과 리스트 (프롬프트 포함 전체 텍스트, 입력 순서)
+        """
+        prompts = list(prompts)
+        outputs: List[List[Optional[str]]] = [[None] * len(prompts) for _ in param_list]
+        for k, positions, texts in self.iter_generate_many(prompts, param_list, prefix):
+            for i, text in zip(positions, texts):
+                outputs[k][i] = text
+        return outputs
+
+    def generate(self, prompts: Sequence[str], prefix: Optional[str] = None, **params) -> List[str]:
+        """프롬프트별 디코딩 결과 (프롬프트 포함 전체 텍스트, 입력 순서)"""
+        return self.generate_many(prompts, [params], prefix)[0]
+
+    def summarize_many(self, dialogues: Sequence[str], prompt_template: str,
+                       param_list: Sequence[Dict]) -> List[List[str]]:
+        """대화 → 프롬프트 → 설정별 배치 생성 → 요약 추출 (prefill은 배치당 1회)"""
+        prompts = [prompt_template.format(dialogue=d) for d in dialogues]
+        outputs = self.generate_many(prompts, param_list, template_prefix(prompt_template))
+        return [[extract_summary(text) for text in texts] for texts in outputs]
+
+    def iter_summarize(self, dialogues: Sequence[str], prompt_template: str,
+                       **params) -> Iterator[Tuple[List[int], List[str]]]:
+        """summarize의 스트리밍 버전: 배치마다 (대화 위치들, 요약들) 반환 (제출 파일 스트리밍 기록용)"""
+        prompts = [prompt_template.format(dialogue=d) for d in dialogues]
+        for _, positions, texts in self.iter_generate_many(prompts, [params], template_prefix(prompt_template)):
+            yield positions, [extract_summary(text) for text in texts]
+
+    def iter_summarize_jobs(self, jobs: Sequence[Tuple[str, Sequence[str], Sequence[Dict]]]):
+        """
+        (프롬프트 템플릿, 대화들, 설정들) 작업을 순서대로 처리해 청크로 반환
+
+        grid_workers.ParallelGenerator와 같은 인터페이스 (작업 번호, 설정 위치, 대화 위치, 설정별 요약)
+        """
+        for job_id, (template, dialogues, param_list) in enumerate(jobs):
+            dialogues, param_list = list(dialogues), list(param_list)
+            summaries = self.summarize_many(dialogues, template, param_list)
+            yield job_id, list(range(len(param_list))), list(range(len(dialogues))), summaries
+
+    def summarize(self, dialogues: Sequence[str], prompt_template: str, **params) -> List[str]:
+        """대화 → 프롬프트 템플릿 적용 → 배치 생성 → 요약 추출"""
+        return self.summarize_many(dialogues, prompt_template, [params])[0]
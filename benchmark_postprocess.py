@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+후처리 규칙 엔진 벤치마크
+============================
+기존 함수 체인 vs config.yaml 후처리 프로파일 (postprocess_rules)
+
+- 출력이 바이트 단위로 동일한지 검증
+- 요약별 호출 / 컬럼 단위 호출 속도 비교
+- 전체 프로파일 순차 적용 vs 공통 접두사 공유 (ProfileSet.apply)
+
+사용법:
+    python benchmark_postprocess.py                       # 합성 데이터 50,000개
+    python benchmark_postprocess.py ./prediction/submit_solar_v4.csv
+"""
+
+import random
+import re
+import sys
+import time
+
+from postprocess_rules import load_profiles
+
+N_SYNTHETIC = 50_000
+
+
+# ============================================================================
+# 기존 구현 (기준) - create_v4_smart_final.py / create_v4_focused_v2.py /
+# remove_hallucination.py / v4_analysis_full.py / 미세조정 노트북의 원래 함수 그대로
+# ============================================================================
+
+def legacy_smart_micro_tune_v4(summary: str, fallback: str) -> str:
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'에게\s+에게', '에게', summary)
+    summary = re.sub(r'에서\s+에서', '에서', summary)
+    summary = re.sub(r'합니다\s+합니다', '합니다', summary)
+    summary = re.sub(r'한다\s+한다', '한다', summary)
+    summary = re.sub(r'하고\s+하고', '하고', summary)
+    summary = re.sub(r'하고\s+있습니다', '합니다', summary)
+    summary = re.sub(r'하고\s+있다', '한다', summary)
+    summary = re.sub(r'하고\s+있으며', '하며', summary)
+    summary = re.sub(r'매우\s+많이', '많이', summary)
+    summary = re.sub(r'정말\s+많이', '많이', summary)
+    summary = re.sub(r'아주\s+많이', '많이', summary)
+    summary = re.sub(r'라고\s+말합니다', '라고 합니다', summary)
+    summary = re.sub(r'이라고\s+말합니다', '이라고 합니다', summary)
+    summary = re.sub(r'\.\s+그리고\s+', '. ', summary)
+    summary = re.sub(r'\.\s+하지만\s+', '. ', summary)
+    sentences = re.split(r'(?<=[.!?])\s+', summary.strip())
+    meaningful_sentences = []
+    for sent in sentences:
+        if len(sent.split()) >= 5:
+            meaningful_sentences.append(sent)
+        elif meaningful_sentences:
+            meaningful_sentences[-1] = meaningful_sentences[-1] + ' ' + sent
+    summary = ' '.join(meaningful_sentences[:3])
+    if summary and not summary[-1] in '.!?다요습니다니다':
+        sentences = re.split(r'(?<=[.!?])\s+', summary)
+        if len(sentences) > 1:
+            summary = ' '.join(sentences[:-1])
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'\s([,.!?])', r'\1', summary)
+    if not summary or len(summary.split()) < 5:
+        orig_sentences = re.split(r'(?<=[.!?])\s+', fallback.strip())
+        summary = orig_sentences[0] if orig_sentences else summary
+    return summary
+
+
+def legacy_focused_micro_tune_v4(summary: str) -> str:
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'(\S+)\s+\1', r'\1', summary)
+    summary = re.sub(r'에게\s+에게', '에게', summary)
+    summary = re.sub(r'에서\s+에서', '에서', summary)
+    summary = re.sub(r'에\s+에\s', '에 ', summary)
+    summary = re.sub(r'합니다\s+합니다', '합니다', summary)
+    summary = re.sub(r'한다\s+한다', '한다', summary)
+    summary = re.sub(r'하고\s+하고', '하고', summary)
+    summary = re.sub(r'입니다\s+입니다', '입니다', summary)
+    summary = re.sub(r'하고\s+있습니다', '합니다', summary)
+    summary = re.sub(r'하고\s+있다', '한다', summary)
+    summary = re.sub(r'하고\s+있으며', '하며', summary)
+    summary = re.sub(r'하고\s+있고', '하고', summary)
+    summary = re.sub(r'매우\s+많이', '많이', summary)
+    summary = re.sub(r'정말\s+많이', '많이', summary)
+    summary = re.sub(r'아주\s+많이', '많이', summary)
+    summary = re.sub(r'너무\s+많이', '많이', summary)
+    summary = re.sub(r'라고\s+말합니다', '라고 합니다', summary)
+    summary = re.sub(r'이라고\s+말합니다', '이라고 합니다', summary)
+    summary = re.sub(r'\.\s+그리고\s+', '. ', summary)
+    summary = re.sub(r'\.\s+또한\s+', '. ', summary)
+    sentences = re.split(r'(?<=[.!?])\s+', summary.strip())
+    processed_sentences = []
+    for sent in sentences:
+        words = sent.split()
+        if len(words) > 30:
+            if ' 그리고 ' in sent:
+                parts = sent.split(' 그리고 ', 1)
+                processed_sentences.extend(parts)
+            elif ' 하지만 ' in sent:
+                parts = sent.split(' 하지만 ', 1)
+                processed_sentences.extend(parts)
+            elif ', ' in sent and len(words) > 35:
+                comma_idx = sent.rfind(',', 0, len(sent)//2)
+                if comma_idx > 0:
+                    processed_sentences.append(sent[:comma_idx+1])
+                    processed_sentences.append(sent[comma_idx+1:].strip())
+                else:
+                    processed_sentences.append(sent)
+            else:
+                processed_sentences.append(sent)
+        else:
+            processed_sentences.append(sent)
+    summary = ' '.join(processed_sentences)
+    if summary and len(summary) > 10:
+        if not summary[-1] in '.!?':
+            last_period = max(summary.rfind('.'), summary.rfind('!'), summary.rfind('?'))
+            if last_period > len(summary) * 0.7:
+                summary = summary[:last_period+1]
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'\s([,.!?])', r'\1', summary)
+    summary = re.sub(r'\.\.+', '.', summary)
+    return summary
+
+
+def legacy_remove_hallucination(summary: str) -> str:
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'것으로\s*보입니다', '것입니다', summary)
+    summary = re.sub(r'것\s*같습니다', '것입니다', summary)
+    summary = re.sub(r'인\s*듯\s*합니다', '입니다', summary)
+    summary = re.sub(r'것으로\s*생각됩니다', '것입니다', summary)
+    sentences = re.split(r'(?<=[.!?])\s+', summary)
+    processed = []
+    for sent in sentences:
+        words = sent.split()
+        if len(words) > 35:
+            first_clause = sent.split(',')[0] if ',' in sent else sent.split('.')[0]
+            if len(first_clause.split()) >= 10:
+                processed.append(first_clause.strip() + '.')
+        else:
+            processed.append(sent)
+    summary = ' '.join(processed)
+    summary = re.sub(r'\.\s+(그리고|또한|하지만)\s+', '. ', summary)
+    summary = re.sub(r'(\S+)\s+\1', r'\1', summary)
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'\s([,.!?])', r'\1', summary)
+    summary = re.sub(r'\.\.+', '.', summary)
+    if summary and not summary[-1] in '.!?':
+        last_period = max(summary.rfind('.'), summary.rfind('!'), summary.rfind('?'))
+        if last_period > len(summary) * 0.6:
+            summary = summary[:last_period+1]
+    return summary
+
+
+# v4_analysis_full.py
+def legacy_micro_tune_v4_conservative(summary: str) -> str:
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'에게\s+에게', '에게', summary)
+    summary = re.sub(r'에서\s+에서', '에서', summary)
+    summary = re.sub(r'합니다\s+합니다', '합니다', summary)
+    summary = re.sub(r'한다\s+한다', '한다', summary)
+    summary = re.sub(r'하고\s+있습니다', '합니다', summary)
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    return summary
+
+
+def legacy_micro_tune_v4_moderate(summary: str) -> str:
+    summary = legacy_micro_tune_v4_conservative(summary)
+    summary = re.sub(r'매우\s+많이', '많이', summary)
+    summary = re.sub(r'정말\s+많이', '많이', summary)
+    summary = re.sub(r'라고\s+말합니다', '라고 합니다', summary)
+    summary = re.sub(r'이라고\s+말합니다', '이라고 합니다', summary)
+    return summary
+
+
+def legacy_micro_tune_v4_aggressive(summary: str) -> str:
+    summary = legacy_micro_tune_v4_moderate(summary)
+    sentences = re.split(r'(?<=[.!?])\s+', summary.strip())
+    summary = ' '.join(sentences[:3])
+    if summary and not summary[-1] in '.!?다요습니다니다':
+        sentences = re.split(r'(?<=[.!?])\s+', summary)
+        summary = ' '.join(sentences[:-1]) if len(sentences) > 1 else sentences[0]
+    return summary.strip()
+
+
+# postprocess_v3_microtune.ipynb
+def legacy_micro_tune_v1(summary: str) -> str:
+    parts = summary.split('. ')
+    if len(parts) >= 2:
+        말합니다_count = summary.count('말합니다')
+        if 말합니다_count > 1:
+            summary = summary.replace('말합니다', '합니다', 말합니다_count - 1)
+    summary = re.sub(r'에게\s+에게', '에게', summary)
+    summary = re.sub(r'에\s+에\s', '에 ', summary)
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    return summary
+
+
+def legacy_micro_tune_v2(summary: str) -> str:
+    summary = legacy_micro_tune_v1(summary)
+    summary = re.sub(r'(?<=\.)\s+(그리고)\s+', '. ', summary)
+    return summary
+
+
+def legacy_micro_tune_v3(summary: str) -> str:
+    summary = legacy_micro_tune_v2(summary)
+    summary = re.sub(r'\s정말\s+(많이|크게|빠르게)', r' \1', summary)
+    summary = re.sub(r'매우\s+많이', '많이', summary)
+    return summary
+
+
+def legacy_micro_tune_v4(summary: str) -> str:
+    summary = legacy_micro_tune_v3(summary)
+    if not summary.endswith(('.', '!', '?', '다', '요')):
+        sentences = re.split(r'(?<=[.!?])\s+', summary)
+        if len(sentences) > 1:
+            summary = ' '.join(sentences[:-1])
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    return summary
+
+
+def legacy_ultra_fine_tune_v5(summary: str) -> str:
+    summary = legacy_micro_tune_v4(summary)
+    summary = re.sub(r'(에게[^.!?]{1,20})에게', r'\1', summary)
+    summary = re.sub(r'라고\s+말합니다', '라고 합니다', summary)
+    summary = re.sub(r'이라고\s+말합니다', '이라고 합니다', summary)
+    summary = re.sub(r'하고\s+있습니다', '합니다', summary)
+    summary = re.sub(r'하고\s+있어합니다', '합니다', summary)
+    summary = re.sub(r'에서\s+에서', '에서', summary)
+    summary = re.sub(r'에\s+에\s+', '에 ', summary)
+    summary = re.sub(r',\s+그리고\s+', ', ', summary)
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    summary = re.sub(r'\s,', ',', summary)
+    return summary
+
+
+# ============================================================================
+# 데이터
+# ============================================================================
+
+_FRAGMENTS = [
+    '#Person1#은', '#Person2#에게', '에게', '에게', '에서', '에서', '에', '합니다', '한다',
+    '하고', '하고', '있습니다', '있다', '있으며', '있고', '입니다', '매우', '정말', '아주',
+    '너무', '많이', '라고', '이라고', '말합니다', '그리고', '또한', '하지만', '것으로',
+    '보입니다', '것', '같습니다', '인', '듯', '생각됩니다', '회의를', '3시에', '예약을',
+    '취소', '친구', '이야기', '.', '.', ',', '!', '?', '..', '다', '요',
+]
+_SPACES = [' ', ' ', ' ', '  ', '\n', '', ' \t']
+
+
+def synthetic_summaries(n: int, seed: int = 42) -> list:
+    """규칙 트리거가 촘촘하게 섞인 합성 요약"""
+    rng = random.Random(seed)
+    summaries = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(3, 60)):
+            parts.append(rng.choice(_FRAGMENTS))
+            parts.append(rng.choice(_SPACES))
+        summaries.append(''.join(parts))
+    return summaries
+
+
+def load_summaries() -> list:
+    if len(sys.argv) > 1:
+        import pandas as pd
+        return pd.read_csv(sys.argv[1])['summary'].astype(str).tolist()
+    return synthetic_summaries(N_SYNTHETIC)
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    print("\n" + "="*80)
+    print("⏱️ 후처리 규칙 엔진 벤치마크")
+    print("="*80)
+
+    summaries = load_summaries()
+    fallback = summaries[0]
+    profiles = load_profiles(fallback=fallback)
+    print(f"\n📂 요약 {len(summaries):,}개")
+
+    legacy_functions = {
+        'smart': lambda s: legacy_smart_micro_tune_v4(s, fallback),
+        'focused': legacy_focused_micro_tune_v4,
+        'hallucination': legacy_remove_hallucination,
+        'conservative': legacy_micro_tune_v4_conservative,
+        'moderate': legacy_micro_tune_v4_moderate,
+        'aggressive': legacy_micro_tune_v4_aggressive,
+        'micro_v1': legacy_micro_tune_v1,
+        'micro_v2': legacy_micro_tune_v2,
+        'micro_v3': legacy_micro_tune_v3,
+        'micro_v4': legacy_micro_tune_v4,
+        'ultra_v5': legacy_ultra_fine_tune_v5,
+    }
+
+    all_identical = True
+    expected = {}
+    t_legacy_total = 0.0
+    print(f"\n{'프로파일':<15s} {'패스':>6s} {'기존':>9s} {'요약별':>9s} {'컬럼':>9s} {'배속':>7s} {'동일':>5s}")
+    print("-"*80)
+    for name, legacy in legacy_functions.items():
+        chain = profiles.chain(name)
+        expected[name], t_legacy = timed(lambda: [legacy(s) for s in summaries])
+        per_row, t_row = timed(lambda: [chain(s) for s in summaries])
+        column, t_col = timed(lambda: chain.apply(summaries))
+        t_legacy_total += t_legacy
+
+        identical = expected[name] == per_row == column
+        all_identical &= identical
+        print(f"{name:<15s} {len(chain.passes):>6d} {t_legacy:>8.2f}s {t_row:>8.2f}s "
+              f"{t_col:>8.2f}s {t_legacy / t_col:>6.1f}x {'✅' if identical else '❌':>5s}")
+
+    shared, t_shared = timed(lambda: profiles.apply(summaries, list(legacy_functions)))
+    identical = all(shared[name] == expected[name] for name in legacy_functions)
+    all_identical &= identical
+    print("-"*80)
+    print(f"{'전체 (공유)':<15s} {'':>6s} {t_legacy_total:>8.2f}s {'':>9s} "
+          f"{t_shared:>8.2f}s {t_legacy_total / t_shared:>6.1f}x {'✅' if identical else '❌':>5s}")
+
+    print(f"\n🔧 smart 패스 구성:")
+    for line in profiles.chain('smart').describe():
+        print(f"  {line}")
+
+    print("\n" + "="*80)
+    if all_identical:
+        print("✅ 모든 프로파일 출력이 기존 구현과 바이트 단위로 동일")
+    else:
+        print("❌ 출력 불일치 발생")
+    print("="*80 + "\n")
+    sys.exit(0 if all_identical else 1)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+빠른 ROUGE 채점기 벤치마크 / 정합성 검증
+==========================================
+evaluate rouge (rouge_score) vs fast_rouge.FastRouge
+
+- 샘플별 F1이 rouge_score와 비트 단위로 동일한지 검증 (기본 토크나이저 + 공백 토크나이저)
+- 코퍼스 점수: 샘플 평균 vs evaluate 기본값(부트스트랩 중앙값) 차이 확인
+- 여러 버전의 샘플별 채점 시간 비교 (analyze_v4_quality.py의 행별 rouge.compute 루프 기준)
+- 증분 재채점: 후처리 변형 N_SWEEP개를 전체 재채점 vs 바뀐 행만 재채점 (FastRouge.rescore)
+- 형태소 ROUGE (kiwipiepy 설치 시): 행별 kiwi.tokenize 대비 MorphemeStore 캐시 cold/warm 시간
+
+사용법:
+    python benchmark_rouge.py                    # 합성 데이터 (참조 500개 × 6개 버전)
+    python benchmark_rouge.py ./data/dev.csv ./prediction/a.csv ./prediction/b.csv ...
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+from rouge_score import rouge_scorer, scoring
+
+from fast_rouge import ROUGE_TYPES, FastRouge
+
+N_REFERENCES = 500
+N_VERSIONS = 6
+N_SWEEP = 200
+CORPUS_TOLERANCE = 5e-3  # 부트스트랩 중앙값과 샘플 평균의 허용 오차
+
+_WORDS = [
+    '#Person1#은', '#Person2#에게', '#Person1#', 'Person2', '회의를', '3시에', '예약을', '취소',
+    '친구', '이야기', '합니다', '한다', '있습니다', 'meeting', 'project', 'report', 'Tom', 'Mary',
+    'A1', '2023', '10', 'ok', 'Dr.', 'e-mail', '#Address#', 'CEO', 'k', '.', ',',
+]
+
+
+class _WhitespaceTokenizer:
+    """rouge_score용 공백 토크나이저 (한국어 어절 단위 비교)"""
+
+    def tokenize(self, text):
+        return text.split()
+
+
+class _KiwiTokenizer:
+    """rouge_score용 Kiwi 형태소 토크나이저 (노트북의 morpheme_tokenize와 동일, 행별 분석)"""
+
+    def __init__(self):
+        from kiwipiepy import Kiwi
+        self.kiwi = Kiwi()
+
+    def tokenize(self, text):
+        return [token.form for token in self.kiwi.tokenize(text)]
+
+
+def synthetic_versions(n: int, n_versions: int, seed: int = 42):
+    """참조 요약과, 참조를 부분적으로 바꾼 후보 버전들"""
+    rng = random.Random(seed)
+    references = [' '.join(rng.choice(_WORDS) for _ in range(rng.randint(0, 60))) for _ in range(n)]
+    versions = {}
+    base = []
+    for ref in references:
+        words = ref.split()
+        base.append(' '.join(w for w in words if rng.random() > 0.3) + ' ' + rng.choice(_WORDS))
+    versions['v0'] = base
+    for v in range(1, n_versions):
+        # 버전 간 30% 정도의 행만 달라지는 후처리 변형을 흉내
+        versions[f'v{v}'] = [
+            ' '.join(rng.sample(s.split(), k=len(s.split()))) if rng.random() < 0.3 else s
+            for s in base
+        ]
+    return references, versions
+
+
+def sweep_variants(base, n_variants: int, seed: int = 7):
+    """기준 컬럼에서 20~40% 행만 바꾼 후처리 변형들"""
+    rng = random.Random(seed)
+    variants = []
+    for _ in range(n_variants):
+        ratio = rng.uniform(0.2, 0.4)
+        variants.append([' '.join(s.split()[:-1]) if rng.random() < ratio else s for s in base])
+    return variants
+
+
+def load_inputs():
+    if len(sys.argv) > 2:
+        import pandas as pd
+        references = pd.read_csv(sys.argv[1])['summary'].astype(str).tolist()
+        versions = {}
+        for path in sys.argv[2:]:
+            summaries = pd.read_csv(path)['summary'].astype(str).tolist()
+            versions[path.rsplit('/', 1)[-1]] = summaries[:len(references)]
+        return references, versions
+    return synthetic_versions(N_REFERENCES, N_VERSIONS)
+
+
+def reference_per_sample(scorer, references, predictions) -> np.ndarray:
+    rows = []
+    for ref, pred in zip(references, predictions):
+        scores = scorer.score(ref, pred)
+        rows.append([scores[t].fmeasure for t in ROUGE_TYPES])
+    return np.array(rows, dtype=np.float64)
+
+
+def reference_corpus(scorer, references, predictions) -> dict:
+    """evaluate rouge.compute() 기본 동작 (BootstrapAggregator의 mid)"""
+    aggregator = scoring.BootstrapAggregator()
+    for ref, pred in zip(references, predictions):
+        aggregator.add_scores(scorer.score(ref, pred))
+    result = aggregator.aggregate()
+    return {t: result[t].mid.fmeasure for t in ROUGE_TYPES}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    print("\n" + "="*80)
+    print("⏱️ ROUGE 채점기 벤치마크 / 정합성 검증")
+    print("="*80)
+
+    references, versions = load_inputs()
+    print(f"\n📂 참조 {len(references):,}개 × 버전 {len(versions)}개")
+
+    all_ok = True
+    tokenizers = {
+        'rouge_score 기본': (None, None),
+        '공백 (어절)': (_WhitespaceTokenizer(), str.split),
+    }
+    for label, (rs_tokenizer, fast_tokenizer) in tokenizers.items():
+        rs = rouge_scorer.RougeScorer(list(ROUGE_TYPES), tokenizer=rs_tokenizer)
+        fast_kwargs = {'tokenizer': fast_tokenizer} if fast_tokenizer else {}
+
+        expected, t_legacy = timed(lambda: {
+            name: reference_per_sample(rs, references, preds) for name, preds in versions.items()
+        })
+        (corpus, per_sample), t_fast = timed(
+            lambda: FastRouge(references, **fast_kwargs).score_versions(versions))
+
+        identical = all(np.array_equal(per_sample[v], expected[name]) for v, name in enumerate(versions))
+        all_ok &= identical
+        print(f"\n🔤 토크나이저: {label}")
+        print(f"  샘플별 채점 (전체 버전): rouge_score {t_legacy:.3f}s → FastRouge {t_fast:.3f}s "
+              f"({t_legacy / t_fast:.1f}x)  샘플별 F1 동일: {'✅' if identical else '❌'}")
+
+        print(f"\n  {'버전':<12s} {'R1':>8s} {'R2':>8s} {'RL':>8s}   {'부트스트랩 차이(최대)':>20s}")
+        for name in versions:
+            boot = reference_corpus(rs, references, versions[name])
+            diff = max(abs(boot[t] - corpus[name][t]) for t in ROUGE_TYPES)
+            ok = diff <= CORPUS_TOLERANCE
+            all_ok &= ok
+            r = corpus[name]
+            print(f"  {name:<12s} {r['rouge1']*100:>7.2f}% {r['rouge2']*100:>7.2f}% {r['rougeL']*100:>7.2f}%   "
+                  f"{diff:>18.5f} {'✅' if ok else '❌'}")
+
+    # 증분 재채점 (규칙 변형 스윕)
+    scorer = FastRouge(references, tokenizer=str.split)
+    base_preds = next(iter(versions.values()))
+    variants = sweep_variants(base_preds, N_SWEEP)
+    full, t_full = timed(lambda: [scorer.score(v) for v in variants])
+    baseline = scorer.score_run(base_preds)
+    incremental, t_incr = timed(lambda: [scorer.rescore(baseline, v) for v in variants])
+
+    identical = all(np.array_equal(run.per_sample, f) for run, f in zip(incremental, full))
+    corpus_diff = max(abs(run.corpus[t] - f[:, k].mean())
+                      for run, f in zip(incremental, full) for k, t in enumerate(ROUGE_TYPES))
+    ok = identical and corpus_diff < 1e-12
+    all_ok &= ok
+    changed_ratio = np.mean([len(run.changed) / len(run) for run in incremental])
+    print(f"\n🔁 증분 재채점 (변형 {N_SWEEP}개, 평균 {changed_ratio*100:.0f}% 행 변경, 공백 토크나이저)")
+    print(f"  전체 재채점 {t_full:.3f}s → 바뀐 행만 {t_incr:.3f}s ({t_full / t_incr:.1f}x)  "
+          f"샘플별 F1 동일: {'✅' if identical else '❌'}  코퍼스 차이 {corpus_diff:.1e}")
+
+    # 형태소 ROUGE (Kiwi 캐시)
+    try:
+        from morpheme_store import MorphemeStore
+        kiwi_tokenizer = _KiwiTokenizer()
+    except ImportError:
+        print("\n⚠️ kiwipiepy 미설치 → 형태소 ROUGE 검증 생략")
+    else:
+        rs = rouge_scorer.RougeScorer(list(ROUGE_TYPES), tokenizer=kiwi_tokenizer)
+        expected, t_legacy = timed(lambda: {
+            name: reference_per_sample(rs, references, preds) for name, preds in versions.items()
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, 'morphemes.npz')
+            with MorphemeStore(cache_path) as cold_store:  # 블록 종료 시 저장
+                (_, cold), t_cold = timed(
+                    lambda: FastRouge(references, tokenizer=cold_store).score_versions(versions))
+            store = MorphemeStore(cache_path)
+            n_cached = len(store)
+            (_, warm), t_warm = timed(lambda: FastRouge(references, tokenizer=store).score_versions(versions))
+            analyzed_on_warm = len(store) - n_cached
+
+        identical = all(np.array_equal(cold[v], expected[name]) and np.array_equal(warm[v], expected[name])
+                        for v, name in enumerate(versions))
+        all_ok &= identical and analyzed_on_warm == 0
+        print(f"\n🔤 형태소 ROUGE (Kiwi)")
+        print(f"  행별 kiwi.tokenize + rouge_score: {t_legacy:.3f}s")
+        print(f"  MorphemeStore cold: {t_cold:.3f}s ({t_legacy / t_cold:.1f}x)  "
+              f"warm: {t_warm:.3f}s ({t_legacy / t_warm:.1f}x, 재분석 {analyzed_on_warm}개)")
+        print(f"  캐시 항목 {n_cached:,}개  샘플별 F1 동일: {'✅' if identical else '❌'}")
+
+    # evaluate 자체와의 비교 (허브 접근이 가능한 환경에서만)
+    try:
+        from evaluate import load
+        rouge = load('rouge')
+    except Exception as e:
+        print(f"\n⚠️ evaluate rouge 로드 실패 → rouge_score 직접 비교로 대체 ({type(e).__name__})")
+    else:
+        name = next(iter(versions))
+        preds = versions[name]
+        per_row = rouge.compute(predictions=preds, references=references, use_aggregator=False)
+        _, t_eval = timed(lambda: [rouge.compute(predictions=[p], references=[r])['rouge2']
+                                   for p, r in zip(preds, references)])
+        fast = FastRouge(references).score(preds)
+        identical = all(np.array_equal(np.array(per_row[t]), fast[:, k]) for k, t in enumerate(ROUGE_TYPES))
+        all_ok &= identical
+        print(f"\n📏 evaluate rouge (use_aggregator=False) 샘플별 F1 동일: {'✅' if identical else '❌'}")
+        print(f"  행별 rouge.compute 루프 (1개 버전): {t_eval:.2f}s")
+
+    print("\n" + "="*80)
+    if all_ok:
+        print("✅ 샘플별 점수 동일, 코퍼스 점수 허용 오차 이내")
+    else:
+        print("❌ 불일치 발생")
+    print("="*80 + "\n")
+    sys.exit(0 if all_ok else 1)
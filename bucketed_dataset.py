@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+KoBART 길이 버킷 데이터셋
+=========================
+전체 데이터를 encoder_max_len까지 한 번에 패딩하던 KoBARTv2Dataset / CustomDataset 대체
+
+- 토큰 ID를 패딩 없이 리스트로 저장 (tokenizer(..., padding=False)) → __getitem__에서 텐서 복제 없음
+  · token_cache 코퍼스의 메모리 맵 컬럼도 그대로 사용 (from_corpus)
+- 배치 단위 패딩 (Seq2SeqPadCollator): 배치 안 최장 길이까지만 패딩
+  · labels 패딩은 -100 (loss에서 제외), decoder_attention_mask도 배치 단위 생성
+- 학습: Seq2SeqTrainingArguments(group_by_length=True) + data_collator
+  → Trainer의 LengthGroupedSampler가 비슷한 길이끼리 배치 구성 (배치 순서는 섞임)
+- 추론: LengthBucketSampler로 길이순 배치 → generate → 입력 순서로 복원 (generate_in_order)
+  · iter_generate: 배치마다 결과 반환 (submission_writer로 스트리밍 기록, 남은 행만 재개)
+
+사용:
+    train_dataset = BucketedSeq2SeqDataset.from_texts(tokenizer, train_df['dialogue'], train_df['summary'],
+                                                      encoder_max_len=512, decoder_max_len=150)
+    trainer = Seq2SeqTrainer(..., train_dataset=train_dataset,
+                             data_collator=Seq2SeqPadCollator(tokenizer.pad_token_id))
+
+    test_dataset = BucketedSeq2SeqDataset.from_texts(tokenizer, test_df['dialogue'], ids=test_df['fname'])
+    decoded = generate_in_order(model, tokenizer, test_dataset, batch_size=32, num_beams=4, max_length=100)
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, Sampler
+from tqdm import tqdm
+
+from token_cache import TokenCorpus, seq2seq_columns
+
+
+class BucketedSeq2SeqDataset(Dataset):
+    """
+    패딩 없는 토큰 ID 데이터셋
+
+    Args:
+        input_ids: 인코더 입력 토큰 ID 리스트들
+        decoder_input_ids: 디코더 입력 (bos + 요약) 토큰 ID 리스트들 (추론용이면 None)
+        labels: 정답 (요약 + eos) 토큰 ID 리스트들 (추론용이면 None)
+        ids: 샘플 ID (fname) → 배치의 'ID'로 전달
+    """
+
+    def __init__(self, input_ids: Sequence[List[int]], decoder_input_ids: Optional[Sequence[List[int]]] = None,
+                 labels: Optional[Sequence[List[int]]] = None, ids: Optional[Sequence[str]] = None):
+        self.input_ids = input_ids
+        self.decoder_input_ids = decoder_input_ids
+        self.labels = labels
+        self.ids = list(ids) if ids is not None else None
+
+    @classmethod
+    def from_texts(cls, tokenizer, dialogues: Sequence[str], summaries: Optional[Sequence[str]] = None,
+                   encoder_max_len: int = 512, decoder_max_len: int = 150, ids: Optional[Sequence[str]] = None):
+        """대화(+요약) 텍스트 → 데이터셋 (기존 prepare_data와 같은 bos/eos 구성과 truncation)"""
+        columns = seq2seq_columns(tokenizer, dialogues, summaries, encoder_max_len, decoder_max_len)
+        return cls(columns['input_ids'], columns.get('decoder_input_ids'), columns.get('labels'), ids)
+
+    @classmethod
+    def from_corpus(cls, corpus: TokenCorpus, ids_column: Optional[str] = 'fname'):
+        """token_cache 코퍼스 → 데이터셋 (메모리 맵 컬럼을 복사 없이 그대로 사용)"""
+        def column(name):
+            return corpus[name] if name and name in corpus else None
+        return cls(corpus['input_ids'], column('decoder_input_ids'), column('labels'), column(ids_column))
+
+    @property
+    def lengths(self) -> Sequence[int]:
+        lengths = getattr(self.input_ids, 'lengths', None)  # FlatColumn: 오프셋 차이
+        return lengths if lengths is not None else [len(ids) for ids in self.input_ids]
+
+    def __len__(self) -> int:
+        return len(self.input_ids)
+
+    def __getitem__(self, idx: int) -> Dict:
+        item = {'input_ids': self.input_ids[idx]}
+        if self.decoder_input_ids is not None:
+            item['decoder_input_ids'] = self.decoder_input_ids[idx]
+        if self.labels is not None:
+            item['labels'] = self.labels[idx]
+        if self.ids is not None:
+            item['ID'] = self.ids[idx]
+        return item
+
+
+class Seq2SeqPadCollator:
+    """
+    배치 안 최장 길이까지만 오른쪽 패딩
+
+    Args:
+        pad_token_id: 입력/디코더 입력 패딩 토큰
+        label_pad_token_id: labels 패딩 값 (-100: loss 제외)
+    """
+
+    def __init__(self, pad_token_id: int, label_pad_token_id: int = -100):
+        self.pad_token_id = pad_token_id
+        self.label_pad_token_id = label_pad_token_id
+
+    @staticmethod
+    def _pad(sequences: List[List[int]], value: int):
+        width = max(len(seq) for seq in sequences)
+        padded = np.full((len(sequences), width), value, dtype=np.int64)
+        mask = np.zeros((len(sequences), width), dtype=np.int64)
+        for row, seq in enumerate(sequences):  # 리스트, 메모리 맵 뷰 모두 그대로 복사
+            padded[row, :len(seq)] = seq
+            mask[row, :len(seq)] = 1
+        return torch.from_numpy(padded), torch.from_numpy(mask)
+
+    def __call__(self, features: List[Dict]) -> Dict:
+        batch = {}
+        batch['input_ids'], batch['attention_mask'] = self._pad([f['input_ids'] for f in features], self.pad_token_id)
+        if 'decoder_input_ids' in features[0]:
+            batch['decoder_input_ids'], batch['decoder_attention_mask'] = self._pad(
+                [f['decoder_input_ids'] for f in features], self.pad_token_id)
+        if 'labels' in features[0]:
+            batch['labels'], _ = self._pad([f['labels'] for f in features], self.label_pad_token_id)
+        if 'ID' in features[0]:
+            batch['ID'] = [f['ID'] for f in features]
+        return batch
+
+
+class LengthBucketSampler(Sampler):
+    """추론용 배치 샘플러: 길이 내림차순으로 batch_size개씩 (긴 배치 먼저 → 메모리 부족을 초반에 확인)"""
+
+    def __init__(self, lengths: Sequence[int], batch_size: int):
+        self.batch_size = batch_size
+        order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+        self.batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+    def __iter__(self) -> Iterator[List[int]]:
+        return iter(self.batches)
+
+    def __len__(self) -> int:
+        return len(self.batches)
+
+
+@torch.no_grad()
+def iter_generate(model, tokenizer, dataset: BucketedSeq2SeqDataset, batch_size: int = 32,
+                  indices: Optional[Sequence[int]] = None, skip_special_tokens: bool = False,
+                  progress: bool = True, **generate_kwargs) -> Iterator[Tuple[List[int], List[str]]]:
+    """
+    길이순 배치로 generate → 배치마다 (데이터셋 위치들, 디코딩 텍스트들) 반환
+
+    indices: 생성할 데이터셋 위치 (None이면 전체, 재개 시 남은 행만)
+    """
+    device = next(model.parameters()).device
+    collator = Seq2SeqPadCollator(tokenizer.pad_token_id)
+    indices = list(range(len(dataset))) if indices is None else list(indices)
+    lengths = dataset.lengths
+    sampler = LengthBucketSampler([lengths[i] for i in indices], batch_size)
+    for batch_rows in tqdm(sampler, desc="Inference", disable=not progress):
+        rows = [indices[r] for r in batch_rows]
+        batch = collator([dataset[i] for i in rows])
+        outputs = model.generate(
+            input_ids=batch['input_ids'].to(device),
+            attention_mask=batch['attention_mask'].to(device),
+            **generate_kwargs,
+        )
+        yield rows, tokenizer.batch_decode(outputs, skip_special_tokens=skip_special_tokens)
+
+
+def generate_in_order(model, tokenizer, dataset: BucketedSeq2SeqDataset, batch_size: int = 32,
+                      skip_special_tokens: bool = False, progress: bool = True, **generate_kwargs) -> List[str]:
+    """길이순 배치로 generate → 디코딩 텍스트 (데이터셋 순서, 후처리는 호출 측)"""
+    decoded: List[Optional[str]] = [None] * len(dataset)
+    for rows, texts in iter_generate(model, tokenizer, dataset, batch_size, skip_special_tokens=skip_special_tokens,
+                                     progress=progress, **generate_kwargs):
+        for i, text in zip(rows, texts):
+            decoded[i] = text
+    return decoded
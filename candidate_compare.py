@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+N개 제출 후보 일괄 비교
+=======================
+evaluate_v4_smart_final / v4_analysis_full / analyze_v4_quality에서 버전 3~5개를 dict로 하드코딩하고
+파일별로 따로 읽어 채점하던 것을, 후보 파일 개수와 상관없이 한 번에
+
+- CandidateSet: 제출 CSV 여러 개(glob 가능) → fname 기준으로 정렬을 맞춘 (버전 수, 샘플 수) 요약 행렬
+  · 행 순서는 fnames (보통 test.csv 순서, 없으면 첫 파일 순서), 순서가 다른 파일은 fname으로 재배열
+    (fname 집합이 다르면 ValueError)
+- CandidateComparison: 참조 요약은 한 번만 토큰화, 모든 버전의 (행, 요약) 쌍을 모아 고유한 쌍만 채점
+  → 후처리 변형처럼 대부분 행이 같은 후보가 수십 개여도 실제 채점량은 고유 요약 수만큼
+  · 고유 쌍이 많으면 프로세스 풀로 나눠 채점 (워커마다 FastRouge를 한 번만 생성)
+- ranking_table(): R1/R2/RL/Combined(%) 표, Combined 내림차순
+
+사용:
+    candidates = CandidateSet.from_glob('./prediction/submit_*.csv', fnames=store.frame('test')['fname'])
+    result = CandidateComparison(dev_df['summary']).score(candidates)
+    print(result.table.to_string(index=False))
+    result.corpus['solar_v4']['rouge2'], result.per_sample.shape    # (버전 수, 샘플 수, 3)
+
+    python candidate_compare.py ['./prediction/submit_*.csv'] [--workers 8]
+"""
+
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from fast_rouge import ROUGE_TYPES, FastRouge, rouge_tokenize
+
+DEFAULT_PATTERN = './prediction/submit_*.csv'
+
+# 워커 1개에 넘길 최소 고유 쌍 수 (이보다 적으면 프로세스 생성 비용이 더 큼)
+MIN_PAIRS_PER_WORKER = 2000
+
+
+def version_name(path: str) -> str:
+    """./prediction/submit_solar_v4.csv → solar_v4"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem[len('submit_'):] if stem.startswith('submit_') else stem
+
+
+class CandidateSet:
+    """
+    fname 기준으로 정렬을 맞춘 후보 요약 행렬
+
+    Attributes:
+        names: 버전 이름들
+        fnames: 행 순서
+        summaries: (버전 수, 샘플 수) object 배열
+    """
+
+    def __init__(self, names: Sequence[str], fnames: Sequence[str], summaries: np.ndarray):
+        self.names = list(names)
+        self.fnames = pd.Index(fnames)
+        self.summaries = summaries
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame], column: str = 'summary',
+                    fnames: Optional[Sequence[str]] = None) -> 'CandidateSet':
+        """{이름: 제출 DataFrame} → 행렬 (fnames: 행 순서, None이면 첫 파일 순서)"""
+        names = list(frames)
+        if not names:
+            raise ValueError('후보 없음')
+        fnames = pd.Index(frames[names[0]]['fname'] if fnames is None else fnames)
+        summaries = np.empty((len(names), len(fnames)), dtype=object)
+        for v, name in enumerate(names):
+            frame = frames[name]
+            rows = pd.Index(frame['fname'])
+            if rows.equals(fnames):  # 보통은 모든 제출 파일이 같은 순서 → 재배열 없음
+                texts = frame[column].to_numpy(dtype=object)
+            else:
+                if rows.has_duplicates or fnames.has_duplicates or len(rows) != len(fnames):
+                    raise ValueError(f'{name}: fname {len(rows)}개 (중복 포함) ≠ 기준 {len(fnames)}개')
+                order = rows.get_indexer(fnames)
+                if (order < 0).any():
+                    raise ValueError(f'{name}: 없는 fname {fnames[order < 0][:5].tolist()}')
+                texts = frame[column].to_numpy(dtype=object)[order]
+            summaries[v] = [t if isinstance(t, str) else str(t) for t in texts]
+        return cls(names, fnames, summaries)
+
+    @classmethod
+    def from_paths(cls, paths: Union[Sequence[str], Mapping[str, str]], column: str = 'summary',
+                   fnames: Optional[Sequence[str]] = None) -> 'CandidateSet':
+        """CSV 경로 리스트 (이름은 version_name) 또는 {이름: 경로}"""
+        if not isinstance(paths, Mapping):
+            paths = {version_name(path): path for path in paths}
+        return cls.from_frames({name: pd.read_csv(path) for name, path in paths.items()}, column, fnames)
+
+    @classmethod
+    def from_glob(cls, pattern: str = DEFAULT_PATTERN, column: str = 'summary',
+                  fnames: Optional[Sequence[str]] = None) -> 'CandidateSet':
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            raise FileNotFoundError(f'{pattern}에 맞는 파일 없음')
+        return cls.from_paths(paths, column, fnames)
+
+
+class ComparisonResult:
+    """
+    일괄 비교 결과
+
+    Attributes:
+        names: 버전 이름들
+        per_sample: (버전 수, 샘플 수, 3) F1 행렬
+        corpus: {버전: {'rouge1': F1 평균, 'rouge2': ..., 'rougeL': ...}}
+        unique_pairs: 실제로 채점한 고유 (행, 요약) 쌍 수
+    """
+
+    def __init__(self, names: List[str], per_sample: np.ndarray, unique_pairs: int):
+        self.names = names
+        self.per_sample = per_sample
+        self.unique_pairs = unique_pairs
+        means = per_sample.mean(axis=1) if per_sample.shape[1] else np.zeros((len(names), len(ROUGE_TYPES)))
+        self.corpus = {name: {t: float(m) for t, m in zip(ROUGE_TYPES, row)} for name, row in zip(names, means)}
+
+    @property
+    def table(self) -> pd.DataFrame:
+        return ranking_table(self.corpus)
+
+
+def ranking_table(corpus: Mapping[str, Mapping[str, float]]) -> pd.DataFrame:
+    """{버전: 코퍼스 점수} → Version, R1, R2, RL, Combined(%) 표 (Combined 내림차순)"""
+    rows = [{
+        'Version': name,
+        'R1': scores['rouge1'] * 100,
+        'R2': scores['rouge2'] * 100,
+        'RL': scores['rougeL'] * 100,
+        'Combined': (scores['rouge1'] + scores['rouge2'] + scores['rougeL']) / 3 * 100,
+    } for name, scores in corpus.items()]
+    rows.sort(key=lambda r: r['Combined'], reverse=True)
+    return pd.DataFrame(rows, columns=['Version', 'R1', 'R2', 'RL', 'Combined'])
+
+
+_worker_scorer: Optional[FastRouge] = None
+
+
+def _init_worker(references: List[str], tokenizer: Callable[[str], List[str]]):
+    global _worker_scorer
+    _worker_scorer = FastRouge(references, tokenizer=tokenizer)
+
+
+def _score_chunk(rows: List[int], texts: List[str]) -> np.ndarray:
+    return _worker_scorer.score_rows(rows, texts)
+
+
+class CandidateComparison:
+    """
+    참조 요약 집합에 대한 N개 후보 일괄 채점기
+
+    Args:
+        references: 참조 요약 (후보 행 순서와 같은 위치 기준, dev_df['summary'] 등)
+        tokenizer: FastRouge 토크나이저 (프로세스 풀을 쓰면 pickle 가능해야 함)
+        workers: 채점 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서만)
+    """
+
+    def __init__(self, references: Sequence[str], tokenizer: Callable[[str], List[str]] = rouge_tokenize,
+                 workers: Optional[int] = None):
+        self.references = FastRouge._texts(references)
+        self.tokenizer = tokenizer
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.scorer = FastRouge(self.references, tokenizer=tokenizer)
+
+    def _pairs(self, summaries: np.ndarray):
+        """(버전, 행) → 고유 (행, 요약) 쌍 번호, 고유 쌍의 행/요약 리스트"""
+        n_versions, n_rows = summaries.shape
+        inverse = np.empty((n_versions, n_rows), dtype=np.int64)
+        rows: List[int] = []
+        texts: List[str] = []
+        for i in range(n_rows):
+            seen: Dict[str, int] = {}
+            for v in range(n_versions):
+                text = summaries[v, i]
+                k = seen.get(text)
+                if k is None:
+                    k = seen[text] = len(rows)
+                    rows.append(i)
+                    texts.append(text)
+                inverse[v, i] = k
+        return inverse, rows, texts
+
+    def _score_pairs(self, rows: List[int], texts: List[str]) -> np.ndarray:
+        workers = min(self.workers, len(rows) // MIN_PAIRS_PER_WORKER)
+        if workers <= 1:
+            return self.scorer.score_rows(rows, texts)
+
+        # 워커당 2덩어리 → 먼저 끝난 워커가 남은 덩어리를 가져감
+        bounds = np.linspace(0, len(rows), 2 * workers + 1).astype(int)
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(self.references, self.tokenizer)) as pool:
+            chunks = pool.map(_score_chunk, [rows[a:b] for a, b in zip(bounds, bounds[1:])],
+                              [texts[a:b] for a, b in zip(bounds, bounds[1:])])
+            return np.concatenate(list(chunks))
+
+    def score(self, candidates: CandidateSet) -> ComparisonResult:
+        """모든 후보 채점 → ComparisonResult (같은 행의 같은 요약은 버전이 달라도 한 번만 채점)"""
+        if candidates.summaries.shape[1] != len(self.references):
+            raise ValueError(f'후보 {candidates.summaries.shape[1]}행 ≠ 참조 {len(self.references)}개')
+        inverse, rows, texts = self._pairs(candidates.summaries)
+        scores = self._score_pairs(rows, texts) if rows else np.zeros((0, len(ROUGE_TYPES)))
+        return ComparisonResult(candidates.names, scores[inverse], len(rows))
+
+
+if __name__ == '__main__':
+    import time
+
+    from dialogue_store import DialogueStore
+
+    args = sys.argv[1:]
+    workers = None
+    if '--workers' in args:
+        k = args.index('--workers')
+        workers = int(args[k + 1])
+        del args[k:k + 2]
+    patterns = args or [DEFAULT_PATTERN]
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        print(f"❌ 후보 파일 없음: {' '.join(patterns)}")
+        sys.exit(1)
+
+    print("\n" + "="*80)
+    print(f"📊 제출 후보 {len(paths)}개 일괄 비교 (Dev 셋 ROUGE)")
+    print("="*80)
+
+    start = time.perf_counter()
+    store = DialogueStore()
+    candidates = CandidateSet.from_paths(paths, fnames=store.frame('test')['fname'])
+    dev_df = store.frame('dev')
+    result = CandidateComparison(dev_df['summary'], workers=workers).score(candidates)
+    elapsed = time.perf_counter() - start
+
+    total = len(candidates) * len(candidates.fnames)
+    print(f"\n⏳ 채점: 고유 (행, 요약) {result.unique_pairs:,}개 / 전체 {total:,}개, {elapsed:.2f}초\n")
+    print(result.table.to_string(index=False))
+    print(f"\n" + "="*80 + "\n")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+대화 길이/주제별 디코딩 설정 라우터 (config.yaml dynamic_inference)
+====================================================================
+모든 대화에 같은 max_new_tokens/num_beams(SOLAR 150/3, KoBART max_length 100/4)를 쓰던 추론을
+입력 토큰 수와 값싼 주제 분류로 대화별 디코딩 예산을 골라 설정별로 묶어 생성
+
+- 길이 단계 (use_length_based): 입력 토큰 수가 length_tiers[k].max_tokens 이하인 첫 단계
+  · 단계마다 num_beams 상한, 생성 길이 비율 (max_new_tokens / max_length × length_ratio)
+  · 마지막 단계보다 긴 대화는 기본 설정 그대로 → 긴 입력의 출력은 바뀌지 않음
+- 주제 분류 (use_topic_based): 모델 없이 정규식 1회
+  · multi_party: 화자(#PersonN#) multi_party_speakers명 이상 → 기본 설정
+  · chitchat: 일상 대화 키워드가 있고 숫자/개인정보 자리표시자가 없음 → 한 단계 더 줄임 (길이 단계 안에서만)
+  · task: 그 외 (길이 단계 그대로)
+- 같은 설정으로 가는 대화끼리 모아 BatchGenerator.iter_summarize / bucketed_dataset.iter_generate로 생성
+  → 설정 묶음 안에서는 기존 길이순 배치/캐시를 그대로 사용, 결과는 입력 위치로 반환
+
+사용:
+    router = DecodingRouter.from_config(INFERENCE_PARAMS)            # config.yaml의 dynamic_inference
+    for rows, summaries in iter_summarize_routed(generator, test_df['dialogue'], V2_PROMPT, router, tokenizer):
+        writer.write_many(test_df['fname'].iloc[rows], summaries)
+
+    router = DecodingRouter({'max_length': 100, 'num_beams': 4, 'no_repeat_ngram_size': 2, 'early_stopping': True})
+    for rows, decoded in iter_generate_routed(model, tokenizer, test_dataset, test_df['dialogue'], router):
+        ...
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# 길이 단계 (입력 토큰 수 상한 → num_beams 상한, 생성 길이 비율), 짧은 단계부터
+LENGTH_TIERS = (
+    {'max_tokens': 256, 'num_beams': 2, 'length_ratio': 0.6},
+    {'max_tokens': 512, 'num_beams': 3, 'length_ratio': 0.8},
+)
+
+MULTI_PARTY_SPEAKERS = 3
+
+# 일상 대화 키워드 (DialogSum 주제 중 짧은 잡담이 많은 것들)
+CHITCHAT_KEYWORDS = (
+    '날씨', '주말', '영화', '음악', '취미', '여행', '휴가', '파티', '생일', '음식', '저녁', '점심', '커피',
+    '친구', '가족', '운동', '게임', '드라마', '노래', '쇼핑', '옷', '데이트', '산책', '요리',
+)
+
+# 생성 길이 키 (SOLAR: max_new_tokens, KoBART: max_length)
+LENGTH_KEYS = ('max_new_tokens', 'max_length')
+
+_SPEAKER = re.compile(r'#Person(\d+)#')
+_DETAIL = re.compile(r'\d|#(?!Person\d+#)[A-Za-z]+#')
+
+
+def classify_topic(dialogue: str, chitchat_keywords: Sequence[str] = CHITCHAT_KEYWORDS,
+                   multi_party_speakers: int = MULTI_PARTY_SPEAKERS) -> str:
+    """대화 → 'chitchat' / 'task' / 'multi_party' (정규식 기반, 모델 호출 없음)"""
+    if len(set(_SPEAKER.findall(dialogue))) >= multi_party_speakers:
+        return 'multi_party'
+    if not _DETAIL.search(_SPEAKER.sub(' ', dialogue)) and any(k in dialogue for k in chitchat_keywords):
+        return 'chitchat'
+    return 'task'
+
+
+class DecodingRouter:
+    """
+    대화별 디코딩 설정 선택기
+
+    Args:
+        base_params: 기본 generate() 파라미터 (긴 대화/여러 화자 대화는 이 설정 그대로)
+        length_tiers: 짧은 단계부터 {'max_tokens', 'num_beams', 'length_ratio'}
+        use_length_based: 입력 토큰 수로 단계 선택 (False면 chitchat만 마지막 단계로)
+        use_topic_based: 주제 분류로 단계 조정
+        chitchat_keywords / multi_party_speakers: classify_topic 인자
+    """
+
+    def __init__(self, base_params: Mapping, length_tiers: Sequence[Mapping] = LENGTH_TIERS,
+                 use_length_based: bool = True, use_topic_based: bool = True,
+                 chitchat_keywords: Sequence[str] = CHITCHAT_KEYWORDS,
+                 multi_party_speakers: int = MULTI_PARTY_SPEAKERS):
+        self.base_params = dict(base_params)
+        self.length_tiers = sorted((dict(t) for t in length_tiers), key=lambda t: t['max_tokens'])
+        self.use_length_based = use_length_based
+        self.use_topic_based = use_topic_based
+        self.chitchat_keywords = tuple(chitchat_keywords)
+        self.multi_party_speakers = multi_party_speakers
+        self.base_level = len(self.length_tiers)
+        self._params = [self._tier_params(t) for t in self.length_tiers] + [dict(self.base_params)]
+
+    @classmethod
+    def from_config(cls, base_params: Mapping, config_path: str = './config.yaml') -> 'DecodingRouter':
+        """config.yaml의 dynamic_inference 블록으로 생성 (없는 키는 기본값)"""
+        import yaml
+
+        with open(config_path, encoding='utf-8') as f:
+            conf = yaml.safe_load(f).get('dynamic_inference') or {}
+        return cls(
+            base_params,
+            length_tiers=conf.get('length_tiers', LENGTH_TIERS),
+            use_length_based=conf.get('use_length_based', True),
+            use_topic_based=conf.get('use_topic_based', True),
+            chitchat_keywords=conf.get('chitchat_keywords', CHITCHAT_KEYWORDS),
+            multi_party_speakers=conf.get('multi_party_speakers', MULTI_PARTY_SPEAKERS),
+        )
+
+    def _tier_params(self, tier: Mapping) -> Dict:
+        params = dict(self.base_params)
+        if 'num_beams' in params:
+            params['num_beams'] = min(params['num_beams'], tier['num_beams'])
+        for key in LENGTH_KEYS:
+            if key in params:
+                params[key] = max(1, math.ceil(params[key] * tier['length_ratio']))
+                if 'min_length' in params:
+                    params['min_length'] = min(params['min_length'], params[key])
+        return params
+
+    # ------------------------------------------------------------------
+    # 라우팅
+    # ------------------------------------------------------------------
+
+    def level(self, dialogue: str, n_tokens: int) -> int:
+        """대화 1개의 단계 (0이 가장 작은 예산, base_level은 기본 설정)"""
+        level = self.base_level
+        if self.use_length_based:
+            level = next((k for k, t in enumerate(self.length_tiers) if n_tokens <= t['max_tokens']), level)
+        if self.use_topic_based and self.base_level:
+            topic = classify_topic(dialogue, self.chitchat_keywords, self.multi_party_speakers)
+            if topic == 'multi_party':
+                level = self.base_level
+            elif topic == 'chitchat' and (level < self.base_level or not self.use_length_based):
+                level = max(level - 1, 0)
+        return level
+
+    def params(self, level: int) -> Dict:
+        """단계의 generate() 파라미터 (사본)"""
+        return dict(self._params[level])
+
+    def levels(self, dialogues: Sequence[str], lengths: Sequence[int]) -> List[int]:
+        dialogues = [d if isinstance(d, str) else str(d) for d in dialogues]
+        if len(dialogues) != len(lengths):
+            raise ValueError(f'대화 {len(dialogues)}개 ≠ 길이 {len(lengths)}개')
+        return [self.level(d, n) for d, n in zip(dialogues, lengths)]
+
+    def route(self, dialogues: Sequence[str], lengths: Sequence[int]) -> List[Tuple[Dict, List[int]]]:
+        """[(generate() 파라미터, 대화 위치들)] — 기본 설정(긴 대화) 묶음부터"""
+        groups: Dict[int, List[int]] = {}
+        for i, level in enumerate(self.levels(dialogues, lengths)):
+            groups.setdefault(level, []).append(i)
+        return [(self.params(level), groups[level]) for level in sorted(groups, reverse=True)]
+
+    def describe(self, dialogues: Sequence[str], lengths: Sequence[int]) -> Dict[str, int]:
+        """단계별 대화 수 ('tier0', 'tier1', ..., 'base')"""
+        counts = Counter(self.levels(dialogues, lengths))
+        return {('base' if level == self.base_level else f'tier{level}'): counts[level]
+                for level in range(self.base_level + 1)}
+
+
+# ============================================================================
+# 생성 경로별 실행
+# ============================================================================
+
+def dialogue_lengths(tokenizer, dialogues: Sequence[str]) -> List[int]:
+    """대화별 토큰 수 (특수 토큰 포함, 패딩/자르기 없음)"""
+    texts = [d if isinstance(d, str) else str(d) for d in dialogues]
+    return [len(ids) for ids in tokenizer(texts)['input_ids']]
+
+
+def iter_summarize_routed(generator, dialogues: Sequence[str], prompt_template: str, router: DecodingRouter,
+                          tokenizer=None, lengths: Optional[Sequence[int]] = None
+                          ) -> Iterator[Tuple[List[int], List[str]]]:
+    """
+    BatchGenerator(또는 ParallelGenerator)로 설정 묶음별 스트리밍 요약
+
+    tokenizer / lengths: 대화별 토큰 수를 셀 토크나이저 또는 미리 센 토큰 수 (dialogue_lengths)
+        → 둘 다 없으면 generator.tokenizer (BatchGenerator만 있음, ParallelGenerator는 둘 중 하나 필요)
+
+    Yields:
+        (대화 위치들, 요약들) — BatchGenerator.iter_summarize와 같은 형식
+    """
+    dialogues = list(dialogues)
+    if lengths is None:
+        tokenizer = tokenizer if tokenizer is not None else getattr(generator, 'tokenizer', None)
+        if tokenizer is None:
+            raise ValueError('tokenizer 또는 lengths 필요 (generator에 tokenizer 없음)')
+        lengths = dialogue_lengths(tokenizer, dialogues)
+    for params, rows in router.route(dialogues, lengths):
+        for positions, summaries in generator.iter_summarize([dialogues[i] for i in rows], prompt_template, **params):
+            yield [rows[p] for p in positions], summaries
+
+
+def iter_generate_routed(model, tokenizer, dataset, dialogues: Sequence[str], router: DecodingRouter,
+                         batch_size: int = 32, indices: Optional[Sequence[int]] = None,
+                         **kwargs) -> Iterator[Tuple[List[int], List[str]]]:
+    """
+    KoBART 길이순 배치 생성 (bucketed_dataset.iter_generate)을 설정 묶음별로
+
+    dialogues: dataset과 같은 순서의 원문 대화 (주제 분류용), 토큰 수는 dataset.lengths
+    indices: 생성할 데이터셋 위치 (None이면 전체, 재개 시 남은 행만)
+    kwargs: 라우팅하지 않는 iter_generate 인자 (skip_special_tokens, progress)
+    """
+    from bucketed_dataset import iter_generate
+
+    indices = list(range(len(dataset))) if indices is None else list(indices)
+    dialogues = list(dialogues)
+    lengths = dataset.lengths
+    routes = router.route([dialogues[i] for i in indices], [int(lengths[i]) for i in indices])
+    for params, rows in routes:
+        yield from iter_generate(model, tokenizer, dataset, batch_size, indices=[indices[r] for r in rows],
+                                 **kwargs, **params)
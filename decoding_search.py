@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+디코딩 파라미터 적응형 탐색 (Successive Halving + Racing)
+=========================================================
+중첩 for 루프 그리드서치 대체: 전체 조합을 작은 Dev 조각에서 채점하고,
+살아남은 조합만 샘플 수를 늘려 다시 채점
+
+- 라운드(rung)마다 샘플 수 증가 (기본 10 → 20 → 40 → 80 → 160)
+  샘플은 고정 순열의 앞부분 → 이전 라운드에서 채점한 샘플은 그대로 재사용
+- 탈락 규칙 (라운드마다)
+  1) Racing: 현재 1위와의 샘플별 점수 차(대응 표본) 신뢰구간 하한이 0보다 크면 탈락 (확실히 나쁨)
+  2) Halving: 그래도 keep 비율보다 많이 남으면 평균 점수 순으로 자름
+- 실제 생성 결과가 같은 조합(예: num_beams=1에서 length_penalty만 다름)은 key가 같으면 한 번만 평가
+- 결과 저널(JSONL): 평가 직후 (조합 키, 샘플별 점수)를 추가 기록
+  → 중단 후 같은 저널로 다시 실행하면 남은 평가만 수행
+  → 헤더에 model_id (예: generation_cache.spec_fingerprint) → 어댑터 재학습/모델 교체 후에는 ValueError
+
+사용:
+    search = SuccessiveHalving(configs, evaluate_configs, n_samples=len(dev_df),
+                               journal='./grid_search_results/search_journal.jsonl',
+                               model_id=spec_fingerprint(MODEL_SPEC))
+    records = search.run()      # 조합별 도달 라운드, 샘플 수, 평균 점수, 신뢰구간
+
+    evaluate_configs(configs, samples) → (조합 수, 샘플 수, 지표 수) 샘플별 점수 배열
+        또는 (조합 위치, 샘플 위치, 점수 배열) 청크 이터레이터 (병렬 워커 결과를 도착 순서대로 저널에 기록)
+"""
+
+import itertools
+import json
+import math
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from generation_cache import canonical_params
+
+EvalChunk = Tuple[Sequence[int], Sequence[int], np.ndarray]
+Evaluate = Callable[[List[Mapping], List[int]], Union[np.ndarray, Iterable[EvalChunk]]]
+
+
+def expand_grid(space: Mapping[str, Sequence]) -> List[Dict]:
+    """{이름: 후보 값들} → 전체 조합 dict 리스트 (space의 키 순서대로 중첩)"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def config_key(config: Mapping) -> str:
+    """조합 dict의 정규 문자열 (저널/중복 제거 키)"""
+    return canonical_params(config)
+
+
+class SuccessiveHalving:
+    """
+    Successive Halving + Racing 탐색기
+
+    Args:
+        configs: 조합 dict 리스트 (evaluate에 그대로 전달, 결과 레코드에도 포함)
+        evaluate: (조합 리스트, 샘플 번호 리스트) → (조합, 샘플, 지표) 점수 배열
+            또는 (조합 위치, 샘플 위치, 점수 배열) 청크들 — 청크마다 바로 저널 기록
+        n_samples: 전체 평가 풀 크기 (Dev 행 수)
+        rungs: 라운드별 누적 샘플 수
+        keep: 라운드마다 남길 최대 비율
+        z: Racing 신뢰구간 배수 (1.96 ≈ 95%)
+        weights: 지표 가중치 → 목적 함수 = 가중합 × 100
+        metric_names: 지표 이름 (결과 레코드 컬럼)
+        key: 조합 → 키 (같은 키는 한 번만 평가)
+        journal: 결과 저널 경로 (None이면 기록 안 함)
+        model_id: 점수를 낸 모델/어댑터 식별자 (저널 헤더에 기록, 다르면 이어서 실행하지 않음)
+        seed: 샘플 순열 시드
+        verbose: 라운드별 진행 출력
+    """
+
+    def __init__(self, configs: Sequence[Mapping], evaluate: Evaluate, n_samples: int,
+                 rungs: Sequence[int] = (10, 20, 40, 80, 160), keep: float = 0.5, z: float = 1.96,
+                 weights: Sequence[float] = (0.4, 0.3, 0.3),
+                 metric_names: Sequence[str] = ('rouge1', 'rouge2', 'rougeL'),
+                 key: Callable[[Mapping], str] = config_key, journal: Optional[str] = None,
+                 model_id: Optional[str] = None, seed: int = 42, verbose: bool = True):
+        self.configs = list(configs)
+        self.evaluate = evaluate
+        self.n_samples = n_samples
+        self.rungs = sorted({min(r, n_samples) for r in rungs})
+        self.keep = keep
+        self.z = z
+        self.weights = np.asarray(weights, dtype=np.float64) * 100
+        self.metric_names = list(metric_names)
+        self.journal = journal
+        self.model_id = model_id
+        self.seed = seed
+        self.verbose = verbose
+
+        self.order = [int(i) for i in np.random.RandomState(seed).permutation(n_samples)]
+        self.keys = [key(config) for config in self.configs]
+        self.unique: Dict[str, Mapping] = {}
+        for k, config in zip(self.keys, self.configs):
+            self.unique.setdefault(k, config)
+
+        self.scores: Dict[str, Dict[int, np.ndarray]] = {k: {} for k in self.unique}
+        self.seconds: Dict[str, float] = {k: 0.0 for k in self.unique}
+        self.reached: Dict[str, int] = {}
+        self.finalists: List[str] = []
+        self.history: List[Dict] = []
+        self.evaluated = 0
+        if journal:
+            self._load_journal()
+
+    # ------------------------------------------------------------------
+    # 저널
+    # ------------------------------------------------------------------
+
+    def _header(self) -> Dict:
+        return {'seed': self.seed, 'n_samples': self.n_samples, 'metrics': self.metric_names, 'model': self.model_id}
+
+    def _load_journal(self):
+        if not os.path.exists(self.journal):
+            return
+        with open(self.journal, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if lines and lines[0].get('header') != self._header():
+            raise ValueError(f'저널 설정 불일치: {lines[0].get("header")} ≠ {self._header()} ({self.journal})')
+        for entry in lines[1:]:
+            scores = self.scores.get(entry['key'])
+            if scores is None:
+                continue  # 이번 탐색 공간에 없는 조합
+            scores.update((s, np.asarray(m)) for s, m in zip(entry['samples'], entry['metrics']))
+            self.seconds[entry['key']] += entry['seconds']
+
+    def _append_journal(self, entries: List[Dict]):
+        if not self.journal:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal)), exist_ok=True)
+        new_file = not os.path.exists(self.journal)
+        with open(self.journal, 'a', encoding='utf-8') as f:
+            if new_file:
+                f.write(json.dumps({'header': self._header()}) + '\n')
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    # ------------------------------------------------------------------
+    # 평가 / 탈락
+    # ------------------------------------------------------------------
+
+    def _evaluate(self, keys: List[str], samples: List[int]):
+        """keys 조합의 samples 중 아직 점수가 없는 것만 평가 (필요 샘플이 같은 조합끼리 묶어 호출)"""
+        groups: Dict[tuple, List[str]] = {}
+        for k in keys:
+            need = tuple(s for s in samples if s not in self.scores[k])
+            if need:
+                groups.setdefault(need, []).append(k)
+
+        for need, group in groups.items():
+            start = time.time()
+            result = self.evaluate([self.unique[k] for k in group], list(need))
+            if isinstance(result, (np.ndarray, list)):
+                result = [(range(len(group)), range(len(need)), result)]
+            for rows, cols, metrics in result:
+                now = time.time()
+                metrics = np.asarray(metrics, dtype=np.float64)
+                seconds = (now - start) / len(rows)
+                start = now
+                samples = [need[j] for j in cols]
+                entries = []
+                for row, row_metrics in zip(rows, metrics):
+                    k = group[row]
+                    self.scores[k].update(zip(samples, row_metrics))
+                    self.seconds[k] += seconds
+                    entries.append({'key': k, 'samples': samples, 'metrics': row_metrics.tolist(),
+                                    'seconds': seconds})
+                self._append_journal(entries)
+                self.evaluated += len(rows) * len(samples)
+
+    def _metrics(self, k: str, samples: List[int]) -> np.ndarray:
+        return np.stack([self.scores[k][s] for s in samples])
+
+    def objective(self, k: str, samples: List[int]) -> np.ndarray:
+        """샘플별 목적 함수 값 (지표 가중합 × 100)"""
+        return self._metrics(k, samples) @ self.weights
+
+    def _eliminate(self, alive: List[str], samples: List[int]) -> List[str]:
+        objective = {k: self.objective(k, samples) for k in alive}
+        ranked = sorted(alive, key=lambda k: objective[k].mean(), reverse=True)
+        leader = objective[ranked[0]]
+
+        survivors = [ranked[0]]
+        n = len(samples)
+        for k in ranked[1:]:
+            diff = leader - objective[k]
+            if n > 1 and diff.mean() - self.z * diff.std(ddof=1) / math.sqrt(n) > 0:
+                continue  # 1위보다 확실히 나쁨
+            survivors.append(k)
+        return survivors[:max(1, math.ceil(len(alive) * self.keep))]
+
+    def run(self) -> List[Dict]:
+        """전체 라운드 실행 → 조합별 결과 레코드"""
+        alive = list(self.unique)
+        for r, size in enumerate(self.rungs):
+            samples = self.order[:size]
+            before = self.evaluated
+            self._evaluate(alive, samples)
+            for k in alive:
+                self.reached[k] = r
+
+            last = r == len(self.rungs) - 1 or len(alive) == 1
+            survivors = alive if last else self._eliminate(alive, samples)
+            best = max(self.objective(k, samples).mean() for k in alive)
+            self.history.append({'rung': r, 'samples': size, 'configs': len(alive),
+                                 'survivors': len(survivors), 'evaluated': self.evaluated - before,
+                                 'best_score': best})
+            if self.verbose:
+                print(f"🏁 Rung {r}: {len(alive)} configs × {size} samples "
+                      f"(new evaluations {self.evaluated - before}) → {len(survivors)} survive, best {best:.2f}")
+            alive = survivors
+            if last:
+                break
+
+        self.finalists = alive
+        return self.records()
+
+    def records(self) -> List[Dict]:
+        """
+        조합별 결과 (입력 configs 순서)
+
+        score/metrics는 그 조합이 도달한 라운드의 샘플 기준 평균,
+        ci는 샘플별 목적 함수의 신뢰구간 반폭
+        """
+        records = []
+        for config, k in zip(self.configs, self.keys):
+            r = self.reached.get(k)
+            if r is None:
+                continue
+            samples = self.order[:self.rungs[r]]
+            objective = self.objective(k, samples)
+            metrics = self._metrics(k, samples).mean(axis=0)
+            n = len(samples)
+            ci = self.z * objective.std(ddof=1) / math.sqrt(n) if n > 1 else float('nan')
+            records.append({
+                **config,
+                **{name: float(m) for name, m in zip(self.metric_names, metrics)},
+                'score': float(objective.mean()),
+                'ci': float(ci),
+                'rung': r,
+                'n_samples': n,
+                'finalist': k in self.finalists,
+                'seconds': self.seconds[k],
+            })
+        return records
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+대화/정답 컬럼 저장소 + fname 조인 인덱스
+=========================================
+분석/후처리 스크립트마다 data/*.csv를 다시 읽고 fname → dialogue 매핑을 따로 만들던 것을 한 곳으로
+
+- train/dev/test.csv를 한 번 읽어 split 컬럼을 붙인 하나의 컬럼형 테이블로 저장
+  (./cache/dialogues.parquet, 원본 CSV의 크기/수정 시각이 바뀌면 다시 생성)
+  · pyarrow가 없으면 Parquet 캐시 없이 CSV에서 바로 로드
+- fname → 행 위치 해시 인덱스 (중복 fname은 마지막 행 기준, 기존 remove_hallucination과 동일)
+- join(): 예측 DataFrame/CSV의 fname으로 dialogue, 정답 요약(reference)을 위치 배열 take로 붙임
+  → 행 단위 dict 조회 없이 10만 행도 한 번의 get_indexer + take
+
+사용:
+    store = DialogueStore()
+    dev_df = store.frame('dev')                                   # pd.read_csv('./data/dev.csv')와 같은 컬럼
+    joined = store.join('./prediction/submit_solar_v4.csv')       # fname, summary, dialogue, reference
+    dialogues = store.lookup(v4['fname'], 'dialogue')             # 없는 fname은 NaN
+"""
+
+import json
+import os
+from typing import Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+SPLITS = ('train', 'dev', 'test')
+
+# join() 기본 컬럼: 저장소 컬럼 → 결과 컬럼 이름 (예측의 summary와 겹치지 않게 정답은 reference)
+JOIN_COLUMNS = {'dialogue': 'dialogue', 'summary': 'reference'}
+
+
+def _source_signature(path: str) -> dict:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class DialogueStore:
+    """
+    data/*.csv 통합 테이블 + fname 인덱스
+
+    Args:
+        data_dir: 원본 CSV 디렉터리 ({split}.csv)
+        splits: 읽을 split 이름 (없는 파일은 건너뜀)
+        cache_path: Parquet 캐시 경로 (None이면 캐시 안 함)
+    """
+
+    def __init__(self, data_dir: str = './data', splits: Sequence[str] = SPLITS,
+                 cache_path: Optional[str] = './cache/dialogues.parquet'):
+        self.data_dir = data_dir
+        self.sources = {split: os.path.join(data_dir, f'{split}.csv') for split in splits
+                        if os.path.exists(os.path.join(data_dir, f'{split}.csv'))}
+        if not self.sources:
+            raise FileNotFoundError(f'{data_dir}에 {", ".join(f"{s}.csv" for s in splits)} 없음')
+        self.cache_path = cache_path
+        self.table = self._load()
+
+        # 중복 fname은 마지막 행 → 뒤집어서 첫 등장만 남긴 뒤 원래 위치로 환산
+        fnames = self.table['fname'].to_numpy()
+        reversed_index = pd.Index(fnames[::-1])
+        keep = ~reversed_index.duplicated(keep='first')
+        self._positions = (len(fnames) - 1 - np.flatnonzero(keep))
+        self.index = pd.Index(fnames[::-1][keep])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, fname: str) -> bool:
+        return fname in self.index
+
+    # ------------------------------------------------------------------
+    # 로드 / 캐시
+    # ------------------------------------------------------------------
+
+    def _signature(self) -> dict:
+        return {split: _source_signature(path) for split, path in self.sources.items()}
+
+    def _load(self) -> pd.DataFrame:
+        signature = self._signature()
+        meta_path = f'{self.cache_path}.json' if self.cache_path else None
+        if meta_path and os.path.exists(meta_path) and os.path.exists(self.cache_path):
+            with open(meta_path, encoding='utf-8') as f:
+                if json.load(f) == signature:
+                    try:
+                        return pd.read_parquet(self.cache_path)
+                    except ImportError:
+                        pass
+
+        frames = []
+        for split, path in self.sources.items():
+            df = pd.read_csv(path)
+            df.insert(0, 'split', split)
+            frames.append(df)
+        table = pd.concat(frames, ignore_index=True)
+        if 'summary' not in table:
+            table['summary'] = None
+        table['split'] = table['split'].astype('category')
+
+        if self.cache_path:
+            self._save(table, signature, meta_path)
+        return table
+
+    def _save(self, table: pd.DataFrame, signature: dict, meta_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = f'{self.cache_path}.tmp{os.getpid()}'
+        try:
+            table.to_parquet(tmp_path, index=False)
+        except ImportError:  # pyarrow 없음 → 매번 CSV에서 로드
+            return
+        os.replace(tmp_path, self.cache_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(signature, f)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def frame(self, split: str) -> pd.DataFrame:
+        """split 하나의 원본 CSV 컬럼 DataFrame (summary가 없던 test는 summary 제외)"""
+        rows = self.table[self.table['split'] == split].drop(columns='split').reset_index(drop=True)
+        return rows.dropna(axis=1, how='all') if split == 'test' else rows
+
+    def positions(self, fnames) -> np.ndarray:
+        """fname별 테이블 행 위치 (없으면 -1)"""
+        found = self.index.get_indexer(pd.Index(fnames))
+        return np.where(found >= 0, self._positions[found], -1)
+
+    def _take(self, column: str, rows: np.ndarray) -> np.ndarray:
+        values = self.table[column].to_numpy(dtype=object).take(np.maximum(rows, 0))
+        values[rows < 0] = np.nan
+        return values
+
+    def lookup(self, fnames, column: str) -> pd.Series:
+        """fnames 순서의 column 값 (없는 fname은 NaN, 입력이 Series면 인덱스 유지)"""
+        values = self._take(column, self.positions(fnames))
+        index = fnames.index if isinstance(fnames, pd.Series) else None
+        return pd.Series(values, index=index, name=column)
+
+    def join(self, predictions: Union[str, pd.DataFrame],
+             columns: Mapping[str, str] = JOIN_COLUMNS) -> pd.DataFrame:
+        """
+        예측 DataFrame(또는 CSV 경로)에 fname 기준으로 저장소 컬럼을 붙인 사본
+
+        columns: {저장소 컬럼: 결과 컬럼 이름} (기본: dialogue, summary → reference)
+        """
+        if isinstance(predictions, str):
+            predictions = pd.read_csv(predictions)
+        joined = predictions.copy()
+        rows = self.positions(joined['fname'])
+        for column, name in columns.items():
+            joined[name] = self._take(column, rows)
+        return joined
@@ -3,63 +3,49 @@
 v4_smart_final 성능 검증
 """
 
-import pandas as pd
-from evaluate import load
+from candidate_compare import CandidateComparison, CandidateSet
+from dialogue_store import DialogueStore
 
 print("\n" + "="*80)
 print("📊 v4_smart_final 성능 검증 (Dev 셋 ROUGE 평가)")
 print("="*80)
 
-# 파일 로드
-v4_smart = pd.read_csv('./prediction/submit_solar_v4_smart_final.csv')
-v4_original = pd.read_csv('./prediction/submit_solar_v4.csv')
-v3_micro = pd.read_csv('./prediction/submit_solar_v3_microtuned.csv')
-dev_df = pd.read_csv('./data/dev.csv')
+# 파일 로드 (test.csv의 fname 순서로 맞춘 후보 행렬)
+store = DialogueStore()
+candidates = CandidateSet.from_paths({
+    'v4_smart_final': './prediction/submit_solar_v4_smart_final.csv',
+    'v4_original': './prediction/submit_solar_v4.csv',
+    'v3_microtuned': './prediction/submit_solar_v3_microtuned.csv',
+}, fnames=store.frame('test')['fname'])
+dev_df = store.frame('dev')
 
 print(f"\n📂 로드 완료:")
-print(f"  v4_smart_final: {len(v4_smart)}개")
-print(f"  v4_original: {len(v4_original)}개")
-print(f"  v3_microtuned: {len(v3_micro)}개")
+for name in candidates.names:
+    print(f"  {name}: {len(candidates.fnames)}개")
 print(f"  dev: {len(dev_df)}개")
 
-# ROUGE 평가
-rouge = load("rouge")
+# ROUGE 평가 (참조 1회 토큰화, 버전 간 같은 요약은 한 번만 채점)
+comparison = CandidateComparison(dev_df['summary'])
 
 print(f"\n⏳ ROUGE 평가 중...\n")
 
-versions = {
-    'v4_smart_final': v4_smart['summary'].tolist(),
-    'v4_original': v4_original['summary'].tolist(),
-    'v3_microtuned': v3_micro['summary'].tolist(),
-}
-
 results = {}
-for name, summaries in versions.items():
-    print(f"  평가 중: {name:20s}", end='', flush=True)
-    scores = rouge.compute(predictions=summaries, references=dev_df['summary'].tolist())
+scored = comparison.score(candidates)
+for name, scores in scored.corpus.items():
     results[name] = {
         'R1': scores['rouge1'] * 100,
         'R2': scores['rouge2'] * 100,
         'RL': scores['rougeL'] * 100,
         'Combined': (scores['rouge1'] + scores['rouge2'] + scores['rougeL']) / 3 * 100
     }
-    print(" ✅")
+    print(f"  평가 완료: {name:20s} ✅")
 
 # 결과 정리
 print(f"\n" + "="*80)
 print(f"📈 ROUGE 평가 결과")
 print(f"="*80 + "\n")
 
-results_df = pd.DataFrame([
-    {
-        'Version': k,
-        'R1': v['R1'],
-        'R2': v['R2'],
-        'RL': v['RL'],
-        'Combined': v['Combined']
-    }
-    for k, v in sorted(results.items(), key=lambda x: x[1]['Combined'], reverse=True)
-])
+results_df = scored.table
 
 print(results_df.to_string(index=False))
 
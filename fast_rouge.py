@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+빠른 ROUGE 채점기 (프로세스 내, 참조 1회 토큰화)
+=================================================
+evaluate의 rouge.compute()를 대체하는 ROUGE-1/2/L 채점기
+
+- 참조 요약은 생성 시 한 번만 토큰화, n-gram Counter와 LCS 비트마스크를 캐시
+- 여러 후보 버전을 한 번에 채점 → 코퍼스 평균 + 샘플별 NumPy 행렬
+- 버전 간 같은 행의 같은 요약은 한 번만 채점
+- 토크나이저 기본값은 rouge_score 기본 토크나이저와 동일 (소문자, [a-z0-9]만 유지)
+  → 샘플별 점수는 rouge_score/evaluate(use_aggregator=False)와 비트 단위로 동일
+- 형태소 ROUGE: tokenizer=MorphemeStore(...) (morpheme_store.py, Kiwi 분석 캐시)
+- 증분 재채점: 기준 실행(ScoredRun) 대비 바뀐 행만 채점하고 코퍼스 합계를 차분 갱신
+- 코퍼스 점수는 샘플 평균 (evaluate 기본값은 이 평균의 부트스트랩 중앙값)
+- LCS는 비트 병렬 알고리즘 (Hyyrö) → 행당 O(후보 길이)회의 정수 연산
+
+사용:
+    scorer = FastRouge(dev_df['summary'])
+    corpus, per_sample = scorer.score_versions({'v4': v4['summary'], 'v3': v3['summary']})
+    corpus['v4']['rouge2']        # 코퍼스 평균 F1
+    per_sample[0][:, 1]           # v4의 샘플별 ROUGE-2 F1
+
+    morph = FastRouge(dev_df['summary'], tokenizer=MorphemeStore('./cache/morphemes.npz'))
+
+    base = scorer.score_run(v4['summary'])                 # 기준 실행 (base.save()로 저장 가능)
+    tuned = scorer.rescore(base, tuned_smart)              # 바뀐 행만 채점
+    tuned.corpus['rouge2'], tuned.changed                  # 코퍼스 평균, 재채점된 행 번호
+"""
+
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+ROUGE_TYPES = ('rouge1', 'rouge2', 'rougeL')
+
+_ALPHANUM_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def rouge_tokenize(text: str) -> List[str]:
+    """
+    rouge_score 기본 토크나이저와 동일 (stemmer 없음)
+
+    소문자화 → [a-z0-9] 외 문자를 공백으로 치환 → 공백 분리 → 유효 토큰만 유지
+    과정은 소문자화 후 [a-z0-9]+ 연속 구간을 찾는 것과 같음
+    """
+    return _ALPHANUM_TOKEN.findall(text.lower())
+
+
+def _fmeasure(precision: float, recall: float) -> float:
+    if precision + recall > 0:
+        return 2 * precision * recall / (precision + recall)
+    return 0.0
+
+
+def _ngram_f(target: Counter, target_count: int, prediction: Counter, prediction_count: int) -> float:
+    """rouge_score._score_ngrams와 같은 순서로 계산한 F1"""
+    if len(prediction) < len(target):
+        overlap = sum(min(c, target[k]) for k, c in prediction.items() if k in target)
+    else:
+        overlap = sum(min(c, prediction[k]) for k, c in target.items() if k in prediction)
+    precision = overlap / max(prediction_count, 1)
+    recall = overlap / max(target_count, 1)
+    return _fmeasure(precision, recall)
+
+
+def _lcs_length(match_masks: Dict[int, int], length: int, prediction: Sequence[int]) -> int:
+    """비트 병렬 LCS 길이 (match_masks: 토큰 id → 참조 내 위치 비트마스크)"""
+    full = (1 << length) - 1
+    v = full
+    for token in prediction:
+        m = match_masks.get(token)
+        if m:
+            u = v & m
+            v = (v + u) | (v - u)
+    return length - (v & full).bit_count()
+
+
+class _Tokens:
+    """토큰 id 배열과 캐시된 유니그램/바이그램 Counter"""
+
+    __slots__ = ('ids', 'unigrams', 'bigrams')
+
+    def __init__(self, ids: List[int]):
+        self.ids = ids
+        self.unigrams = Counter(ids)
+        self.bigrams = Counter((a << 32) | b for a, b in zip(ids, ids[1:]))
+
+
+class _Reference(_Tokens):
+    """참조 요약: LCS용 위치 비트마스크까지 캐시"""
+
+    __slots__ = ('match_masks',)
+
+    def __init__(self, ids: List[int]):
+        super().__init__(ids)
+        masks: Dict[int, int] = {}
+        for pos, token in enumerate(ids):
+            masks[token] = masks.get(token, 0) | (1 << pos)
+        self.match_masks = masks
+
+
+class ScoredRun:
+    """
+    한 후보 컬럼의 채점 결과 (증분 재채점의 기준)
+
+    Attributes:
+        predictions: 채점한 요약 리스트
+        per_sample: (샘플 수, 3) F1 행렬
+        totals: 열별 F1 합계 (코퍼스 평균 = totals / 샘플 수)
+        changed: 기준 실행 대비 재채점된 행 번호 (처음부터 채점했으면 None)
+    """
+
+    def __init__(self, predictions: List[str], per_sample: np.ndarray,
+                 totals: Optional[np.ndarray] = None, changed: Optional[np.ndarray] = None):
+        self.predictions = predictions
+        self.per_sample = per_sample
+        self.totals = per_sample.sum(axis=0) if totals is None else totals
+        self.changed = changed
+
+    def __len__(self) -> int:
+        return len(self.predictions)
+
+    @property
+    def corpus(self) -> Dict[str, float]:
+        """evaluate rouge.compute()와 같은 형태의 코퍼스 점수"""
+        n = max(len(self.predictions), 1)
+        return {t: float(total / n) for t, total in zip(ROUGE_TYPES, self.totals)}
+
+    def save(self, path: str):
+        """요약과 샘플별 점수를 npz로 저장 (다음 세션의 기준 실행으로 재사용)"""
+        with open(path, 'wb') as f:
+            np.savez(f, predictions=np.array(self.predictions, dtype=str),
+                     per_sample=self.per_sample, totals=self.totals)
+
+    @classmethod
+    def load(cls, path: str) -> 'ScoredRun':
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['predictions'].tolist(), data['per_sample'], data['totals'])
+
+
+class FastRouge:
+    """
+    참조 요약 집합에 대한 ROUGE-1/2/L 채점기
+
+    Args:
+        references: 참조 요약 (dev_df['summary'] 등)
+        tokenizer: text → 토큰 리스트 (기본: rouge_score 기본 토크나이저)
+            encode_many(texts) → 토큰 id 리스트들 메서드가 있으면 배치로 호출
+            (MorphemeStore처럼 자체 사전/캐시를 가진 토크나이저)
+    """
+
+    def __init__(self, references: Sequence[str], tokenizer: Callable[[str], List[str]] = rouge_tokenize):
+        self.tokenizer = tokenizer
+        self._vocab: Dict[str, int] = {}
+        self.references = [_Reference(ids) for ids in self._encode_many(self._texts(references))]
+
+    def __len__(self) -> int:
+        return len(self.references)
+
+    @staticmethod
+    def _texts(column) -> List[str]:
+        return [t if isinstance(t, str) else str(t) for t in column]
+
+    def _encode_many(self, texts: List[str]) -> List[List[int]]:
+        encode_many = getattr(self.tokenizer, 'encode_many', None)
+        if encode_many is not None:
+            return encode_many(texts)
+        vocab = self._vocab
+        return [[vocab.setdefault(t, len(vocab)) for t in self.tokenizer(text)] for text in texts]
+
+    def _score_one(self, ref: _Reference, pred: _Tokens) -> Tuple[float, float, float]:
+        r1 = _ngram_f(ref.unigrams, len(ref.ids), pred.unigrams, len(pred.ids))
+        r2 = _ngram_f(ref.bigrams, max(len(ref.ids) - 1, 0), pred.bigrams, max(len(pred.ids) - 1, 0))
+        if ref.ids and pred.ids:
+            lcs = _lcs_length(ref.match_masks, len(ref.ids), pred.ids)
+            rl = _fmeasure(lcs / len(pred.ids), lcs / len(ref.ids))
+        else:
+            rl = 0.0
+        return r1, r2, rl
+
+    def _check_length(self, predictions: List[str]):
+        if len(predictions) != len(self.references):
+            raise ValueError(f'예측 {len(predictions)}개 ≠ 참조 {len(self.references)}개')
+
+    def _score_rows(self, rows: Sequence[int], texts: List[str]) -> np.ndarray:
+        """지정한 행만 채점 → (len(rows), 3) F1 행렬"""
+        unique = list(dict.fromkeys(texts))
+        encoded = {text: _Tokens(ids) for text, ids in zip(unique, self._encode_many(unique))}
+        scores = np.zeros((len(rows), len(ROUGE_TYPES)))
+        for k, (i, text) in enumerate(zip(rows, texts)):
+            scores[k] = self._score_one(self.references[i], encoded[text])
+        return scores
+
+    def score_rows(self, rows: Sequence[int], predictions: Sequence[str]) -> np.ndarray:
+        """일부 행만 채점 (rows[k] 행의 참조 vs predictions[k]) → (len(rows), 3) F1 행렬"""
+        rows = list(rows)
+        predictions = self._texts(predictions)
+        if len(rows) != len(predictions):
+            raise ValueError(f'행 {len(rows)}개 ≠ 예측 {len(predictions)}개')
+        return self._score_rows(rows, predictions)
+
+    def score_run(self, predictions: Sequence[str]) -> ScoredRun:
+        """전체 행 채점 → 증분 재채점의 기준 실행"""
+        predictions = self._texts(predictions)
+        self._check_length(predictions)
+        return ScoredRun(predictions, self._score_rows(range(len(predictions)), predictions))
+
+    def rescore(self, baseline: ScoredRun, candidate: Sequence[str]) -> ScoredRun:
+        """
+        기준 실행 대비 바뀐 행만 재채점
+
+        코퍼스 합계는 바뀐 행의 (새 점수 - 기존 점수)만 더해 갱신하므로
+        처음부터 채점한 평균과는 부동소수점 반올림 수준의 차이만 있음
+        """
+        candidate = self._texts(candidate)
+        self._check_length(candidate)
+        if len(baseline) != len(candidate):
+            raise ValueError(f'기준 실행 {len(baseline)}개 ≠ 후보 {len(candidate)}개')
+
+        changed = np.flatnonzero(np.array(baseline.predictions, dtype=object) != np.array(candidate, dtype=object))
+        per_sample = baseline.per_sample.copy()
+        if len(changed) == 0:
+            return ScoredRun(candidate, per_sample, baseline.totals.copy(), changed)
+
+        new_scores = self._score_rows(changed, [candidate[i] for i in changed])
+        totals = baseline.totals + (new_scores - per_sample[changed]).sum(axis=0)
+        per_sample[changed] = new_scores
+        return ScoredRun(candidate, per_sample, totals, changed)
+
+    def score(self, predictions: Sequence[str]) -> np.ndarray:
+        """샘플별 F1 행렬 (n, 3) — 열 순서는 ROUGE_TYPES"""
+        return self.score_versions({'_': predictions})[1][0]
+
+    def compute(self, predictions: Sequence[str]) -> Dict[str, float]:
+        """evaluate rouge.compute()와 같은 형태의 코퍼스 점수 (샘플 평균)"""
+        return self.score_versions({'_': predictions})[0]['_']
+
+    def score_versions(self, versions: Mapping[str, Sequence[str]]) -> Tuple[Dict[str, Dict[str, float]], np.ndarray]:
+        """
+        여러 후보 버전을 한 번에 채점
+
+        Returns:
+            corpus: {버전: {'rouge1': F1 평균, 'rouge2': ..., 'rougeL': ...}}
+            per_sample: (버전 수, 샘플 수, 3) F1 행렬 (버전 순서는 versions 순서)
+        """
+        names = list(versions)
+        columns = [self._texts(versions[name]) for name in names]
+        for predictions in columns:
+            self._check_length(predictions)
+
+        # 전체 버전의 고유 요약을 한 번에 토큰화
+        unique = list(dict.fromkeys(text for predictions in columns for text in predictions))
+        encoded = {text: _Tokens(ids) for text, ids in zip(unique, self._encode_many(unique))}
+
+        per_sample = np.zeros((len(names), len(self.references), len(ROUGE_TYPES)))
+        row_cache: List[Dict[str, Tuple[float, float, float]]] = [{} for _ in self.references]
+        for v, predictions in enumerate(columns):
+            for i, (ref, text) in enumerate(zip(self.references, predictions)):
+                scores = row_cache[i].get(text)
+                if scores is None:
+                    scores = row_cache[i][text] = self._score_one(ref, encoded[text])
+                per_sample[v, i] = scores
+
+        corpus = {}
+        for v, name in enumerate(names):
+            means = per_sample[v].mean(axis=0) if len(self.references) else np.zeros(len(ROUGE_TYPES))
+            corpus[name] = {t: float(m) for t, m in zip(ROUGE_TYPES, means)}
+        return corpus, per_sample
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+요약 샘플별 특징 저장소
+=======================
+분석 스크립트/노트북마다 길이, 문장 수, 바이그램 Counter, 어휘 다양성, 수식어, 불완전 종결을
+매번 다시 계산하던 것을 (파일, 내용 해시) 단위로 한 번만
+
+- extract_features(): 요약 컬럼 → 샘플별 특징 DataFrame
+  · words, sentences (re.split(r'[.!?]') 기준), modifiers, incomplete
+  · dup_bigrams / dup_bigram_counts: 요약 안에서 2번 이상 나온 공백 바이그램과 횟수 (리스트 컬럼)
+  · hallucination_scanner 특징 (numbers, long_sentences, conjunctions, spec_k) + quality_score
+- FeatureStore.load(path): CSV 내용 해시가 같으면 ./cache/features/{파일}-{해시}.parquet를 그대로 읽음
+  · 파일 단위 집계(어휘 다양성 등)는 같은 이름의 .json에 저장
+  · pyarrow가 없으면 캐시 없이 매번 계산
+- 비교 리포트는 특징 테이블의 group-by로: compare({'v4': 경로, ...}) → version 컬럼이 붙은 긴 테이블
+  → 새 후보 파일은 자기 특징만 계산
+
+사용:
+    features = FeatureStore()
+    table = features.compare({'v4': './prediction/submit_solar_v4.csv',
+                              'v3': './prediction/submit_solar_v3_microtuned.csv'})
+    table.groupby('version')['words'].agg(['mean', 'median', 'std', 'min', 'max'])
+    features.corpus_stats('./prediction/submit_solar_v4.csv')['lexical_diversity']
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from hallucination_scanner import HallucinationScanner
+from summary_stats import word_counts
+
+# 특징 계산 방식을 바꾸면 올릴 것 (기존 캐시 무효화)
+FEATURE_VERSION = 1
+
+MODIFIERS = ('매우', '정말', '아주', '꽤', '많이')
+COMPLETE_ENDINGS = ('.', '!', '?', '다', '요', '습니다', '니다')
+
+_SENT_END = re.compile(r'[.!?]')
+
+
+def _duplicate_bigrams(words: List[str]) -> Tuple[List[str], List[int]]:
+    """요약 안에서 2번 이상 나온 바이그램 (첫 등장 순서)과 횟수"""
+    counts = Counter(' '.join(words[i:i+2]) for i in range(len(words) - 1))
+    duplicates = [(bigram, count) for bigram, count in counts.items() if count > 1]
+    return [b for b, _ in duplicates], [c for _, c in duplicates]
+
+
+def extract_features(summaries: Sequence[str], scanner: Optional[HallucinationScanner] = None) -> pd.DataFrame:
+    """요약 컬럼 → 샘플별 특징 DataFrame (결측은 str(x)로 변환, 입력 순서 유지)"""
+    texts = [t if isinstance(t, str) else str(t) for t in summaries]
+    scanner = scanner or HallucinationScanner()
+
+    duplicates = [_duplicate_bigrams(t.split()) for t in texts]
+    frame = pd.DataFrame({
+        'words': word_counts(pd.Series(texts, dtype=object)).to_numpy(dtype=np.int64),
+        'sentences': np.fromiter((len(_SENT_END.split(t.strip())) for t in texts), dtype=np.int64, count=len(texts)),
+        'modifiers': np.fromiter((sum(t.count(m) for m in MODIFIERS) for t in texts),
+                                 dtype=np.int64, count=len(texts)),
+        'incomplete': np.fromiter((not t.strip().endswith(COMPLETE_ENDINGS) for t in texts),
+                                  dtype=bool, count=len(texts)),
+        'dup_bigrams': [b for b, _ in duplicates],
+        'dup_bigram_counts': [c for _, c in duplicates],
+    })
+    frame['repeated_bigrams'] = frame['dup_bigrams'].map(len).astype(np.int64)
+
+    scanned = scanner.scan_many(texts)
+    for k, name in enumerate(scanner.features):
+        frame[name] = scanned[:, k]
+    frame['quality_score'] = scanner.quality_scores(scanned)
+    return frame
+
+
+def corpus_stats(summaries: Sequence[str]) -> Dict[str, float]:
+    """파일 단위 집계 (어휘 다양성 = 전체 고유 단어 / 전체 단어)"""
+    words = [w for t in summaries for w in str(t).split()]
+    return {
+        'rows': len(summaries),
+        'words': len(words),
+        'unique_words': len(set(words)),
+        'lexical_diversity': len(set(words)) / len(words) if words else 0,
+    }
+
+
+def _content_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(f'features-v{FEATURE_VERSION}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """
+    (파일, 내용 해시) 단위 특징 테이블 캐시
+
+    Args:
+        root: 캐시 디렉터리 (None이면 캐시 안 함)
+        column: 요약 컬럼 이름
+    """
+
+    def __init__(self, root: Optional[str] = './cache/features', column: str = 'summary'):
+        self.root = root
+        self.column = column
+        self.scanner = HallucinationScanner()
+        self._loaded: Dict[str, Tuple[pd.DataFrame, Dict]] = {}
+
+    def _paths(self, path: str) -> Tuple[str, str]:
+        name = f"{os.path.splitext(os.path.basename(path))[0]}-{_content_digest(path)}"
+        prefix = os.path.join(self.root, name)
+        return prefix + '.parquet', prefix + '.json'
+
+    def _read(self, path: str) -> Tuple[pd.DataFrame, Dict]:
+        if path in self._loaded:
+            return self._loaded[path]
+        table_path = meta_path = None
+        if self.root:
+            table_path, meta_path = self._paths(path)
+            if os.path.exists(table_path) and os.path.exists(meta_path):
+                try:
+                    table = pd.read_parquet(table_path)
+                    with open(meta_path, encoding='utf-8') as f:
+                        result = self._loaded[path] = (table, json.load(f))
+                    return result
+                except ImportError:
+                    pass
+
+        df = pd.read_csv(path)
+        table = extract_features(df[self.column], self.scanner)
+        if 'fname' in df:
+            table.insert(0, 'fname', df['fname'].to_numpy())
+        meta = {'source': path, **corpus_stats(df[self.column])}
+        if self.root:
+            self._save(table, meta, table_path, meta_path)
+        self._loaded[path] = (table, meta)
+        return table, meta
+
+    def _save(self, table: pd.DataFrame, meta: Dict, table_path: str, meta_path: str):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f'{table_path}.tmp{os.getpid()}'
+        try:
+            table.to_parquet(tmp_path, index=False)
+        except ImportError:  # pyarrow 없음 → 매번 계산
+            return
+        os.replace(tmp_path, table_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def load(self, path: str) -> pd.DataFrame:
+        """CSV 1개의 샘플별 특징 테이블 (fname 컬럼이 있으면 포함)"""
+        return self._read(path)[0]
+
+    def corpus_stats(self, path: str) -> Dict:
+        """CSV 1개의 파일 단위 집계 (rows, words, unique_words, lexical_diversity)"""
+        return self._read(path)[1]
+
+    def compare(self, paths: Mapping[str, str]) -> pd.DataFrame:
+        """{버전 이름: CSV 경로} → version 컬럼을 붙여 이어붙인 특징 테이블"""
+        frames = [self.load(path).assign(version=name) for name, path in paths.items()]
+        table = pd.concat(frames, ignore_index=True)
+        table['version'] = pd.Categorical(table['version'], categories=list(paths))
+        return table
+
+
+def top_duplicate_bigrams(features: pd.DataFrame, n: int = 10) -> List[Tuple[str, int]]:
+    """샘플별 중복 바이그램을 모아 횟수 내림차순 상위 n개 (같은 횟수는 등장 순서)"""
+    pairs = [(b, int(c)) for bigrams, counts in zip(features['dup_bigrams'], features['dup_bigram_counts'])
+             for b, c in zip(bigrams, counts)]
+    return sorted(pairs, key=lambda x: x[1], reverse=True)[:n]
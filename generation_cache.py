@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+생성 결과 디스크 캐시
+=====================
+(모델, 어댑터 가중치, 프롬프트, 디코딩 파라미터) → 생성 텍스트를 SQLite 한 파일에 캐시
+
+- 키: 모델 지문 + 정규화한 generate() 파라미터 + 전체 프롬프트의 blake2b 해시
+  · 모델 지문: 베이스 모델 이름, dtype, 양자화 설정, 토크나이저 이름, LoRA 가중치 체크섬
+  · 파라미터 정규화: 키 순서 무관, 숫자 표기 무관 (1 == 1.0, numpy 스칼라 == float)
+- 값: 디코딩한 전체 텍스트 (프롬프트 포함) → 요약 추출은 호출 측에서 기존과 동일하게 수행
+- 크기 제한: 저장 텍스트 총 바이트가 max_bytes를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+- 샘플링(do_sample=True) 요청은 캐시하지 않음 (같은 요청이라도 결과가 달라야 함)
+- WAL 모드 → 여러 노트북/프로세스가 같은 파일을 동시에 읽고 써도 안전
+
+사용:
+    cache = GenerationCache('./cache/generations.sqlite')
+    generator = BatchGenerator(model, tokenizer, cache=cache)   # batch_generation.py
+    generator.summarize(test_df['dialogue'], PROMPTS['basic'], **params)   # 두 번째 실행부터 즉시 반환
+    print(cache.hits, cache.misses)
+"""
+
+import hashlib
+import json
+import numbers
+import os
+import sqlite3
+import time
+from typing import Dict, Mapping, Optional, Sequence
+
+_SQL_VARIABLES = 500  # IN (...) 한 번에 넣을 키 수
+
+
+def _canonical(value):
+    """JSON 직렬화용 정규형 (bool은 유지, 그 외 실수는 float로 통일)"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, Mapping):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return str(value)
+
+
+def canonical_params(params: Mapping) -> str:
+    """generate() 파라미터의 정규 JSON 문자열"""
+    return json.dumps(_canonical(params), sort_keys=True, ensure_ascii=False)
+
+
+def is_cacheable(params: Mapping) -> bool:
+    """결정적 디코딩만 캐시 (샘플링은 매번 새로 생성)"""
+    return not params.get('do_sample', False)
+
+
+def _adapter_checksum(model) -> Optional[str]:
+    """PeftModel이면 활성 어댑터 가중치의 체크섬 (아니면 None)"""
+    if not getattr(model, 'peft_config', None):
+        return None
+    import torch
+    from peft import get_peft_model_state_dict
+
+    digest = hashlib.blake2b(digest_size=16)
+    for name, tensor in sorted(get_peft_model_state_dict(model).items()):
+        digest.update(name.encode('utf-8'))
+        digest.update(tensor.detach().cpu().contiguous().view(-1).view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+def model_fingerprint(model, tokenizer) -> str:
+    """생성 결과에 영향을 주는 모델/토크나이저 식별 정보의 해시"""
+    config = getattr(model, 'config', None)
+    quantization = getattr(config, 'quantization_config', None)
+    if hasattr(quantization, 'to_dict'):
+        quantization = quantization.to_dict()
+    parts = {
+        'model': getattr(config, '_name_or_path', None) or type(model).__name__,
+        'dtype': str(getattr(model, 'dtype', '')),
+        'quantization': _canonical(quantization),
+        'tokenizer': getattr(tokenizer, 'name_or_path', None) or type(tokenizer).__name__,
+        'adapter': _adapter_checksum(model),
+        'active_adapter': _canonical(getattr(model, 'active_adapter', None)),
+    }
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def spec_fingerprint(spec: Mapping) -> str:
+    """
+    모델 스펙(grid_workers 형식) + 어댑터 파일 내용의 해시
+
+    모델을 로드하지 않는 프로세스(병렬 워커를 띄우는 노트북)에서 재학습/모델 교체를 감지할 때
+    """
+    digest = hashlib.blake2b(canonical_params(spec).encode('utf-8'), digest_size=16)
+    adapter = spec.get('adapter_path')
+    if adapter and os.path.isdir(adapter):
+        for name in sorted(os.listdir(adapter)):
+            if not name.startswith('adapter_'):  # adapter_config.json, adapter_model.safetensors/.bin
+                continue
+            digest.update(name.encode('utf-8'))
+            with open(os.path.join(adapter, name), 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def request_key(fingerprint: str, prompt: str, params: Mapping) -> str:
+    """(모델 지문, 파라미터, 프롬프트) → 캐시 키"""
+    payload = '\0'.join((fingerprint, canonical_params(params), prompt))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class GenerationCache:
+    """
+    생성 텍스트 SQLite 캐시 (LRU 크기 제한)
+
+    Args:
+        path: SQLite 파일 경로
+        max_bytes: 저장 텍스트 총 바이트 상한 (넘으면 오래 안 쓴 항목부터 삭제)
+    """
+
+    def __init__(self, path: str = './cache/generations.sqlite', max_bytes: int = 512 * 1024 ** 2):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS generations ('
+            'key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS generations_last_used ON generations(last_used)')
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM generations').fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM generations').fetchone()[0]
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, str]:
+        """캐시에 있는 키만 {키: 텍스트}로 반환하고 최근 사용 시각 갱신"""
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, str] = {}
+        for start in range(0, len(unique), _SQL_VARIABLES):
+            chunk = unique[start:start + _SQL_VARIABLES]
+            rows = self._conn.execute(
+                f"SELECT key, text FROM generations WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(rows)
+        if found:
+            now = time.time()
+            self._conn.executemany('UPDATE generations SET last_used = ? WHERE key = ?',
+                                   ((now, key) for key in found))
+            self._conn.commit()
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, items: Mapping[str, str]):
+        """{키: 텍스트} 저장 후 크기 상한 초과분 정리"""
+        if not items:
+            return
+        now = time.time()
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO generations (key, text, size, last_used) VALUES (?, ?, ?, ?)',
+            ((key, text, len(text.encode('utf-8')), now) for key, text in items.items()))
+        self._conn.commit()
+        self._evict()
+
+    def _evict(self):
+        excess = self.total_bytes - self.max_bytes
+        if excess <= 0:
+            return
+        stale = []
+        for key, size in self._conn.execute('SELECT key, size FROM generations ORDER BY last_used'):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany('DELETE FROM generations WHERE key = ?', stale)
+        self._conn.commit()
+
+    def clear(self):
+        self._conn.execute('DELETE FROM generations')
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
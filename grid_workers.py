@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+병렬 그리드서치 워커 풀
+=======================
+워커 프로세스마다 모델을 1번만 로드하고, (프롬프트, 대화들, 디코딩 설정들) 작업을 나눠 처리
+
+- GPU: GPU 1장당 워커 1개 (device_map을 해당 GPU로 고정)
+- CPU: 코어를 threads_per_worker개씩 나눠 워커 여러 개 + 작은 대체 모델 (CPU_STAND_IN_MODEL)
+- 작업 분할: 설정이 많으면 설정 묶음 단위 (대화 prefill 재사용 유지), 적으면 대화를 길이 고르게 나눠 분할
+- 결과는 완료되는 순서대로 부모 프로세스로 스트리밍 → 호출 측에서 바로 채점/저널 기록
+  · 작업 번호는 (호출 번호, 단위 번호) → 중단된 이전 호출의 늦은 결과는 다음 호출에서 버림
+- 생성 캐시(SQLite, WAL)는 모든 워커가 같은 파일을 공유
+- BatchGenerator와 같은 summarize / summarize_many / iter_summarize / iter_summarize_jobs 인터페이스
+
+사용:
+    with ParallelGenerator({'base_model': CONF['base_model'], 'adapter_path': CONF['adapter_path'],
+                            'load_in_4bit': True}, cache_path='./cache/generations.sqlite') as generator:
+        per_config = generator.summarize_many(dev_df['dialogue'], PROMPTS['basic'], [params_a, params_b])
+"""
+
+import itertools
+import math
+import multiprocessing as mp
+import os
+import queue
+import traceback
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+CPU_STAND_IN_MODEL = 'skt/kogpt2-base-v2'  # CPU 박스용 한국어 소형 causal LM
+
+Job = Tuple[str, Sequence[str], Sequence[Dict]]        # (프롬프트 템플릿, 대화들, 설정들)
+Chunk = Tuple[int, List[int], List[int], List[List[str]]]  # (작업 번호, 설정 위치, 대화 위치, 설정별 요약)
+
+
+def resolve_spec(spec: Mapping, device_count: Optional[int] = None) -> Dict:
+    """GPU가 없으면 베이스 모델을 CPU 대체 모델로 바꾼 스펙 (어댑터/4bit 제외)"""
+    if device_count is None:
+        import torch
+        device_count = torch.cuda.device_count()
+    if device_count > 0:
+        return dict(spec)
+    return {'base_model': spec.get('cpu_stand_in', CPU_STAND_IN_MODEL),
+            'trust_remote_code': spec.get('trust_remote_code', False)}
+
+
+def load_model(spec: Mapping, device: str):
+    """스펙대로 모델 + 토크나이저 로드 (노트북 모델 로드 셀과 같은 설정)"""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    kwargs = {'trust_remote_code': spec.get('trust_remote_code', False)}
+    if spec.get('load_in_4bit') and device.startswith('cuda'):
+        from transformers import BitsAndBytesConfig
+        kwargs['quantization_config'] = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.float16,
+            bnb_4bit_use_double_quant=False,
+        )
+    model = AutoModelForCausalLM.from_pretrained(spec['base_model'], device_map={'': device}, **kwargs)
+    if spec.get('adapter_path'):
+        from peft import PeftModel
+        model = PeftModel.from_pretrained(model, spec['adapter_path'])
+    model.eval()
+
+    tokenizer = AutoTokenizer.from_pretrained(spec['base_model'], trust_remote_code=kwargs['trust_remote_code'])
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    return model, tokenizer
+
+
+def _worker_main(spec, device, threads, cache_path, generator_kwargs, tasks, results):
+    """워커 프로세스: 모델 1회 로드 후 작업 큐 처리 (None이면 종료)"""
+    import torch
+    from batch_generation import BatchGenerator
+    from generation_cache import GenerationCache
+
+    if threads:
+        torch.set_num_threads(threads)
+    try:
+        model, tokenizer = load_model(spec, device)
+        cache = GenerationCache(cache_path) if cache_path else None
+        generator = BatchGenerator(model, tokenizer, progress=False, cache=cache, **generator_kwargs)
+    except Exception:
+        results.put(('error', None, traceback.format_exc()))
+        return
+    results.put(('ready', device, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, template, dialogues, param_list = task
+        try:
+            results.put(('done', task_id, generator.summarize_many(dialogues, template, param_list)))
+        except Exception:
+            results.put(('error', task_id, traceback.format_exc()))
+
+
+def _split(n: int, parts: int) -> List[List[int]]:
+    """0..n-1을 parts개로 교차 분할 (길이순 정렬된 입력도 묶음별 길이가 고르게)"""
+    parts = max(1, min(parts, n))
+    return [list(range(start, n, parts)) for start in range(parts)]
+
+
+class ParallelGenerator:
+    """
+    모델을 1번씩 로드한 워커 프로세스 풀
+
+    Args:
+        spec: 모델 스펙 {'base_model', 'adapter_path', 'load_in_4bit', 'trust_remote_code', 'cpu_stand_in'}
+        devices: 워커별 디바이스 (None: GPU마다 1개, GPU가 없으면 CPU 워커 여러 개)
+        threads_per_worker: CPU 워커당 torch 스레드 수
+        cache_path: 공유 생성 캐시 경로 (None이면 캐시 안 함)
+        **generator_kwargs: BatchGenerator 인자 (max_batch_tokens, max_batch_size, reuse_cache)
+    """
+
+    def __init__(self, spec: Mapping, devices: Optional[Sequence[str]] = None, threads_per_worker: int = 4,
+                 cache_path: Optional[str] = './cache/generations.sqlite', **generator_kwargs):
+        import torch
+
+        if devices is None:
+            gpus = torch.cuda.device_count()
+            devices = [f'cuda:{i}' for i in range(gpus)] or ['cpu'] * max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.devices = list(devices)
+        self.spec = resolve_spec(spec, sum(d.startswith('cuda') for d in self.devices))
+
+        context = mp.get_context('spawn')  # CUDA는 fork 불가
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._calls = itertools.count()  # iter_summarize_jobs 호출 번호 (작업 번호 앞부분)
+        self._workers = [
+            context.Process(
+                target=_worker_main,
+                args=(self.spec, device, threads_per_worker if device == 'cpu' else None, cache_path,
+                      generator_kwargs, self._tasks, self._results),
+                daemon=True,
+            )
+            for device in self.devices
+        ]
+        for worker in self._workers:
+            worker.start()
+        for _ in self._workers:
+            status, _, error = self._results.get()
+            if status == 'error':
+                self.close()
+                raise RuntimeError(f'워커 모델 로드 실패:\n{error}')
+
+    def __len__(self) -> int:
+        return len(self._workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for worker in self._workers:
+            if worker.is_alive():
+                self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=30)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def _units(self, n_configs: int, n_dialogues: int) -> List[Tuple[List[int], List[int]]]:
+        """작업 1개 → (설정 위치, 대화 위치) 단위들 (워커 수의 약 2배, 부하 분산용)"""
+        target = 2 * len(self._workers)
+        config_groups = _split(n_configs, target)
+        dialogue_groups = _split(n_dialogues, math.ceil(target / len(config_groups)))
+        return [(configs, dialogues) for configs in config_groups for dialogues in dialogue_groups]
+
+    def iter_summarize_jobs(self, jobs: Sequence[Job]) -> Iterator[Chunk]:
+        """
+        여러 작업을 한 번에 분배하고 완료되는 순서대로 청크 반환
+
+        중간에 멈추면 (워커 오류, KeyboardInterrupt, 소비자가 제너레이터를 버림) 아직 워커가 가져가지 않은
+        단위는 큐에서 빼고, 이미 처리 중인 단위의 결과는 다음 호출이 호출 번호로 걸러 버림
+        """
+        call_id = next(self._calls)
+        units = {}
+        for job_id, (template, dialogues, param_list) in enumerate(jobs):
+            dialogues, param_list = list(dialogues), list(param_list)
+            for configs, rows in self._units(len(param_list), len(dialogues)):
+                task_id = (call_id, len(units))
+                units[task_id] = (job_id, configs, rows)
+                self._tasks.put((task_id, template, [dialogues[i] for i in rows],
+                                 [param_list[c] for c in configs]))
+
+        pending = set(units)
+        try:
+            while pending:
+                status, task_id, payload = self._results.get()
+                if task_id not in pending:  # 이전 호출이 남긴 결과
+                    continue
+                pending.discard(task_id)
+                if status == 'error':
+                    raise RuntimeError(f'워커 생성 실패:\n{payload}')
+                job_id, configs, rows = units[task_id]
+                yield job_id, configs, rows, payload
+        finally:
+            if pending:
+                self._cancel_queued()
+
+    def _cancel_queued(self):
+        """워커가 아직 가져가지 않은 단위를 작업 큐에서 제거 (이번 호출은 끝났으므로 모두 버림)"""
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except queue.Empty:
+                return
+
+    def summarize_many(self, dialogues: Sequence[str], prompt_template: str,
+                       param_list: Sequence[Dict]) -> List[List[str]]:
+        """BatchGenerator.summarize_many와 같은 결과 (설정별 요약 리스트, 입력 순서)"""
+        dialogues, param_list = list(dialogues), list(param_list)
+        outputs: List[List[Optional[str]]] = [[None] * len(dialogues) for _ in param_list]
+        for _, configs, rows, summaries in self.iter_summarize_jobs([(prompt_template, dialogues, param_list)]):
+            for c, texts in zip(configs, summaries):
+                for i, text in zip(rows, texts):
+                    outputs[c][i] = text
+        return outputs
+
+    def iter_summarize(self, dialogues: Sequence[str], prompt_template: str,
+                       **params) -> Iterator[Tuple[List[int], List[str]]]:
+        """BatchGenerator.iter_summarize와 같은 인터페이스 (작업 단위가 끝날 때마다 반환)"""
+        for _, _, rows, summaries in self.iter_summarize_jobs([(prompt_template, list(dialogues), [params])]):
+            yield rows, summaries[0]
+
+    def summarize(self, dialogues: Sequence[str], prompt_template: str, **params) -> List[str]:
+        return self.summarize_many(dialogues, prompt_template, [params])[0]
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+대화 근거 기반 할루시네이션 검사
+================================
+요약 문장마다 원본 대화에 근거가 있는지 해시 집합 조회로 확인 (모델 호출 없음)
+
+- 대화마다 한 번만 근거 인덱스 생성 (같은 대화 텍스트는 공유)
+  · 숫자 집합 (쉼표 제거: 3,000 → 3000)
+  · #Person1#, #PhoneNumber# 같은 자리표시자 집합
+  · 어간 n-gram 집합: 1-gram(토큰 id), 2-gram, 앞 두 음절 (준비했다 ↔ 준비해요)
+- 요약 문장별 근거 확인: 모든 조회가 set 멤버십 (O(1))
+  · 대화에 없는 숫자/자리표시자가 있거나 내용어 근거 비율이 min_coverage 미만이면 근거 없는 문장
+- check_many(): 요약별 특징 DataFrame (근거 없는 문장/숫자/자리표시자 수, 1/2-gram 근거 비율)
+- strip_many(): 근거 없는 문장 제거 (전부 근거 없으면 근거 비율이 가장 높은 문장 하나는 유지)
+- 토크나이저 기본값은 조사/어미를 떼는 어절 어간, tokenizer=MorphemeStore(...)로 형태소 사용 가능
+
+사용:
+    joined = DialogueStore().join(v4)                        # fname으로 dialogue 조인
+    grounding = GroundingIndex(joined['dialogue'])
+    report = grounding.check_many(joined['summary'])         # 행 순서 = dialogue 순서
+    cleaned = grounding.strip_many(joined['summary'])
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)*')
+_PLACEHOLDER = re.compile(r'#[A-Za-z0-9]+#')
+_WORD = re.compile(r'[가-힣]+|[A-Za-z]+')
+
+# 어절 끝에서 떼는 조사/어미 (긴 것부터 비교)
+_SUFFIXES = tuple(sorted({
+    '은', '는', '이', '가', '을', '를', '에', '의', '도', '만', '와', '과', '로', '랑', '께',
+    '에서', '에게', '으로', '한테', '까지', '부터', '처럼', '보다', '께서', '이랑', '에는', '와의', '과의',
+    '에서는', '으로는', '에게는', '이라고', '라고', '에게서',
+    '합니다', '했습니다', '한다', '했다', '하고', '하며', '해서', '하기로', '하는', '했고', '하려고', '할',
+    '됩니다', '되었습니다', '된다', '됐다', '되어',
+}, key=len, reverse=True))
+
+# 요약 문체에서 대화 근거 없이 쓰이는 서술어/연결어 어간
+STOPWORDS = frozenset({
+    '말', '이야기', '설명', '대화', '요청', '제안', '질문', '대답', '언급', '생각', '동의', '결정',
+    '그리고', '또한', '하지만', '그러나', '따라서', '그래서', '위해', '대해', '때문', '그것', '이것',
+    '자신', '상대', '함께', '다른', '있습니다', '없습니다', '있다', '없다', '것으로', '같습니다',
+})
+
+
+def stem_tokenize(text: str) -> List[str]:
+    """한글/영문 어절 → 조사/어미를 뗀 어간 리스트 (숫자, 기호는 제외)"""
+    stems = []
+    for word in _WORD.findall(text):
+        for suffix in _SUFFIXES:
+            if len(word) > len(suffix) and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        stems.append(word.lower())
+    return stems
+
+
+def _numbers(text: str) -> List[str]:
+    """숫자 토큰 (#Person1#의 1처럼 자리표시자 안의 숫자는 제외)"""
+    return [n.replace(',', '') for n in _NUMBER.findall(_PLACEHOLDER.sub(' ', text))]
+
+
+class _Support:
+    """대화 1개의 근거 집합"""
+
+    __slots__ = ('numbers', 'placeholders', 'unigrams', 'bigrams', 'prefixes')
+
+    def __init__(self, numbers, placeholders, ids: List[int], stems: List[str]):
+        self.numbers = set(numbers)
+        self.placeholders = set(placeholders)
+        self.unigrams = set(ids)
+        self.bigrams = set(zip(ids, ids[1:]))
+        self.prefixes = {s[:2] for s in stems if len(s) >= 2}
+
+
+# check_many() 결과 컬럼
+FEATURES = ('sentences', 'unsupported_sentences', 'unsupported_numbers', 'unsupported_placeholders',
+            'coverage', 'bigram_coverage')
+
+
+class GroundingIndex:
+    """
+    대화별 근거 인덱스
+
+    Args:
+        dialogues: 원본 대화 (요약과 같은 행 순서, 결측이면 검사 생략)
+        tokenizer: text → 토큰 리스트 (기본: stem_tokenize, MorphemeStore 등)
+        min_coverage: 문장 내용어 중 대화에 근거가 있는 비율의 하한
+        stopwords: 근거 비율 계산에서 뺄 토큰
+    """
+
+    def __init__(self, dialogues: Sequence[Optional[str]], tokenizer: Callable[[str], List[str]] = stem_tokenize,
+                 min_coverage: float = 0.5, stopwords=STOPWORDS):
+        self.tokenizer = tokenizer
+        self.min_coverage = min_coverage
+        self.stopwords = frozenset(stopwords)
+        self._vocab: Dict[str, int] = {}
+
+        by_text: Dict[str, _Support] = {}
+        self.supports: List[Optional[_Support]] = []
+        for dialogue in dialogues:
+            if not isinstance(dialogue, str) or not dialogue:
+                self.supports.append(None)
+                continue
+            support = by_text.get(dialogue)
+            if support is None:
+                stems = self._stems(dialogue)
+                support = by_text[dialogue] = _Support(
+                    _numbers(dialogue), _PLACEHOLDER.findall(dialogue), self._ids(stems), stems)
+            self.supports.append(support)
+
+    def __len__(self) -> int:
+        return len(self.supports)
+
+    def _stems(self, text: str) -> List[str]:
+        return [t for t in self.tokenizer(_PLACEHOLDER.sub(' ', text)) if t]
+
+    def _ids(self, stems: List[str]) -> List[int]:
+        vocab = self._vocab
+        return [vocab.setdefault(s, len(vocab)) for s in stems]
+
+    # ------------------------------------------------------------------
+    # 문장 검사
+    # ------------------------------------------------------------------
+
+    def _sentence(self, support: _Support, sentence: str) -> Tuple[int, int, int, int, int, int]:
+        """(근거 없는 숫자, 근거 없는 자리표시자, 내용어 수, 근거 있는 내용어, 2-gram 수, 근거 있는 2-gram)"""
+        numbers = sum(n not in support.numbers for n in _numbers(sentence))
+        placeholders = sum(p not in support.placeholders for p in _PLACEHOLDER.findall(sentence))
+
+        stems = self._stems(sentence)
+        ids = [self._vocab.get(s, -1) for s in stems]
+        content = supported = 0
+        for stem, token in zip(stems, ids):
+            if len(stem) < 2 or stem in self.stopwords:
+                continue
+            content += 1
+            supported += token in support.unigrams or stem[:2] in support.prefixes
+        pairs = list(zip(ids, ids[1:]))
+        bigrams = sum(pair in support.bigrams for pair in pairs)
+        return numbers, placeholders, content, supported, len(pairs), bigrams
+
+    def _is_grounded(self, numbers: int, placeholders: int, content: int, supported: int) -> bool:
+        return not numbers and not placeholders and (not content or supported >= self.min_coverage * content)
+
+    def sentences(self, row: int, summary: str) -> List[Tuple[str, bool, float]]:
+        """요약 문장별 (문장, 근거 있음, 내용어 근거 비율)"""
+        support = self.supports[row]
+        result = []
+        for sentence in _SENT_SPLIT.split(summary.strip()):
+            if support is None:
+                result.append((sentence, True, 1.0))
+                continue
+            numbers, placeholders, content, supported, _, _ = self._sentence(support, sentence)
+            coverage = supported / content if content else 1.0
+            result.append((sentence, self._is_grounded(numbers, placeholders, content, supported), coverage))
+        return result
+
+    # ------------------------------------------------------------------
+    # 컬럼 단위
+    # ------------------------------------------------------------------
+
+    def check_many(self, summaries: Sequence[str]) -> pd.DataFrame:
+        """요약별 근거 특징 (FEATURES 컬럼, 대화가 없는 행은 근거 비율 NaN)"""
+        self._check_length(summaries)
+        features = np.zeros((len(self), len(FEATURES)))
+        for row, (support, summary) in enumerate(zip(self.supports, summaries)):
+            if support is None or not isinstance(summary, str):
+                features[row, 4:] = np.nan
+                continue
+            sentences = _SENT_SPLIT.split(summary.strip())
+            counts = [self._sentence(support, sentence) for sentence in sentences]
+            unsupported = sum(not self._is_grounded(*c[:4]) for c in counts)
+            numbers, placeholders, content, supported, pairs, bigrams = map(sum, zip(*counts))
+            features[row] = (len(sentences), unsupported, numbers, placeholders,
+                             supported / content if content else 1.0, bigrams / pairs if pairs else 1.0)
+        index = summaries.index if isinstance(summaries, pd.Series) else None
+        frame = pd.DataFrame(features, columns=FEATURES, index=index)
+        return frame.astype({name: 'int64' for name in FEATURES[:4]})
+
+    def strip(self, row: int, summary: str) -> str:
+        """근거 없는 문장 제거 (전부 근거 없으면 근거 비율이 가장 높은 문장 하나 유지)"""
+        if self.supports[row] is None or not isinstance(summary, str):
+            return summary
+        checked = self.sentences(row, summary)
+        kept = [sentence for sentence, grounded, _ in checked if grounded]
+        if len(kept) == len(checked):
+            return summary
+        if not kept:
+            kept = [max(checked, key=lambda c: c[2])[0]]
+        return ' '.join(kept)
+
+    def strip_many(self, summaries: Sequence[str]) -> List[str]:
+        self._check_length(summaries)
+        return [self.strip(row, summary) for row, summary in enumerate(summaries)]
+
+    def _check_length(self, summaries: Sequence[str]):
+        if len(summaries) != len(self):
+            raise ValueError(f'요약 {len(summaries)}개 ≠ 대화 {len(self)}개')
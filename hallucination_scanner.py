@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+할루시네이션 패턴 단일 패스 스캐너
+==================================
+detect_hallucinations의 패턴별 re.search 7회 + re.findall + re.split + str.count 6회를
+정규식 하나의 finditer 1회로
+
+- 추측 표현, 접속사, 숫자, 문장 종결부호를 alternation 하나로 컴파일
+  → 요약마다 한 번 훑으면서 모든 특징을 센다 (매칭 문자열 → 특징 분류는 사전으로 캐시)
+  (패턴끼리 겹쳐 매칭될 수 없어 패턴별 개별 스캔과 같은 결과)
+- 30단어 초과 문장 수는 요약 전체가 30단어를 넘을 때만 문장을 나눠 계산
+- scan_many(): 컬럼 → (요약 수, 특징 수) NumPy 행렬, 같은 요약은 한 번만 스캔
+- scan_versions(): 여러 후보 파일을 한 번에 (버전 간 같은 요약도 공유)
+- quality_scores(): 특징 행렬 → 기존 품질 점수 (0~100) 벡터 계산
+
+사용:
+    scanner = HallucinationScanner()
+    features = scanner.scan_many(v4['summary'])          # scanner.features 순서의 컬럼
+    scores = scanner.quality_scores(features)            # detect_hallucinations()['quality_score']와 동일
+    matrices = scanner.scan_versions({'v4': v4['summary'], 'v3': v3['summary']})
+"""
+
+import re
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+SPECULATION_PATTERNS = (
+    r'것으로\s*보입니다',
+    r'것으로\s*생각됩니다',
+    r'것으로\s*추정됩니다',
+    r'인\s*것\s*같습니다',
+    r'듯\s*합니다',
+    r'아마도',
+    r'추측',
+)
+
+CONJUNCTIONS = ('그리고', '또한', '하지만', '그러나', '따라서', '그래서')
+
+_SENT_END = re.compile(r'[.!?]')
+
+
+class HallucinationScanner:
+    """
+    추측/접속사/숫자/긴 문장 특징 스캐너
+
+    Args:
+        speculation: 추측 표현 정규식들 (특징은 패턴별 포함 여부)
+        conjunctions: 접속사 리터럴들 (특징은 합계 등장 횟수)
+        long_sentence_words: 이 단어 수를 넘는 문장을 긴 문장으로 셈
+    """
+
+    def __init__(self, speculation: Sequence[str] = SPECULATION_PATTERNS,
+                 conjunctions: Sequence[str] = CONJUNCTIONS, long_sentence_words: int = 30):
+        self.speculation = list(speculation)
+        self.conjunctions = list(conjunctions)
+        self.long_sentence_words = long_sentence_words
+
+        # 모든 분기가 리터럴 글자로 시작하도록 구성 (\d+ → 0\d*|1\d*|..., ASCII 숫자로 시작하는 수만 셈)
+        # → CPython re가 첫 글자 집합으로 후보 위치를 빠르게 건너뜀 (캡처 그룹이 있으면 이 최적화가 꺼짐)
+        alternatives = list(self.speculation) + [re.escape(c) for c in self.conjunctions]
+        alternatives += [f'{d}\\d*' for d in '0123456789'] + [r'\.', '!', r'\?']
+        self.regex = re.compile('|'.join(f'(?:{a})' for a in alternatives))
+        self._speculation = [re.compile(pattern) for pattern in self.speculation]
+        self._kinds: Dict[str, int] = {}
+
+        self.features = ['numbers', 'long_sentences', 'conjunctions']
+        self.features += [f'spec_{k}' for k in range(len(self.speculation))]
+
+    # ------------------------------------------------------------------
+    # 스캔
+    # ------------------------------------------------------------------
+
+    def _kind(self, token: str) -> int:
+        """매칭 문자열 → 특징 열 (-1: 종결부호), 같은 문자열은 한 번만 분류"""
+        kind = self._kinds.get(token)
+        if kind is None:
+            if token in '.!?':
+                kind = -1
+            elif token[0].isdigit():
+                kind = 0
+            elif token in self.conjunctions:
+                kind = 2
+            else:  # alternation과 같은 순서로 처음 전체 매칭되는 추측 패턴
+                kind = next(3 + k for k, regex in enumerate(self._speculation) if regex.fullmatch(token))
+            self._kinds[token] = kind
+        return kind
+
+    def scan(self, summary: str) -> List[int]:
+        """요약 1개 → 특징 리스트 (self.features 순서)"""
+        row = [0] * len(self.features)
+        kinds = self._kinds
+        for token in self.regex.findall(summary):
+            k = kinds.get(token)
+            if k is None:
+                k = self._kind(token)
+            if k >= 0:
+                row[k] += 1
+        for k in range(3, len(row)):  # 추측 표현은 포함 여부
+            if row[k]:
+                row[k] = 1
+
+        limit = self.long_sentence_words
+        if len(summary.split()) > limit:  # 전체가 limit 이하면 어떤 문장도 넘을 수 없음
+            row[1] = sum(len(sentence.split()) > limit for sentence in _SENT_END.split(summary))
+        return row
+
+    def scan_many(self, column) -> np.ndarray:
+        """컬럼 → (요약 수, 특징 수) 행렬 (같은 요약은 한 번만 스캔, 결측은 str()로 변환)"""
+        texts = [t if isinstance(t, str) else str(t) for t in column]
+        unique = {text: self.scan(text) for text in dict.fromkeys(texts)}
+        return np.array([unique[text] for text in texts], dtype=np.int64).reshape(len(texts), len(self.features))
+
+    def scan_versions(self, versions: Mapping[str, Sequence[str]]) -> Dict[str, np.ndarray]:
+        """{버전 이름: 요약 컬럼} → {버전 이름: 특징 행렬} (버전 간 같은 요약도 한 번만 스캔)"""
+        texts: Dict[str, List[str]] = {
+            name: [t if isinstance(t, str) else str(t) for t in column] for name, column in versions.items()}
+        unique = {text: self.scan(text) for column in texts.values() for text in dict.fromkeys(column)}
+        width = len(self.features)
+        return {name: np.array([unique[t] for t in column], dtype=np.int64).reshape(len(column), width)
+                for name, column in texts.items()}
+
+    # ------------------------------------------------------------------
+    # 점수 / 이슈
+    # ------------------------------------------------------------------
+
+    def issue_counts(self, features: np.ndarray) -> np.ndarray:
+        """(과도한 세부사항, 추측 표현, 근거 없는 주장) 이슈 수 → (요약 수, 3)"""
+        features = np.atleast_2d(features)
+        excessive = (features[:, 0] > 5).astype(np.int64) + (features[:, 1] > 0)
+        speculation = features[:, 3:].sum(axis=1)
+        unsupported = (features[:, 2] > 3).astype(np.int64)
+        return np.stack([excessive, speculation, unsupported], axis=1)
+
+    def quality_scores(self, features: np.ndarray) -> np.ndarray:
+        """품질 점수 (100 - 세부사항 10 - 추측 15 - 주장 10, 하한 0)"""
+        counts = self.issue_counts(features)
+        return np.maximum(0, 100 - counts @ np.array([10, 15, 10]))
+
+    def issues(self, row: np.ndarray) -> dict:
+        """특징 벡터 1개 → detect_hallucinations()와 같은 형식의 이슈 dict"""
+        row = [int(v) for v in row]
+        issues = {'excessive_details': [], 'speculation': [], 'unsupported_claims': [], 'quality_score': 0}
+        if row[0] > 5:
+            issues['excessive_details'].append(f'과도한 숫자: {row[0]}개')
+        issues['speculation'] = [p for p, present in zip(self.speculation, row[3:]) if present]
+        if row[1]:
+            issues['excessive_details'].append(f'과도하게 긴 문장: {row[1]}개')
+        if row[2] > 3:
+            issues['unsupported_claims'].append(f'과도한 접속사: {row[2]}개')
+        issues['quality_score'] = int(self.quality_scores(row)[0])
+        return issues
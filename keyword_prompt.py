@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+TF-IDF 키워드 프롬프트 보강 (희소 인덱스 캐시)
+==============================================
+gem_b0의 TFIDFKeywordExtractor처럼 대화마다 vectorizer.transform([text]) → toarray() → argsort를
+반복하던 키워드 추출을, 학습 1회 + 희소 행렬 연산 1회로 (config.yaml prompt 블록)
+
+- KeywordIndex.load_or_fit(): train 대화로 TF-IDF를 한 번 학습 (설정은 gem_b0 추출기와 동일)
+  · 어휘는 JSON, IDF는 대각 희소 행렬 .npz(scipy)로 ./cache/tfidf/에 저장
+  · 키: train 대화 내용 해시 + TF-IDF 설정 → 바뀌면 다시 학습
+- transform(): 대화 전체 → (대화 수, 어휘 수) CSR 행렬 (sklearn TfidfVectorizer.transform과 동일 값)
+  · transform_file(): dev/test CSV의 행렬을 내용 해시 단위로 .npz 캐시
+- top_k(): 모든 행의 상위 k개 어휘를 lexsort 한 번으로 (행 단위 Python 루프 없음)
+  · 점수 내림차순, 같은 점수는 어휘 순서
+- KeywordPrompter: config.yaml prompt (use_prompt, tfidf_top_k, prompt_style) → 대화 앞에 키워드 줄 추가
+  → gem_b0 KoBART 추론 입력 앞에 붙임 (기존 베이스라인도 추론 시에만 추가)
+  → SOLAR {dialogue} 자리에 넣으려면 학습 프롬프트(format_instruction)에도 같은 줄을 넣고 다시 학습할 것
+
+사용:
+    index = KeywordIndex.load_or_fit(train_df['dialogue'])
+    keywords = index.keyword_strings(test_df['dialogue'], k=5)          # ['회의 / 예약 / ...', ...]
+
+    prompter = KeywordPrompter.from_config(index)                        # config.yaml prompt 블록
+    prefixes = prompter.prefixes(test_df['dialogue'])                    # KoBART (토큰 단위로 앞에 붙임)
+    dialogues = prompter.augment(test_df['dialogue'])                    # 키워드 줄 + 대화
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+# gem_b0 TFIDFKeywordExtractor와 같은 TF-IDF 설정
+TFIDF_SETTINGS = {
+    'max_features': 2000,
+    'ngram_range': (1, 2),
+    'token_pattern': r'[가-힣]+',  # 한글만 추출
+    'min_df': 2,
+    'max_df': 0.9,
+}
+
+# prompt_style → 대화 앞에 붙일 키워드 줄 ({keywords}: ' / '로 이은 상위 k개)
+KEYWORD_TEMPLATES = {
+    'minimal': '키워드: {keywords}\n',
+    'balanced': '주요 키워드: {keywords}. ',
+    'detailed': '이 대화의 핵심 키워드는 {keywords}입니다. 키워드를 중심으로 요약하세요.\n',
+}
+
+_MASK = re.compile(r'#\w+#')
+
+
+def _clean(texts: Sequence[str]) -> List[str]:
+    """#Person1# 같은 마스킹 토큰 제거"""
+    return [_MASK.sub(' ', t if isinstance(t, str) else str(t)) for t in texts]
+
+
+def _digest(texts: Sequence[str], settings: Dict) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class KeywordIndex:
+    """
+    학습된 TF-IDF 어휘 + IDF (저장/로드 가능)
+
+    Args:
+        terms: 어휘 (열 순서)
+        idf: 어휘별 IDF
+        settings: TF-IDF 설정 (TFIDF_SETTINGS 형식)
+    """
+
+    def __init__(self, terms: Sequence[str], idf: np.ndarray, settings: Dict = TFIDF_SETTINGS):
+        self.terms = np.asarray(terms, dtype=object)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.settings = dict(settings)
+        self.key: Optional[str] = None  # 학습 데이터 해시 (transform_file 캐시 키)
+        self._vectorizer = None
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    # ------------------------------------------------------------------
+    # 학습 / 저장
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def fit(cls, dialogues: Sequence[str], **settings) -> 'KeywordIndex':
+        """train 대화로 TF-IDF 학습"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        settings = {**TFIDF_SETTINGS, **settings}
+        vectorizer = TfidfVectorizer(**settings)
+        vectorizer.fit(_clean(dialogues))
+        return cls(vectorizer.get_feature_names_out(), vectorizer.idf_, settings)
+
+    @classmethod
+    def load_or_fit(cls, dialogues: Sequence[str], root: str = './cache/tfidf', **settings) -> 'KeywordIndex':
+        """train 대화 내용 + 설정이 같으면 저장된 어휘/IDF 로드, 아니면 학습 후 저장"""
+        settings = {**TFIDF_SETTINGS, **settings}
+        settings['ngram_range'] = list(settings['ngram_range'])
+        texts = _clean(dialogues)
+        key = _digest(texts, settings)
+        prefix = os.path.join(root, f'model-{key}')
+        if os.path.exists(prefix + '.npz') and os.path.exists(prefix + '.json'):
+            index = cls.load(prefix)
+        else:
+            index = cls.fit(texts, **{**settings, 'ngram_range': tuple(settings['ngram_range'])})
+            index.save(prefix)
+        index.key = key
+        return index
+
+    def save(self, prefix: str):
+        """{prefix}.npz (IDF 대각 희소 행렬) + {prefix}.json (어휘, 설정)"""
+        os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+        tmp_path = f'{prefix}.tmp{os.getpid()}.npz'
+        sp.save_npz(tmp_path, sp.diags(self.idf, format='csr'))
+        settings = {**self.settings, 'ngram_range': list(self.settings['ngram_range'])}
+        with open(prefix + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'terms': self.terms.tolist(), 'settings': settings}, f, ensure_ascii=False)
+        os.replace(tmp_path, prefix + '.npz')
+
+    @classmethod
+    def load(cls, prefix: str) -> 'KeywordIndex':
+        with open(prefix + '.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        settings = {**meta['settings'], 'ngram_range': tuple(meta['settings']['ngram_range'])}
+        return cls(meta['terms'], sp.load_npz(prefix + '.npz').diagonal(), settings)
+
+    # ------------------------------------------------------------------
+    # 변환 / 키워드
+    # ------------------------------------------------------------------
+
+    @property
+    def vectorizer(self):
+        """고정 어휘 CountVectorizer (학습 없이 transform 가능)"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import CountVectorizer
+
+            self._vectorizer = CountVectorizer(
+                vocabulary={term: i for i, term in enumerate(self.terms)},
+                ngram_range=tuple(self.settings['ngram_range']),
+                token_pattern=self.settings['token_pattern'],
+            )
+        return self._vectorizer
+
+    def transform(self, dialogues: Sequence[str]) -> sp.csr_matrix:
+        """대화들 → L2 정규화 TF-IDF CSR 행렬 (TfidfVectorizer.transform과 같은 값)"""
+        counts = self.vectorizer.transform(_clean(dialogues)).astype(np.float64)
+        weighted = sp.csr_matrix(counts.multiply(self.idf[np.newaxis, :]))
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.csr_matrix(sp.diags(1.0 / norms) @ weighted)
+
+    def transform_file(self, path: str, column: str = 'dialogue', root: str = './cache/tfidf') -> sp.csr_matrix:
+        """CSV 1개의 TF-IDF 행렬 ((파일 내용, 모델) 단위 .npz 캐시)"""
+        import pandas as pd
+
+        texts = _clean(pd.read_csv(path)[column])
+        name = os.path.splitext(os.path.basename(path))[0]
+        cache_path = os.path.join(root, f"{name}-{_digest(texts, {'model': self.key or ''})}.npz")
+        if self.key and os.path.exists(cache_path):
+            return sp.load_npz(cache_path).tocsr()
+        matrix = self.transform(texts)
+        if self.key:
+            os.makedirs(root, exist_ok=True)
+            tmp_path = f'{cache_path}.tmp{os.getpid()}.npz'
+            sp.save_npz(tmp_path, matrix)
+            os.replace(tmp_path, cache_path)
+        return matrix
+
+    @staticmethod
+    def top_k(matrix: sp.csr_matrix, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        행별 상위 k개 열 (점수 > 0, 내림차순, 같은 점수는 열 순서)
+
+        Returns:
+            offsets: (행 수 + 1,) — 행 i의 결과는 columns[offsets[i]:offsets[i+1]]
+            columns: 선택된 열 번호
+        """
+        matrix = sp.csr_matrix(matrix)
+        matrix.eliminate_zeros()
+        nnz_per_row = np.diff(matrix.indptr)
+        rows = np.repeat(np.arange(matrix.shape[0]), nnz_per_row)
+        order = np.lexsort((matrix.indices, -matrix.data, rows))
+        rank = np.arange(len(order)) - matrix.indptr[rows[order]]
+        selected = order[rank < k]
+        offsets = np.concatenate([[0], np.cumsum(np.minimum(nnz_per_row, k))])
+        return offsets, matrix.indices[selected]
+
+    def keywords(self, dialogues_or_matrix, k: int = 5) -> List[List[str]]:
+        """대화들(또는 transform 결과 행렬) → 행별 상위 k개 키워드"""
+        matrix = dialogues_or_matrix if sp.issparse(dialogues_or_matrix) else self.transform(dialogues_or_matrix)
+        offsets, columns = self.top_k(matrix, k)
+        terms = self.terms[columns].tolist()
+        return [terms[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def keyword_strings(self, dialogues_or_matrix, k: int = 5, sep: str = ' / ') -> List[str]:
+        """행별 키워드 문자열 (키워드가 없으면 '')"""
+        return [sep.join(words) for words in self.keywords(dialogues_or_matrix, k)]
+
+
+class KeywordPrompter:
+    """
+    대화 앞에 TF-IDF 키워드 줄을 붙이는 프롬프트 보강 단계
+
+    Args:
+        index: 학습된 KeywordIndex
+        top_k: 대화당 키워드 수
+        style: KEYWORD_TEMPLATES 키 (config.yaml prompt.prompt_style)
+        enabled: False면 대화를 그대로 반환 (config.yaml prompt.use_prompt)
+    """
+
+    def __init__(self, index: KeywordIndex, top_k: int = 5, style: str = 'balanced', enabled: bool = True):
+        if style not in KEYWORD_TEMPLATES:
+            raise ValueError(f'알 수 없는 prompt_style: {style} (가능: {", ".join(KEYWORD_TEMPLATES)})')
+        self.index = index
+        self.top_k = top_k
+        self.template = KEYWORD_TEMPLATES[style]
+        self.enabled = enabled
+
+    @classmethod
+    def from_config(cls, index: KeywordIndex, config_path: str = './config.yaml') -> 'KeywordPrompter':
+        import yaml
+
+        with open(config_path, encoding='utf-8') as f:
+            conf = yaml.safe_load(f).get('prompt') or {}
+        return cls(index, top_k=conf.get('tfidf_top_k', 5), style=conf.get('prompt_style', 'balanced'),
+                   enabled=conf.get('use_prompt', True))
+
+    def prefixes(self, dialogues: Sequence[str], matrix: Optional[sp.csr_matrix] = None) -> List[str]:
+        """대화별 키워드 줄 (꺼져 있거나 키워드가 없으면 '', KoBART처럼 토큰 단위로 앞에 붙일 때)"""
+        dialogues = [d if isinstance(d, str) else str(d) for d in dialogues]
+        if not self.enabled:
+            return [''] * len(dialogues)
+        keywords = self.index.keyword_strings(dialogues if matrix is None else matrix, self.top_k)
+        return [self.template.format(keywords=words) if words else '' for words in keywords]
+
+    def augment(self, dialogues: Sequence[str], matrix: Optional[sp.csr_matrix] = None) -> List[str]:
+        """키워드 줄 + 대화 (키워드가 없는 대화는 그대로, matrix: 미리 계산한 transform 결과)"""
+        dialogues = [d if isinstance(d, str) else str(d) for d in dialogues]
+        return [prefix + dialogue for prefix, dialogue in zip(self.prefixes(dialogues, matrix), dialogues)]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Kiwi 형태소 분석 캐시
+======================
+형태소 ROUGE용 형태소 시퀀스를 텍스트 내용 해시 기준으로 디스크에 캐시
+
+- 키: 텍스트 UTF-8의 blake2b-128 해시 → 같은 요약은 몇 번을 채점해도 1회만 분석
+- 저장: 형태소 id(uint32) 연속 배열 + 오프셋 + 형태소 사전을 npz 한 파일로 저장
+- 캐시에 없는 텍스트만 모아 Kiwi 멀티스레드 배치 분석 (kiwi.tokenize(list))
+- Kiwi 버전이 바뀌면 캐시 무효화
+- 파일 저장은 새 텍스트가 save_every개 쌓일 때, with 블록 종료, 인터프리터 종료 시에만
+  → 텍스트 1개씩 tokenize()로 불러도 새 텍스트마다 npz 전체를 다시 쓰지 않음
+
+사용:
+    with MorphemeStore('./cache/morphemes.npz') as store:
+        rouge = FastRouge(dev_df['summary'], tokenizer=store)   # 형태소 ROUGE
+        store.tokenize('회의를 하고 있습니다')                    # ['회의', '를', '하', '고', ...]
+"""
+
+import atexit
+import hashlib
+import os
+import weakref
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class MorphemeStore:
+    """
+    텍스트 → Kiwi 형태소 id 시퀀스 캐시
+
+    Args:
+        path: 캐시 파일 경로 (.npz), None이면 메모리 캐시만 사용
+        num_workers: Kiwi 분석 스레드 수 (-1: 전체 코어)
+        autosave: 저장 안 한 새 텍스트가 save_every개 이상이면 encode_many 끝에 저장, 종료 시에도 저장
+        save_every: autosave 기준 텍스트 수
+    """
+
+    def __init__(self, path: Optional[str] = './cache/morphemes.npz', num_workers: int = -1,
+                 autosave: bool = True, save_every: int = 4096):
+        self.path = path
+        self.num_workers = num_workers
+        self.autosave = autosave
+        self.save_every = save_every
+        self._kiwi = None
+        self._vocab: Dict[str, int] = {}
+        self._forms: List[str] = []
+        self._index: Dict[bytes, int] = {}
+        self._sequences: List[List[int]] = []
+        self._dirty = False
+        self._unsaved = 0
+        if path and os.path.exists(path):
+            self._load()
+        if path and autosave:
+            ref = weakref.ref(self)
+            atexit.register(lambda: ref() is not None and ref().save())
+
+    def __enter__(self) -> 'MorphemeStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def __len__(self) -> int:
+        return len(self._sequences)
+
+    # ------------------------------------------------------------------
+    # 분석
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _analyzer_version() -> str:
+        import kiwipiepy
+        return kiwipiepy.__version__
+
+    def _analyzer(self):
+        if self._kiwi is None:
+            from kiwipiepy import Kiwi
+            self._kiwi = Kiwi(num_workers=self.num_workers)
+        return self._kiwi
+
+    def _form_id(self, form: str) -> int:
+        form_id = self._vocab.get(form)
+        if form_id is None:
+            form_id = self._vocab[form] = len(self._forms)
+            self._forms.append(form)
+        return form_id
+
+    def encode_many(self, texts: Sequence[str]) -> List[List[int]]:
+        """텍스트별 형태소 id 리스트 (캐시에 없는 텍스트만 배치 분석)"""
+        keys = [_text_key(t) for t in texts]
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self._index and key not in missing:
+                missing[key] = text
+
+        if missing:
+            analyzed = self._analyzer().tokenize(list(missing.values()))
+            for key, tokens in zip(missing, analyzed):
+                self._index[key] = len(self._sequences)
+                self._sequences.append([self._form_id(t.form) for t in tokens])
+            self._dirty = True
+            self._unsaved += len(missing)
+            if self.autosave and self._unsaved >= self.save_every:
+                self.save()
+
+        return [self._sequences[self._index[key]] for key in keys]
+
+    def tokenize(self, text: str) -> List[str]:
+        """형태소 문자열 리스트 (노트북의 morpheme_tokenize와 같은 결과)"""
+        return [self._forms[i] for i in self.encode_many([text])[0]]
+
+    __call__ = tokenize
+
+    # ------------------------------------------------------------------
+    # 디스크 입출력
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as data:
+            if str(data['kiwi_version']) != self._analyzer_version():
+                return
+            self._forms = data['forms'].tolist()
+            self._vocab = {form: i for i, form in enumerate(self._forms)}
+            offsets = data['offsets']
+            ids = data['ids'].tolist()
+            self._sequences = [ids[offsets[k]:offsets[k + 1]] for k in range(len(offsets) - 1)]
+            self._index = {key.tobytes(): k for k, key in enumerate(data['keys'])}
+
+    def save(self):
+        """캐시 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+        if not self.path or not self._dirty:
+            return
+        keys = np.zeros((len(self._sequences), 16), dtype=np.uint8)
+        for key, k in self._index.items():
+            keys[k] = np.frombuffer(key, dtype=np.uint8)
+        lengths = np.fromiter((len(s) for s in self._sequences), dtype=np.int64, count=len(self._sequences))
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        ids = np.fromiter((i for s in self._sequences for i in s), dtype=np.uint32, count=int(offsets[-1]))
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, keys=keys, offsets=offsets, ids=ids,
+                     forms=np.array(self._forms, dtype=str),
+                     kiwi_version=np.array(self._analyzer_version()))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._unsaved = 0
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+자리표시자 단일 패스 스캐너 + 화자 수/개인정보 지시문 (config.yaml regex_pattern)
+==============================================================================
+config.yaml tokenizer.special_tokens의 자리표시자 22개(#Person1# … #SSN#)를 정규식 하나로 컴파일해
+대화마다 화자 수와 등장한 개인정보 종류를 한 번에 구하고, 그 결과로 대화별 지시문을 만듦
+
+- PlaceholderScanner: 토큰 목록 → '#(?:Address|Alex|...)#' alternation 1개 (리터럴 '#'로 시작)
+  · #PersonN# 은 화자 (서로 다른 번호 수), 나머지는 개인정보 종류 (포함 여부)
+  · scan_many(): 컬럼 → (대화 수, 1 + 개인정보 종류 수) 행렬, 같은 대화는 한 번만 스캔
+- InstructionBuilder: regex_pattern (use_speaker_count, use_pii_instruction, show_pii_examples) → 지시문
+  · 지시문은 (화자 수, 개인정보 조합) 단위로 한 번만 만들어 재사용
+  · augment(): 지시문 + 대화 (keyword_prompt.KeywordPrompter.augment와 같은 형식)
+- 노트북 clean_text의 자기 자신으로 바꾸는 re.sub 10회(#PhoneNumber# → #PhoneNumber# 등)는
+  결과가 같으므로 제거하고, 자리표시자 확인은 이 스캐너로
+
+사용:
+    builder = InstructionBuilder.from_config()                          # config.yaml
+    features = builder.scanner.scan_many(train_df['dialogue'])          # builder.scanner.features 순서
+    prompts = [V2_PROMPT.format(dialogue=d) for d in builder.augment(test_df['dialogue'])]
+
+    python placeholder_scanner.py [./data/train.csv]
+"""
+
+import re
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# config.yaml tokenizer.special_tokens와 같은 목록
+SPECIAL_TOKENS = (
+    '#Address#', '#Alex#', '#Bob#', '#CarNumber#', '#CardNumber#', '#DateOfBirth#', '#Email#', '#Kristin#',
+    '#Liliana#', '#Name#', '#PassportNumber#', '#Person1#', '#Person2#', '#Person3#', '#Person4#', '#Person5#',
+    '#Person6#', '#Person7#', '#PersonName#', '#PhoneNumber#', '#Price#', '#SSN#',
+)
+
+# 개인정보 자리표시자 → 지시문에 쓸 이름 (없는 토큰은 '#'을 뗀 이름 그대로)
+PII_LABELS = {
+    '#Address#': '주소',
+    '#CarNumber#': '차량 번호',
+    '#CardNumber#': '카드 번호',
+    '#DateOfBirth#': '생년월일',
+    '#Email#': '이메일',
+    '#PassportNumber#': '여권 번호',
+    '#PhoneNumber#': '전화번호',
+    '#Price#': '가격',
+    '#SSN#': '주민등록번호',
+    '#Name#': '이름',
+    '#PersonName#': '이름',
+    '#Alex#': '이름',
+    '#Bob#': '이름',
+    '#Kristin#': '이름',
+    '#Liliana#': '이름',
+}
+
+SPEAKER_TEMPLATE = '화자 {count}명의 대화입니다.'
+PII_TEMPLATE = '개인정보 {items} 자리표시자는 요약에도 그대로 쓰세요.'
+
+_SPEAKER = re.compile(r'#Person\d+#')
+
+
+class PlaceholderScanner:
+    """
+    화자/개인정보 자리표시자 스캐너
+
+    Args:
+        tokens: 자리표시자 목록 (config.yaml tokenizer.special_tokens 형식, '#이름#')
+    """
+
+    def __init__(self, tokens: Sequence[str] = SPECIAL_TOKENS):
+        tokens = list(dict.fromkeys(tokens))
+        bad = [t for t in tokens if not (len(t) > 2 and t[0] == t[-1] == '#')]
+        if bad:
+            raise ValueError(f"'#이름#' 형식이 아닌 토큰: {bad}")
+        self.speakers = [t for t in tokens if _SPEAKER.fullmatch(t)]
+        self.pii = [t for t in tokens if not _SPEAKER.fullmatch(t)]
+        self.features = ['speakers'] + self.pii
+
+        # 모든 분기가 '#'으로 시작 → 후보 위치를 첫 글자로 건너뜀, 긴 이름부터 (Person1 / PersonName)
+        names = sorted((re.escape(t[1:-1]) for t in tokens), key=len, reverse=True)
+        self.regex = re.compile(f"#(?:{'|'.join(names)})#")
+        # 토큰 → 열 (-1: 화자)
+        self._columns: Dict[str, int] = {t: -1 for t in self.speakers}
+        self._columns.update({t: 1 + k for k, t in enumerate(self.pii)})
+
+    @classmethod
+    def from_config(cls, config_path: str = './config.yaml') -> 'PlaceholderScanner':
+        """config.yaml tokenizer.special_tokens로 생성 (없으면 SPECIAL_TOKENS)"""
+        import yaml
+
+        with open(config_path, encoding='utf-8') as f:
+            conf = yaml.safe_load(f).get('tokenizer') or {}
+        return cls(conf.get('special_tokens') or SPECIAL_TOKENS)
+
+    def scan(self, dialogue: str) -> List[int]:
+        """대화 1개 → [화자 수, 개인정보 종류별 포함 여부...] (self.features 순서)"""
+        row = [0] * len(self.features)
+        columns = self._columns
+        for token in set(self.regex.findall(dialogue)):
+            k = columns[token]
+            if k < 0:
+                row[0] += 1
+            else:
+                row[k] = 1
+        return row
+
+    def scan_many(self, column) -> np.ndarray:
+        """컬럼 → (대화 수, 특징 수) 행렬 (같은 대화는 한 번만 스캔, 결측은 str()로 변환)"""
+        texts = [t if isinstance(t, str) else str(t) for t in column]
+        unique = {text: self.scan(text) for text in dict.fromkeys(texts)}
+        return np.array([unique[text] for text in texts], dtype=np.int64).reshape(len(texts), len(self.features))
+
+    def present(self, row: Sequence[int]) -> List[str]:
+        """특징 행 1개 → 포함된 개인정보 자리표시자 목록"""
+        return [token for token, flag in zip(self.pii, row[1:]) if flag]
+
+
+class InstructionBuilder:
+    """
+    스캔 결과 → 대화별 지시문
+
+    Args:
+        scanner: PlaceholderScanner (None이면 SPECIAL_TOKENS)
+        use_speaker_count: 화자 수 문장 포함 (config.yaml regex_pattern.use_speaker_count)
+        use_pii_instruction: 개인정보 자리표시자 보존 문장 포함 (regex_pattern.use_pii_instruction)
+        show_pii_examples: 보존 문장에 실제 자리표시자 예시 표시 (regex_pattern.show_pii_examples)
+    """
+
+    def __init__(self, scanner: Optional[PlaceholderScanner] = None, use_speaker_count: bool = True,
+                 use_pii_instruction: bool = True, show_pii_examples: bool = True):
+        self.scanner = scanner or PlaceholderScanner()
+        self.use_speaker_count = use_speaker_count
+        self.use_pii_instruction = use_pii_instruction
+        self.show_pii_examples = show_pii_examples
+        self._cache: Dict[Tuple[int, ...], str] = {}
+
+    @classmethod
+    def from_config(cls, config_path: str = './config.yaml') -> 'InstructionBuilder':
+        """config.yaml의 tokenizer.special_tokens + regex_pattern 블록으로 생성"""
+        import yaml
+
+        with open(config_path, encoding='utf-8') as f:
+            conf = yaml.safe_load(f)
+        flags = conf.get('regex_pattern') or {}
+        tokens = (conf.get('tokenizer') or {}).get('special_tokens') or SPECIAL_TOKENS
+        return cls(
+            PlaceholderScanner(tokens),
+            use_speaker_count=flags.get('use_speaker_count', True),
+            use_pii_instruction=flags.get('use_pii_instruction', True),
+            show_pii_examples=flags.get('show_pii_examples', True),
+        )
+
+    def _pii_sentence(self, tokens: List[str]) -> str:
+        # 같은 이름(예: 이름 ← #Name#, #Alex#)끼리 묶음, 순서는 대화 속 위치가 아닌 토큰 목록(scanner.pii) 순서
+        groups: Dict[str, List[str]] = {}
+        for token in tokens:
+            groups.setdefault(PII_LABELS.get(token, token.strip('#')), []).append(token)
+        if self.show_pii_examples:
+            items = ', '.join(f"{label}({', '.join(examples)})" for label, examples in groups.items())
+        else:
+            items = ', '.join(groups)
+        return PII_TEMPLATE.format(items=items)
+
+    def instruction(self, row: Sequence[int]) -> str:
+        """특징 행 1개 → 지시문 (해당 문장이 없으면 '')"""
+        key = tuple(int(v) for v in row)
+        text = self._cache.get(key)
+        if text is None:
+            sentences = []
+            if self.use_speaker_count and key[0]:
+                sentences.append(SPEAKER_TEMPLATE.format(count=key[0]))
+            present = self.scanner.present(key)
+            if self.use_pii_instruction and present:
+                sentences.append(self._pii_sentence(present))
+            text = self._cache[key] = ' '.join(sentences) + '\n' if sentences else ''
+        return text
+
+    def instructions(self, dialogues: Sequence[str], features: Optional[np.ndarray] = None) -> List[str]:
+        """대화들 → 지시문들 (features: 미리 계산한 scan_many 결과)"""
+        features = self.scanner.scan_many(dialogues) if features is None else features
+        return [self.instruction(row) for row in features.tolist()]
+
+    def augment(self, dialogues: Sequence[str], features: Optional[np.ndarray] = None) -> List[str]:
+        """지시문 + 대화 (지시문이 없는 대화는 그대로)"""
+        dialogues = [d if isinstance(d, str) else str(d) for d in dialogues]
+        return [text + dialogue for text, dialogue in zip(self.instructions(dialogues, features), dialogues)]
+
+
+if __name__ == '__main__':
+    import os
+    import time
+
+    import pandas as pd
+
+    path = sys.argv[1] if len(sys.argv) > 1 else './data/train.csv'
+    builder = InstructionBuilder.from_config() if os.path.exists('./config.yaml') else InstructionBuilder()
+    scanner = builder.scanner
+    dialogues = pd.read_csv(path)['dialogue']
+
+    print("\n" + "="*80)
+    print(f"🔎 자리표시자 스캔: {path} ({len(dialogues):,}개 대화, 자리표시자 {len(scanner.speakers) + len(scanner.pii)}종)")
+    print("="*80)
+
+    start = time.perf_counter()
+    features = scanner.scan_many(dialogues)
+    instructions = builder.instructions(dialogues, features)
+    elapsed = time.perf_counter() - start
+    print(f"\n⏱️  스캔 + 지시문: {elapsed:.3f}초 (고유 지시문 {len(set(instructions)):,}개)")
+
+    speakers = pd.Series(features[:, 0]).value_counts().sort_index()
+    print("\n👥 화자 수 분포:")
+    for count, n in speakers.items():
+        print(f"  {count}명: {n:,}개 ({n / len(features) * 100:.1f}%)")
+
+    print("\n🔒 개인정보 자리표시자 포함 대화 수:")
+    for token, n in sorted(zip(scanner.pii, features[:, 1:].sum(axis=0)), key=lambda x: -x[1]):
+        if n:
+            print(f"  {token:<18} {n:,}개")
+
+    sample = next((i for i in range(len(instructions)) if scanner.present(features[i])), 0)
+    print(f"\n📝 지시문 예시:\n  {instructions[sample].strip() or '(없음)'}")
+    print(f"\n" + "="*80 + "\n")
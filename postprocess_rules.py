@@ -0,0 +1,702 @@
+#!/usr/bin/env python3
+"""
+후처리 규칙 엔진
+==================
+smart/focused 미세조정, 할루시네이션 제거 스크립트의 re.sub 체인을
+한 번만 컴파일해서 재사용하는 규칙 엔진
+
+- 규칙은 (pattern, replacement) 튜플 또는 str -> str 함수의 순서 있는 리스트
+- 패턴은 체인 생성 시 한 번만 컴파일
+- 서로 간섭하지 않는 리터럴 규칙 (예: 하고\\s+있습니다, 하고\\s+있다)은
+  선행 리터럴 기준 트라이 패턴 하나로 병합, 필수 접두사가 없으면 스캔 생략
+- \\s+ → ' ' + strip() 조합은 ' '.join(s.split())으로 대체
+- apply()는 컬럼 전체를 한 번에 처리 (구분자로 이어붙여 패스당 1회 스캔)
+- config.yaml의 postprocess 블록에 정의된 프로파일(conservative/moderate/
+  aggressive/focused/smart ...)을 ProfileSet으로 로드, 여러 프로파일을
+  한 번에 적용하면 공통 접두사 단계는 한 번만 계산
+- 출력은 기존 함수 체인과 바이트 단위로 동일 (benchmark_postprocess.py로 검증)
+"""
+
+import re
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+Rule = Tuple[str, str]
+Step = Union[Rule, Callable[[str], str]]
+
+# 컬럼 모드에서 요약들을 이어붙일 때 쓰는 구분자
+# (\s, 리터럴, 긍정 문자 클래스로만 이루어진 패턴은 \x00을 매칭할 수 없음)
+_SEP = '\x00'
+
+# 리터럴 규칙 분석용 공백 구간 심볼 (\s+ / \s*)
+_WS = object()
+
+_REGEX_META = set('.^$*+?{}[]|()')
+
+
+# ============================================================================
+# 규칙 분석
+# ============================================================================
+
+def _literal_variants(pattern: str) -> Optional[List[tuple]]:
+    """
+    리터럴 + 공백 구간(\\s+, \\s*)만으로 된 패턴을 심볼 시퀀스로 변환
+
+    \\s*는 '공백 있음/없음' 두 가지로 전개한다.
+    병합 대상이 아니면 None.
+    """
+    symbols = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            if i + 1 >= len(pattern):
+                return None
+            nxt = pattern[i + 1]
+            if nxt == 's' and i + 2 < len(pattern) and pattern[i + 2] in '+*':
+                symbols.append((_WS, pattern[i + 2]))
+                i += 3
+                continue
+            if nxt.isalnum() or nxt.isspace() or nxt == '_':
+                return None
+            symbols.append(nxt)
+            i += 2
+            continue
+        if c in _REGEX_META or c.isspace():
+            return None
+        symbols.append(c)
+        i += 1
+
+    # 공백 구간으로 시작하면 매칭 범위가 모호해지므로 병합하지 않음
+    if not symbols or not isinstance(symbols[0], str):
+        return None
+
+    variants = [[]]
+    for sym in symbols:
+        if isinstance(sym, str):
+            for v in variants:
+                v.append(sym)
+        elif sym[1] == '+':
+            for v in variants:
+                if not v or v[-1] is not _WS:
+                    v.append(_WS)
+        else:
+            expanded = []
+            for v in variants:
+                expanded.append(list(v))
+                if not v or v[-1] is not _WS:
+                    v = v + [_WS]
+                expanded.append(v)
+            variants = expanded
+    return [tuple(v) for v in variants]
+
+
+def _replacement_symbols(replacement: str) -> tuple:
+    """치환 문자열의 공백 연속 구간을 _WS 하나로 접은 심볼 시퀀스"""
+    symbols = []
+    for c in replacement:
+        if c.isspace():
+            if not symbols or symbols[-1] is not _WS:
+                symbols.append(_WS)
+        else:
+            symbols.append(c)
+    return tuple(symbols)
+
+
+def _compatible(a, b) -> bool:
+    if a is _WS or b is _WS:
+        return (a is _WS or a.isspace()) and (b is _WS or b.isspace())
+    return a == b
+
+
+def _can_overlap(p: tuple, q: tuple) -> bool:
+    """p와 q가 어떤 문자열에서 한 글자 이상 겹쳐서 놓일 수 있는지"""
+    for k in range(-len(q) + 1, len(p)):
+        if all(_compatible(p[i], q[i - k])
+               for i in range(max(0, k), min(len(p), k + len(q)))):
+            return True
+    return False
+
+
+def _independent(earlier: Rule, later: Rule) -> bool:
+    """
+    두 리터럴 규칙을 어떤 순서로 적용해도 (동시에 적용해도) 결과가 같은지
+
+    1. 두 패턴의 매칭 구간이 겹칠 수 없어야 하고
+    2. 한 규칙의 치환 결과가 다른 규칙의 새 매칭을 만들 수 없어야 함
+    """
+    earlier_variants = _literal_variants(earlier[0])
+    later_variants = _literal_variants(later[0])
+    for p in earlier_variants:
+        for q in later_variants:
+            if _can_overlap(p, q):
+                return False
+    for replacement, variants in ((earlier[1], later_variants), (later[1], earlier_variants)):
+        symbols = _replacement_symbols(replacement)
+        if not symbols:
+            return False  # 빈 치환은 양옆 문맥을 붙여 새 매칭을 만들 수 있음
+        if any(_can_overlap(symbols, v) for v in variants):
+            return False
+    return True
+
+
+def _literal_head(pattern: str) -> Tuple[str, str]:
+    """리터럴 규칙 패턴을 (선행 리터럴 문자열, 나머지 패턴 소스)로 분리"""
+    head = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == '\\':
+            if pattern[i + 1] == 's':
+                break
+            head.append(pattern[i + 1])
+            i += 2
+        else:
+            head.append(pattern[i])
+            i += 1
+    return ''.join(head), pattern[i:]
+
+
+def _required_prefix(parsed) -> str:
+    """매칭이 반드시 시작하는 리터럴 접두사 (없으면 빈 문자열)"""
+    if parsed.state.flags & re.IGNORECASE:
+        return ''
+    chars = []
+    for op, av in parsed:
+        if op is not sre_parse.LITERAL:
+            break
+        chars.append(chr(av))
+    return ''.join(chars)
+
+
+_SAFE_CATEGORIES = {
+    sre_parse.CATEGORY_SPACE,
+    sre_parse.CATEGORY_DIGIT,
+    sre_parse.CATEGORY_WORD,
+}
+
+
+def _never_matches_sep(parsed) -> bool:
+    """파싱된 패턴의 어떤 부분도 구분자(\\x00)를 매칭할 수 없는지"""
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            if av == 0:
+                return False
+        elif op is sre_parse.IN:
+            for item_op, item_av in av:
+                if item_op is sre_parse.NEGATE:
+                    return False
+                if item_op is sre_parse.LITERAL and item_av == 0:
+                    return False
+                if item_op is sre_parse.RANGE and item_av[0] <= 0 <= item_av[1]:
+                    return False
+                if item_op is sre_parse.CATEGORY and item_av not in _SAFE_CATEGORIES:
+                    return False
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            if not _never_matches_sep(av[2]):
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            if not _never_matches_sep(av[-1]):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not all(_never_matches_sep(branch) for branch in av[1]):
+                return False
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if not _never_matches_sep(av[1]):
+                return False
+        elif op is sre_parse.AT:
+            if av not in (sre_parse.AT_BOUNDARY, sre_parse.AT_NON_BOUNDARY):
+                return False
+        elif op is sre_parse.GROUPREF:
+            continue
+        else:
+            return False
+    return True
+
+
+def _joinable(pattern: str, replacement: str) -> bool:
+    """이어붙인 컬럼 문자열에 적용해도 요약별 적용과 결과가 같은 규칙인지"""
+    if _SEP in replacement or '\\0' in replacement:
+        return False
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & re.MULTILINE or parsed.getwidth()[0] == 0:
+        return False
+    return _never_matches_sep(parsed)
+
+
+# ============================================================================
+# 패스
+# ============================================================================
+
+def _strip(summary: str) -> str:
+    return summary.strip()
+
+
+def _collapse_whitespace(summary: str) -> str:
+    """re.sub(r'\\s+', ' ', s).strip() 과 동일 (\\s와 str.split()의 공백 정의가 같음)"""
+    return ' '.join(summary.split())
+
+
+_WHITESPACE_RULE = (r'\s+', ' ')
+
+
+class _RegexPass:
+    """규칙 1개 = re.sub 1회"""
+
+    def __init__(self, pattern: str, replacement: str):
+        self.rules = [(pattern, replacement)]
+        self.regex = re.compile(pattern)
+        self.replacement = replacement
+        self.prefix = _required_prefix(sre_parse.parse(pattern))
+        self.joinable = _joinable(pattern, replacement)
+
+    def __call__(self, text: str) -> str:
+        # 필수 접두사가 없으면 정규식 스캔 자체를 생략 (str.__contains__가 훨씬 빠름)
+        if self.prefix and self.prefix not in text:
+            return text
+        return self.regex.sub(self.replacement, text)
+
+
+class _MergedPass:
+    """
+    선행 리터럴이 같은 독립 규칙들을 접두사 트라이 패턴 하나로 적용
+
+    예: 하고\\s+있습니다 / 하고\\s+있다 / 하고\\s+있으며
+        → 하고(?:(\\s+있습니다)|(\\s+있다)|(\\s+있으며))
+
+    CPython re는 패턴이 리터럴로 시작할 때만 빠른 접두사 탐색을 쓰기 때문에
+    선행 리터럴이 다른 규칙까지 alternation 하나로 묶으면 오히려 수 배 느려진다.
+    """
+
+    def __init__(self, head: str, rules: List[Rule]):
+        self.rules = list(rules)
+        tails = '|'.join(f'({_literal_head(p)[1]})' for p, _ in rules)
+        self.regex = re.compile(f'{re.escape(head)}(?:{tails})')
+        self.prefix = head
+        self.replacements = [None] + [r for _, r in rules]
+        self.joinable = all(_joinable(p, r) for p, r in rules)
+
+    def _replace(self, match: 're.Match') -> str:
+        return self.replacements[match.lastindex]
+
+    def __call__(self, text: str) -> str:
+        if self.prefix not in text:
+            return text
+        return self.regex.sub(self._replace, text)
+
+
+class _FuncPass:
+    """문장 분할 등 파이썬 로직 단계 (요약별로 적용)"""
+
+    joinable = False
+
+    def __init__(self, func: Callable[[str], str]):
+        self.rules = []
+        self.func = func
+
+    def __call__(self, text: str) -> str:
+        return self.func(text)
+
+
+# ============================================================================
+# 규칙 체인
+# ============================================================================
+
+class RuleChain:
+    """
+    순서 있는 후처리 규칙 체인
+
+    steps: (pattern, replacement) 튜플 또는 str -> str 함수의 리스트
+    merge_literals: 독립적인 리터럴 규칙을 병합 패스로 묶을지
+    """
+
+    def __init__(self, steps: Sequence[Step], merge_literals: bool = True):
+        self.steps = list(steps)
+        self.passes = self._build_passes(self.steps, merge_literals)
+
+    @staticmethod
+    def _build_passes(steps, merge_literals):
+        passes = []
+        group: List[Rule] = []
+
+        def flush():
+            # 그룹 내 규칙은 서로 독립이므로 선행 리터럴별로 묶어도 순서 무관
+            buckets = {}
+            for rule in group:
+                buckets.setdefault(_literal_head(rule[0])[0], []).append(rule)
+            for head, rules in buckets.items():
+                if len(rules) == 1:
+                    passes.append(_RegexPass(*rules[0]))
+                else:
+                    passes.append(_MergedPass(head, rules))
+            group.clear()
+
+        i = 0
+        while i < len(steps):
+            step = steps[i]
+            i += 1
+            if callable(step):
+                flush()
+                passes.append(_FuncPass(step))
+                continue
+            if tuple(step) == _WHITESPACE_RULE and i < len(steps) and steps[i] is _strip:
+                flush()
+                passes.append(_FuncPass(_collapse_whitespace))
+                i += 1
+                continue
+            pattern, replacement = step
+            mergeable = (merge_literals
+                         and '\\' not in replacement
+                         and _literal_variants(pattern) is not None)
+            if not mergeable:
+                flush()
+                passes.append(_RegexPass(pattern, replacement))
+                continue
+            if not all(_independent(prev, step) for prev in group):
+                flush()
+            group.append((pattern, replacement))
+        flush()
+        return passes
+
+    def __call__(self, text: str) -> str:
+        for p in self.passes:
+            text = p(text)
+        return text
+
+    def apply(self, texts: Iterable[str]) -> List[str]:
+        """
+        컬럼 전체에 체인 적용
+
+        연속된 joinable 패스는 요약들을 구분자로 이어붙인 문자열 하나에
+        한 번씩만 실행하고, 함수 단계에서만 요약별로 나눠서 처리
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        joined = None
+        can_join = not any(_SEP in t for t in texts)
+        for p in self.passes:
+            if p.joinable and can_join:
+                if joined is None:
+                    joined = _SEP.join(texts)
+                joined = p(joined)
+            else:
+                if joined is not None:
+                    texts = joined.split(_SEP)
+                    joined = None
+                texts = [p(t) for t in texts]
+        if joined is not None:
+            texts = joined.split(_SEP)
+        return texts
+
+    def transform(self, column):
+        """
+        pandas Series / pyarrow 문자열 배열 단위 적용 (입력과 같은 타입으로 반환)
+
+        결측값(NaN/None)은 그대로 통과
+        """
+        return _map_column(column, self.apply)
+
+    def describe(self) -> List[str]:
+        """패스 구성 요약 (디버깅용)"""
+        lines = []
+        for p in self.passes:
+            if isinstance(p, _FuncPass):
+                lines.append(f'func   {getattr(p.func, "__name__", repr(p.func))}')
+            elif isinstance(p, _MergedPass):
+                lines.append(f'merged {p.regex.pattern}')
+            else:
+                lines.append(f'regex  {p.regex.pattern}')
+        return lines
+
+
+# ============================================================================
+# 컬럼 입출력 (pandas Series / pyarrow 문자열 배열)
+# ============================================================================
+
+def _map_column(column, fn: Callable[[List[str]], List[str]]):
+    """문자열 리스트 함수 fn을 컬럼에 적용, 결측값은 건너뛰고 입력 타입 유지"""
+    if type(column).__module__.startswith('pyarrow'):
+        import pyarrow as pa
+
+        values = column.to_pylist()
+        valid = [i for i, v in enumerate(values) if v is not None]
+        for i, out in zip(valid, fn([values[i] for i in valid])):
+            values[i] = out
+        return pa.array(values, type=pa.string())
+
+    import pandas as pd
+
+    if not isinstance(column, pd.Series):
+        return fn(list(column))
+    mask = column.notna().to_numpy()
+    if mask.all():
+        return pd.Series(fn(column.tolist()), index=column.index,
+                         name=column.name, dtype=column.dtype)
+    result = column.copy()
+    result.loc[mask] = fn(column[mask].tolist())
+    return result
+
+
+# ============================================================================
+# 함수 단계 (기존 스크립트/노트북의 파이썬 로직)
+# ============================================================================
+
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+
+def _limit_sentences(max_sentences: int = 3) -> Callable[[str], str]:
+    """앞에서부터 max_sentences 문장만 유지 (aggressive)"""
+    def limit_sentences(summary: str) -> str:
+        return ' '.join(_SENT_SPLIT.split(summary.strip())[:max_sentences])
+    return limit_sentences
+
+
+def _limit_meaningful_sentences(summary: str) -> str:
+    """5단어 미만 문장은 앞 문장에 붙이고 최대 3문장 유지 (smart)"""
+    sentences = _SENT_SPLIT.split(summary.strip())
+    meaningful_sentences = []
+    for sent in sentences:
+        if len(sent.split()) >= 5:
+            meaningful_sentences.append(sent)
+        elif meaningful_sentences:
+            meaningful_sentences[-1] = meaningful_sentences[-1] + ' ' + sent
+    return ' '.join(meaningful_sentences[:3])
+
+
+def _drop_incomplete_last_sentence(endings: str = '.!?다요습니다니다') -> Callable[[str], str]:
+    """마지막 글자가 endings에 없으면 (미완성 문장) 마지막 문장 제거"""
+    def drop_incomplete_last_sentence(summary: str) -> str:
+        if summary and not summary[-1] in endings:
+            sentences = _SENT_SPLIT.split(summary)
+            if len(sentences) > 1:
+                summary = ' '.join(sentences[:-1])
+        return summary
+    return drop_incomplete_last_sentence
+
+
+def _collapse_repeated_malhamnida(min_sentences: int = 1) -> Callable[[str], str]:
+    """'말합니다'가 여러 번 나오면 마지막 하나만 남기고 '합니다'로 (micro_tune)"""
+    def collapse_repeated_malhamnida(summary: str) -> str:
+        if len(summary.split('. ')) >= min_sentences:
+            count = summary.count('말합니다')
+            if count > 1:
+                summary = summary.replace('말합니다', '합니다', count - 1)
+        return summary
+    return collapse_repeated_malhamnida
+
+
+def _split_long_sentences(summary: str) -> str:
+    """30단어 초과 문장을 접속사/쉼표 기준으로 분할 (focused)"""
+    sentences = _SENT_SPLIT.split(summary.strip())
+    processed_sentences = []
+    for sent in sentences:
+        words = sent.split()
+        if len(words) > 30:
+            if ' 그리고 ' in sent:
+                processed_sentences.extend(sent.split(' 그리고 ', 1))
+            elif ' 하지만 ' in sent:
+                processed_sentences.extend(sent.split(' 하지만 ', 1))
+            elif ', ' in sent and len(words) > 35:
+                comma_idx = sent.rfind(',', 0, len(sent)//2)
+                if comma_idx > 0:
+                    processed_sentences.append(sent[:comma_idx+1])
+                    processed_sentences.append(sent[comma_idx+1:].strip())
+                else:
+                    processed_sentences.append(sent)
+            else:
+                processed_sentences.append(sent)
+        else:
+            processed_sentences.append(sent)
+    return ' '.join(processed_sentences)
+
+
+def _truncate_to_last_sentence(min_ratio: float, min_length: int = 0) -> Callable[[str], str]:
+    """마지막 종결부호가 min_ratio 이후에 있으면 그 뒤를 잘라내는 단계"""
+    def truncate_to_last_sentence(summary: str) -> str:
+        if summary and len(summary) > min_length and not summary[-1] in '.!?':
+            last_period = max(summary.rfind('.'), summary.rfind('!'), summary.rfind('?'))
+            if last_period > len(summary) * min_ratio:
+                summary = summary[:last_period+1]
+        return summary
+    return truncate_to_last_sentence
+
+
+def _shorten_long_sentences(summary: str) -> str:
+    """35단어 초과 문장은 첫 절만 유지 (할루시네이션 제거)"""
+    sentences = _SENT_SPLIT.split(summary)
+    processed = []
+    for sent in sentences:
+        if len(sent.split()) > 35:
+            first_clause = sent.split(',')[0] if ',' in sent else sent.split('.')[0]
+            if len(first_clause.split()) >= 10:
+                processed.append(first_clause.strip() + '.')
+        else:
+            processed.append(sent)
+    return ' '.join(processed)
+
+
+def _fallback_to_first_sentence(fallback: str) -> Callable[[str], str]:
+    """
+    결과가 5단어 미만이면 fallback 텍스트의 첫 문장으로 대체 (smart)
+
+    기존 smart_micro_tune_v4는 v4 첫 행의 요약을 fallback으로 사용했음
+    """
+    first = _SENT_SPLIT.split(fallback.strip())[0]
+
+    def fallback_to_first_sentence(summary: str) -> str:
+        if not summary or len(summary.split()) < 5:
+            return first
+        return summary
+    return fallback_to_first_sentence
+
+
+# config.yaml의 함수 단계 이름 → 팩토리 (파라미터는 키워드 인자로 전달)
+STEP_FACTORIES = {
+    'strip': lambda: _strip,
+    'limit_sentences': _limit_sentences,
+    'limit_meaningful_sentences': lambda: _limit_meaningful_sentences,
+    'drop_incomplete_last_sentence': _drop_incomplete_last_sentence,
+    'collapse_repeated_malhamnida': _collapse_repeated_malhamnida,
+    'split_long_sentences': lambda: _split_long_sentences,
+    'truncate_to_last_sentence': _truncate_to_last_sentence,
+    'shorten_long_sentences': lambda: _shorten_long_sentences,
+    'fallback_to_first_sentence': _fallback_to_first_sentence,
+}
+
+# 실행 시점 값이 필요한 함수 단계 (ProfileSet(..., fallback=...)으로 전달)
+_CONTEXT_PARAMS = {
+    'fallback_to_first_sentence': ('fallback',),
+}
+
+
+# ============================================================================
+# 후처리 프로파일 (config.yaml의 postprocess 블록)
+# ============================================================================
+
+class ProfileSet:
+    """
+    config.yaml postprocess.profiles에 정의된 후처리 프로파일 모음
+
+    - 프로파일은 stage 이름 또는 다른 프로파일 이름의 리스트
+    - stage는 [pattern, replacement] 규칙 / 함수 단계 이름 / {함수: 파라미터}의 리스트
+    - apply()로 여러 프로파일을 한 번에 적용하면 단계 시퀀스의 공통 접두사
+      (공백 정리, 조사 중복 제거, 진행형 단순화 ...)는 한 번만 계산하고
+      프로파일이 갈라지는 지점에서만 분기
+    """
+
+    def __init__(self, conf: dict, **context):
+        self.stages = conf.get('stages', {})
+        self.profiles = conf.get('profiles', {})
+        self.context = context
+        self._segments = {}
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.profiles)
+
+    def _resolve_step(self, spec):
+        """stage 항목 하나 → (단계 키, Step)"""
+        if isinstance(spec, (list, tuple)):
+            pattern, replacement = spec
+            return ('re', pattern, replacement), (pattern, replacement)
+        if isinstance(spec, str):
+            name, params = spec, {}
+        else:
+            (name, params), = spec.items()
+            params = params if isinstance(params, dict) else {}
+        if name not in STEP_FACTORIES:
+            raise ValueError(f'알 수 없는 후처리 단계: {name}')
+        kwargs = dict(params)
+        for key in _CONTEXT_PARAMS.get(name, ()):
+            if key not in self.context:
+                raise ValueError(f"'{name}' 단계에는 {key} 값이 필요합니다 (ProfileSet(..., {key}=...))")
+            kwargs[key] = self.context[key]
+        return ('fn', name, tuple(sorted(params.items()))), STEP_FACTORIES[name](**kwargs)
+
+    def steps(self, name: str, _seen: tuple = ()) -> List[tuple]:
+        """프로파일을 (단계 키, Step) 시퀀스로 전개"""
+        if name in _seen:
+            raise ValueError(f'프로파일 순환 참조: {" -> ".join(_seen + (name,))}')
+        resolved = []
+        for item in self.profiles[name]:
+            if item in self.profiles:
+                resolved.extend(self.steps(item, _seen + (name,)))
+            elif item in self.stages:
+                resolved.extend(self._resolve_step(spec) for spec in self.stages[item])
+            else:
+                raise ValueError(f"프로파일 '{name}': 알 수 없는 stage/프로파일 '{item}'")
+        return resolved
+
+    def chain(self, name: str) -> RuleChain:
+        """프로파일 하나를 RuleChain으로"""
+        return RuleChain([step for _, step in self.steps(name)])
+
+    def _segment(self, keyed_steps: List[tuple]) -> RuleChain:
+        key = tuple(k for k, _ in keyed_steps)
+        if key not in self._segments:
+            self._segments[key] = RuleChain([step for _, step in keyed_steps])
+        return self._segments[key]
+
+    def apply(self, texts: Iterable[str], names: Optional[Sequence[str]] = None) -> dict:
+        """
+        여러 프로파일을 컬럼 전체에 적용 → {프로파일 이름: 결과 리스트}
+
+        프로파일들의 단계 시퀀스로 트라이를 만들고, 분기 없는 구간은
+        RuleChain 하나로 묶어 한 번만 실행
+        """
+        texts = list(texts)
+        names = list(names) if names is not None else self.names
+
+        # 트라이 노드: {'children': {키: 노드}, 'step': (키, Step), 'ends': [이름]}
+        root = {'children': {}, 'ends': []}
+        for name in names:
+            node = root
+            for keyed in self.steps(name):
+                node = node['children'].setdefault(
+                    keyed[0], {'children': {}, 'step': keyed, 'ends': []})
+            node['ends'].append(name)
+
+        results = {name: list(texts) for name in root['ends']}
+
+        def run(node, inputs):
+            for child in node['children'].values():
+                segment = [child['step']]
+                while len(child['children']) == 1 and not child['ends']:
+                    child = next(iter(child['children'].values()))
+                    segment.append(child['step'])
+                outputs = self._segment(segment).apply(inputs)
+                for name in child['ends']:
+                    results[name] = list(outputs)
+                run(child, outputs)
+
+        run(root, texts)
+        return {name: results[name] for name in names}
+
+    def transform(self, column, names: Optional[Sequence[str]] = None) -> 'pd.DataFrame':
+        """Series 하나에 여러 프로파일 적용 → 프로파일별 컬럼을 가진 DataFrame"""
+        import pandas as pd
+
+        column = column if isinstance(column, pd.Series) else pd.Series(column)
+        mask = column.notna().to_numpy()
+        results = self.apply(column[mask].tolist(), names)
+        frame = {}
+        for name, values in results.items():
+            if mask.all():
+                frame[name] = pd.Series(values, index=column.index, dtype=column.dtype)
+            else:
+                frame[name] = column.copy()
+                frame[name].loc[mask] = values
+        return pd.DataFrame(frame, index=column.index)
+
+
+def load_profiles(config_path: str = './config.yaml', **context) -> ProfileSet:
+    """config.yaml의 postprocess 블록에서 프로파일 로드"""
+    import yaml
+
+    with open(config_path, encoding='utf-8') as f:
+        conf = yaml.safe_load(f)
+    return ProfileSet(conf['postprocess'], **context)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+SOLAR SFT 시퀀스 패킹 (예제 간 어텐션 없음)
+===========================================
+packing=False, batch_size 1로 짧은 format_instruction 예제를 한 스텝에 하나씩 학습하던 것을,
+여러 예제를 max_seq_length 한 줄에 이어 붙여 스텝 수를 줄임
+
+- pack_lengths(): 예제 길이 → 줄 구성 (best-fit decreasing, 남은 자리가 가장 작은 줄에 넣음)
+- PackedSFTDataset: token_cache input_ids 컬럼 → 줄마다 {'input_ids', 'position_ids'}
+  · position_ids는 예제마다 0부터 다시 시작
+    → transformers가 position_ids 재시작을 보고 예제끼리 가리는 블록 대각 causal mask 생성
+      (attention_mask를 넘기지 않고 use_cache=False일 때, eager/sdpa/flash-attention 모두)
+    → 노트북처럼 model.config.use_cache = False (gradient checkpointing도 캐시를 끔)
+  · check_packing_support(): 설치된 transformers가 이렇게 가려 주는지 학습 전에 확인
+    (requirements.txt의 4.35.2는 position_ids 재시작을 무시 → 예제끼리 어텐션, 오류 없이 학습됨)
+- PackedCollator: 배치 안 최장 줄까지 오른쪽 패딩, attention_mask 없이 position_ids로
+  · labels: 각 예제의 첫 토큰(앞 예제 끝에서 예측하게 되는 자리)과 패딩은 -100
+    → 예제를 하나씩 학습할 때와 같은 토큰들만 loss에 들어감 (pad = eos여도 위치로 구분)
+  · position_ids가 없는 (패킹 안 한) 예제도 처리 → dev 평가/비교 실행에 같은 collator 사용
+- padding_stats() / benchmark(): 패딩 비율, 초당 학습 토큰 수 비교 (CPU 작은 모델로 확인 가능)
+
+사용:
+    train_dataset = PackedSFTDataset(train_corpus['input_ids'], CONF['max_seq_length'])
+    print(train_dataset.stats())              # 줄 수, 줄당 예제 수, 채움 비율
+    check_packing_support(model)              # 예제 간 어텐션을 막을 수 없는 환경이면 RuntimeError
+    trainer = SFTTrainer(..., train_dataset=train_dataset, data_collator=PackedCollator(tokenizer.pad_token_id),
+                         args=SFTConfig(..., packing=False, group_by_length=False,
+                                        dataset_kwargs={"skip_prepare_dataset": True}))
+
+    python sft_packing.py [max_length] [예제 수]     # 작은 Llama로 CPU 비교 (패킹 전/후 loss, 토큰/초, 패딩 비율)
+"""
+
+import bisect
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+
+def pack_lengths(lengths: Sequence[int], max_length: int) -> List[List[int]]:
+    """
+    예제 길이들 → 줄마다 예제 위치 리스트 (best-fit decreasing)
+
+    max_length보다 긴 예제는 혼자 한 줄 (token_cache sft_columns는 이미 max_length로 자름)
+    """
+    order = sorted(range(len(lengths)), key=lambda i: (-lengths[i], i))
+    rows: List[List[int]] = []
+    spaces: List[int] = []   # 남은 자리 (오름차순)
+    owners: List[int] = []   # spaces와 같은 순서의 줄 번호
+    for i in order:
+        length = int(lengths[i])
+        k = bisect.bisect_left(spaces, length)
+        if k < len(spaces):
+            row = owners.pop(k)
+            space = spaces.pop(k) - length
+        else:
+            row = len(rows)
+            rows.append([])
+            space = max_length - length
+        rows[row].append(i)
+        if space > 0:
+            k = bisect.bisect_left(spaces, space)
+            spaces.insert(k, space)
+            owners.insert(k, row)
+    return rows
+
+
+class PackedSFTDataset(Dataset):
+    """
+    여러 SFT 예제를 이어 붙인 줄 데이터셋
+
+    Args:
+        input_ids: 예제별 토큰 ID (token_cache FlatColumn 또는 리스트들)
+        max_length: 줄 최대 길이 (CONF['max_seq_length'])
+    """
+
+    def __init__(self, input_ids: Sequence[Sequence[int]], max_length: int):
+        self.input_ids = input_ids
+        self.max_length = max_length
+        lengths = getattr(input_ids, 'lengths', None)  # FlatColumn: 오프셋 차이
+        self.example_lengths = np.asarray(lengths if lengths is not None else [len(ids) for ids in input_ids],
+                                          dtype=np.int64)
+        self.rows = pack_lengths(self.example_lengths.tolist(), max_length)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, idx: int) -> Dict:
+        examples = self.rows[idx]
+        input_ids = np.concatenate([np.asarray(self.input_ids[i], dtype=np.int64) for i in examples])
+        position_ids = np.concatenate([np.arange(self.example_lengths[i]) for i in examples])
+        return {'input_ids': input_ids.tolist(), 'position_ids': position_ids.tolist()}
+
+    @property
+    def lengths(self) -> List[int]:
+        """줄 길이들"""
+        return [int(self.example_lengths[row].sum()) for row in self.rows]
+
+    def stats(self) -> Dict[str, float]:
+        """줄 수, 줄당 평균 예제 수, 채움 비율 (실제 토큰 / (줄 수 × max_length))"""
+        tokens = int(self.example_lengths.sum())
+        return {
+            'examples': len(self.example_lengths),
+            'rows': len(self.rows),
+            'examples_per_row': len(self.example_lengths) / max(len(self.rows), 1),
+            'tokens': tokens,
+            'fill_ratio': tokens / max(len(self.rows) * self.max_length, 1),
+        }
+
+
+class PackedCollator:
+    """
+    패킹한 줄(또는 일반 예제) → input_ids, position_ids, labels (attention_mask 없음)
+
+    Args:
+        pad_token_id: input_ids 패딩 토큰
+        label_pad_token_id: loss에서 뺄 자리의 labels 값
+        pad_to_multiple_of: 배치 폭을 이 배수로 올림 (None이면 최장 줄 길이)
+    """
+
+    def __init__(self, pad_token_id: int, label_pad_token_id: int = -100, pad_to_multiple_of: Optional[int] = None):
+        self.pad_token_id = pad_token_id
+        self.label_pad_token_id = label_pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features: List[Dict]) -> Dict:
+        width = max(len(f['input_ids']) for f in features)
+        if self.pad_to_multiple_of:
+            width = -(-width // self.pad_to_multiple_of) * self.pad_to_multiple_of
+        input_ids = np.full((len(features), width), self.pad_token_id, dtype=np.int64)
+        labels = np.full((len(features), width), self.label_pad_token_id, dtype=np.int64)
+        position_ids = np.zeros((len(features), width), dtype=np.int64)
+        for row, feature in enumerate(features):
+            ids = np.asarray(feature['input_ids'], dtype=np.int64)
+            n = len(ids)
+            positions = np.asarray(feature['position_ids'], dtype=np.int64) if 'position_ids' in feature \
+                else np.arange(n, dtype=np.int64)
+            input_ids[row, :n] = ids
+            position_ids[row, :n] = positions
+            position_ids[row, n:] = np.arange(width - n)  # 패딩은 0부터 새 구간 → 실제 토큰과 서로 보지 않음
+            labels[row, :n] = np.where(positions == 0, self.label_pad_token_id, ids)
+        return {
+            'input_ids': torch.from_numpy(input_ids),
+            'position_ids': torch.from_numpy(position_ids),
+            'labels': torch.from_numpy(labels),
+        }
+
+
+def check_packing_support(model, check_cache: bool = True):
+    """
+    position_ids 재시작으로 예제끼리 가리는 환경인지 확인 (아니면 RuntimeError)
+
+    - transformers.masking_utils.find_packed_sequence_indices가 있음 (eager/sdpa/flash-attention 모두)
+    - 또는 attn_implementation='flash_attention_2' + position_ids로 구간을 나누는 transformers (4.44+)
+    check_cache: model.config.use_cache도 확인 (KV 캐시가 있으면 패킹 마스크를 만들지 않음)
+    """
+    config = model.config
+    attn = getattr(config, '_attn_implementation', None)
+    try:
+        from transformers.masking_utils import find_packed_sequence_indices  # noqa: F401
+        supported = True
+    except ImportError:
+        try:
+            from transformers import modeling_flash_attention_utils as fa_utils
+        except ImportError:
+            fa_utils = None
+        names = ('prepare_fa2_from_position_ids', 'prepare_fa_kwargs_from_position_ids')
+        supported = attn == 'flash_attention_2' and any(hasattr(fa_utils, name) for name in names)
+    if not supported:
+        import transformers
+
+        raise RuntimeError(
+            f"transformers {transformers.__version__} (attn_implementation={attn})는 position_ids 재시작으로 "
+            "예제를 가리지 않음 → 패킹하면 예제끼리 어텐션. transformers를 올리거나 CONF['packing'] = False")
+    if check_cache and getattr(config, 'use_cache', False):
+        raise RuntimeError("패킹 학습에는 model.config.use_cache = False 필요 (KV 캐시가 있으면 블록 마스크를 만들지 않음)")
+
+
+def padding_stats(row_lengths: Sequence[int], batch_size: int) -> Dict[str, float]:
+    """
+    순서대로 batch_size개씩 묶어 최장 길이까지 패딩할 때의 패딩 비율
+
+    Returns:
+        {'batches', 'tokens' (실제), 'padded_tokens' (패딩 포함), 'padding_ratio'}
+    """
+    lengths = np.asarray(row_lengths, dtype=np.int64)
+    batches = [lengths[start:start + batch_size] for start in range(0, len(lengths), batch_size)]
+    padded = int(sum(batch.max() * len(batch) for batch in batches))
+    tokens = int(lengths.sum())
+    return {
+        'batches': len(batches),
+        'tokens': tokens,
+        'padded_tokens': padded,
+        'padding_ratio': 1 - tokens / padded if padded else 0.0,
+    }
+
+
+def benchmark(model, dataset: Dataset, collator, batch_size: int = 1, max_steps: Optional[int] = None,
+              order: Optional[Sequence[int]] = None) -> Dict[str, float]:
+    """
+    forward + backward 처리량 (옵티마이저 스텝 제외, 모델 장치에서)
+
+    order: 데이터셋 위치 순서 (None이면 0부터)
+
+    Returns:
+        {'steps', 'tokens' (실제 입력 토큰), 'padded_tokens' (패딩 포함), 'padding_ratio',
+         'seconds', 'tokens_per_sec', 'loss_tokens', 'loss_sum'}
+    """
+    if isinstance(dataset, PackedSFTDataset):
+        check_packing_support(model, check_cache=False)  # 아래 forward는 use_cache=False
+    device = next(model.parameters()).device
+    order = list(range(len(dataset))) if order is None else list(order)
+    batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)][:max_steps]
+    model.train()
+    tokens = padded = loss_tokens = 0
+    loss_sum = 0.0
+    start = time.perf_counter()
+    for rows in batches:
+        features = [dataset[i] for i in rows]
+        batch = {k: v.to(device) for k, v in collator(features).items()}
+        labels = batch.pop('labels')
+        logits = model(**batch, use_cache=False).logits  # KV 캐시가 있으면 패킹 마스크를 만들지 않음
+        # 토큰 합계 loss (배치 구성과 상관없이 비교 가능), 다음 토큰 예측이므로 한 칸 밀어서
+        loss = torch.nn.functional.cross_entropy(
+            logits[:, :-1].reshape(-1, logits.shape[-1]).float(), labels[:, 1:].reshape(-1),
+            ignore_index=-100, reduction='sum')
+        loss.backward()
+        model.zero_grad(set_to_none=True)
+        loss_sum += float(loss.detach())
+        tokens += sum(len(f['input_ids']) for f in features)
+        padded += labels.numel()
+        loss_tokens += int((labels[:, 1:] != -100).sum())
+    seconds = time.perf_counter() - start
+    return {
+        'steps': len(batches),
+        'tokens': tokens,
+        'padded_tokens': padded,
+        'padding_ratio': 1 - tokens / padded if padded else 0.0,
+        'seconds': seconds,
+        'tokens_per_sec': tokens / seconds if seconds else 0.0,
+        'loss_tokens': loss_tokens,
+        'loss_sum': loss_sum,
+    }
+
+
+class _ExampleDataset(Dataset):
+    """예제 하나씩 (패킹 전 비교용, token_cache.TokenIdsDataset과 같은 형식)"""
+
+    def __init__(self, input_ids: Sequence[Sequence[int]]):
+        self.input_ids = input_ids
+
+    def __len__(self) -> int:
+        return len(self.input_ids)
+
+    def __getitem__(self, i: int) -> Dict:
+        return {'input_ids': list(self.input_ids[i])}
+
+
+if __name__ == '__main__':
+    import os
+
+    import pandas as pd
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    max_length = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    n_examples = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    vocab_size = 512
+
+    # 예제 길이: train.csv의 대화 + 요약 글자 수 (SOLAR 토큰 수의 근사), 없으면 임의 길이
+    rng = np.random.default_rng(42)
+    if os.path.exists('./data/train.csv'):
+        df = pd.read_csv('./data/train.csv', nrows=n_examples)
+        texts = (df['dialogue'].astype(str) + '\n' + df['summary'].astype(str)).tolist()
+        examples = [[1 + ord(ch) % (vocab_size - 1) for ch in text[:max_length]] for text in texts]
+    else:
+        examples = [rng.integers(1, vocab_size, rng.integers(100, 600)).tolist() for _ in range(n_examples)]
+
+    torch.manual_seed(42)
+    model = LlamaForCausalLM(LlamaConfig(
+        vocab_size=vocab_size, hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=4, max_position_embeddings=max_length,
+        attn_implementation='sdpa'))
+    collator = PackedCollator(pad_token_id=0)
+    plain = _ExampleDataset(examples)
+    packed = PackedSFTDataset(examples, max_length)
+
+    print("\n" + "="*80)
+    print(f"📦 SFT 패킹 비교 (작은 Llama, CPU): 예제 {len(examples)}개, max_length {max_length}")
+    print("="*80)
+    stats = packed.stats()
+    print(f"\n줄 {stats['rows']}개 (줄당 예제 {stats['examples_per_row']:.1f}개, 채움 {stats['fill_ratio'] * 100:.1f}%)")
+
+    runs = {
+        '예제별 batch 1 (기존)': (plain, 1),
+        '예제별 batch 4 (길이순 아님)': (plain, 4),
+        '패킹 batch 1': (packed, 1),
+    }
+    results = {name: benchmark(model, dataset, collator, batch_size) for name, (dataset, batch_size) in runs.items()}
+    print(f"\n{'설정':<24} {'스텝':>6} {'패딩 비율':>10} {'토큰/초':>10} {'loss 합':>12}")
+    for name, r in results.items():
+        print(f"{name:<24} {r['steps']:>6} {r['padding_ratio'] * 100:>9.1f}% {r['tokens_per_sec']:>10,.0f} "
+              f"{r['loss_sum']:>12.3f}")
+
+    base, pack = results['예제별 batch 1 (기존)'], results['패킹 batch 1']
+    print(f"\n✅ 패킹 전/후 loss 합 차이: {abs(base['loss_sum'] - pack['loss_sum']):.2e} (예제 간 어텐션 없음)")
+    print(f"⚡ 토큰/초 {pack['tokens_per_sec'] / base['tokens_per_sec']:.2f}배, 스텝 {base['steps']} → {pack['steps']}")
+    print(f"\n" + "="*80 + "\n")
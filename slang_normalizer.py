@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+은어/줄임말 정규화 전처리 (config.yaml preprocess.normalize_slang)
+==================================================================
+사전 항목마다 str.replace를 한 번씩 돌리는 대신, 사전 전체를 트라이 정규식 하나로 컴파일해
+대화마다 한 번만 훑으며 치환
+
+- 사전: 내장 DEFAULT_SLANG + 사용자 파일 (TSV '은어<TAB>표준어' 또는 JSON {은어: 표준어}, 파일이 우선)
+  · 저장소의 slang_dict.tsv (config.yaml preprocess.slang_dict)
+- compile_trie(): 항목들을 접두사 트라이로 묶은 정규식 (캡처 그룹 없음, 분기마다 다른 첫 글자)
+  · CPython re가 C에서 한 번에 훑음 → 항목 수만 개여도 대화 1개는 정규식 1회
+  · 같은 위치에서는 가장 긴 항목 (leftmost-longest), 치환 결과는 다시 훑지 않음
+    (순차 str.replace와 달리 항목 순서에 따라 결과가 바뀌지 않음)
+- normalize_many(): 텍스트가 많으면 프로세스 풀로 나눠 치환 (워커마다 정규식을 한 번만 컴파일)
+- recipe(): token_cache 레시피 이름에 사전 해시를 붙임
+  → 정규화 결과는 토큰화 결과와 같은 캐시 디렉터리에 저장, 사전이 바뀌면 다시 생성
+
+사용:
+    normalizer = SlangNormalizer.from_config()                     # config.yaml preprocess 블록
+    dialogues = normalizer.normalize_many(df['dialogue'].apply(clean_text))
+    corpus = token_cache.get(normalizer.recipe('kobart_v2_clean_text'), './data/train.csv', build)
+
+    python slang_normalizer.py [사전 파일 (./slang_dict.tsv)] [./data/train.csv]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# 내장 사전 (다른 낱말 안에 들어갈 일이 거의 없는 자모 약어/합성 줄임말만)
+DEFAULT_SLANG = {
+    'ㅇㅋ': '오케이',
+    'ㄱㅅ': '감사합니다',
+    'ㅈㅅ': '죄송합니다',
+    'ㅊㅋ': '축하해요',
+    'ㄴㄴ': '아니',
+    'ㅇㅇ': '응',
+    'ㄱㄱ': '가자',
+    'ㅎㅇ': '안녕',
+    'ㅂㅂ': '안녕',
+    '남친': '남자친구',
+    '여친': '여자친구',
+    '생파': '생일 파티',
+    '갑분싸': '갑자기 분위기가 싸해짐',
+    '존맛': '정말 맛있음',
+    '개이득': '큰 이득',
+    '인싸': '사교적인 사람',
+    '혼밥': '혼자 밥 먹기',
+    '혼술': '혼자 술 마시기',
+    '소확행': '소소하지만 확실한 행복',
+}
+
+# 워커 1개에 넘길 최소 텍스트 수 (이보다 적으면 프로세스 생성 + 정규식 컴파일 비용이 더 큼)
+MIN_TEXTS_PER_WORKER = 20000
+
+
+def load_dictionary(path: str) -> Dict[str, str]:
+    """사전 파일 → {은어: 표준어} (.json 또는 TSV, TSV의 빈 줄/'#' 주석 줄은 건너뜀)"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return {str(k): str(v) for k, v in json.load(f).items()}
+        table = {}
+        for n, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            if '\t' not in line:
+                raise ValueError(f'{path}:{n}: 탭으로 구분된 "은어<TAB>표준어" 형식이 아님')
+            slang, normalized = line.split('\t', 1)
+            table[slang.strip()] = normalized.strip()
+        return table
+
+
+def compile_trie(words: Sequence[str]) -> re.Pattern:
+    """단어들 → 접두사 트라이 정규식 (같은 위치에서는 가장 긴 단어와 매칭)"""
+    root: Dict = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = None  # 단어 끝
+
+    # 깊이 우선으로 "노드 → 패턴" 조립 (재귀 없이, 자식 패턴을 먼저 만든 뒤 부모에서 합침)
+    patterns: Dict[int, str] = {}
+    stack = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        children = [(ch, child) for ch, child in node.items() if ch]
+        if not ready:
+            stack.append((node, True))
+            stack.extend((child, False) for _, child in children)
+            continue
+        branches, singles = [], []
+        for ch, child in sorted(children):
+            tail = patterns.pop(id(child))
+            if tail:
+                branches.append(re.escape(ch) + tail)
+            else:  # 뒤가 없는 한 글자 분기는 문자 집합 하나로
+                singles.append(re.escape(ch))
+        if singles:
+            branches.append(singles[0] if len(singles) == 1 else f"[{''.join(singles)}]")
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})" if branches else ''
+        if '' in node and pattern:  # 여기서 끝나는 단어도 있음 → 더 긴 단어를 먼저 시도 (탐욕적 ?)
+            pattern = f'(?:{pattern})?'
+        patterns[id(node)] = pattern
+    return re.compile(patterns[id(root)])
+
+
+class SlangNormalizer:
+    """
+    은어/줄임말 사전 치환기
+
+    Args:
+        table: {은어: 표준어} (빈 키, 자기 자신으로 바꾸는 항목은 무시)
+        enabled: False면 입력을 그대로 반환 (config.yaml preprocess.normalize_slang)
+    """
+
+    def __init__(self, table: Mapping[str, str] = DEFAULT_SLANG, enabled: bool = True):
+        self.table = {k: v for k, v in table.items() if k and k != v}
+        self.enabled = enabled
+        self.regex = compile_trie(list(self.table)) if self.table and enabled else None
+
+    @classmethod
+    def from_config(cls, config_path: str = './config.yaml') -> 'SlangNormalizer':
+        """
+        config.yaml preprocess 블록으로 생성
+
+        normalize_slang: 사용 여부, slang_dict: 사전 파일 (있으면 내장 사전 위에 덮어씀)
+        """
+        import yaml
+
+        with open(config_path, encoding='utf-8') as f:
+            conf = yaml.safe_load(f).get('preprocess') or {}
+        table = dict(DEFAULT_SLANG)
+        path = conf.get('slang_dict')
+        if path and os.path.exists(path):
+            table.update(load_dictionary(path))
+        elif path:
+            print(f"⚠️  은어 사전 {path} 없음 → 내장 사전({len(table)}개)만 사용")
+        return cls(table, enabled=conf.get('normalize_slang', True))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def fingerprint(self) -> str:
+        """사전 내용 해시 (비활성/빈 사전이면 '')"""
+        if self.regex is None:
+            return ''
+        digest = hashlib.blake2b(json.dumps(sorted(self.table.items()), ensure_ascii=False).encode('utf-8'),
+                                 digest_size=8)
+        return digest.hexdigest()
+
+    def recipe(self, name: str) -> str:
+        """token_cache 레시피 이름 (정규화하면 사전 해시를 붙임)"""
+        return f'{name}-slang{self.fingerprint}' if self.fingerprint else name
+
+    def _replace(self, match: re.Match) -> str:
+        return self.table[match.group()]
+
+    def normalize(self, text: str) -> str:
+        """텍스트 1개 치환 (정규식 1회)"""
+        if self.regex is None:
+            return text
+        return self.regex.sub(self._replace, text)
+
+    def normalize_many(self, texts: Sequence[str], workers: Optional[int] = None) -> List[str]:
+        """
+        텍스트들 치환 (결측은 str()로 변환, 입력 순서 유지)
+
+        workers: 프로세스 수 (None이면 CPU 수, 텍스트가 MIN_TEXTS_PER_WORKER × 2개 미만이면 현재 프로세스에서)
+        """
+        texts = [t if isinstance(t, str) else str(t) for t in texts]
+        if self.regex is None:
+            return texts
+        workers = min(workers if workers is not None else (os.cpu_count() or 1), len(texts) // MIN_TEXTS_PER_WORKER)
+        if workers <= 1:
+            return [self.normalize(t) for t in texts]
+
+        # fork로 뜨는 워커는 이미 컴파일된 정규식을 물려받음 (spawn이면 워커에서 다시 컴파일)
+        global _worker_normalizer
+        _worker_normalizer = self
+        bounds = [len(texts) * k // workers for k in range(workers + 1)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.table,)) as pool:
+            chunks = pool.map(_normalize_chunk, [texts[a:b] for a, b in zip(bounds, bounds[1:])])
+            return [text for chunk in chunks for text in chunk]
+
+
+_worker_normalizer: Optional[SlangNormalizer] = None
+
+
+def _init_worker(table: Dict[str, str]):
+    global _worker_normalizer
+    if _worker_normalizer is None or _worker_normalizer.table != table:
+        _worker_normalizer = SlangNormalizer(table)
+
+
+def _normalize_chunk(texts: List[str]) -> List[str]:
+    return [_worker_normalizer.normalize(t) for t in texts]
+
+
+if __name__ == '__main__':
+    import time
+
+    import pandas as pd
+
+    args = sys.argv[1:]
+    csv_path = next((a for a in args if a.endswith('.csv')), './data/train.csv')
+    dict_path = next((a for a in args if not a.endswith('.csv')), None)
+    if dict_path is None and os.path.exists('./slang_dict.tsv'):
+        dict_path = './slang_dict.tsv'
+
+    table = dict(DEFAULT_SLANG)
+    if dict_path:
+        table.update(load_dictionary(dict_path))
+
+    print("\n" + "="*80)
+    print(f"🔤 은어 정규화: {csv_path} (사전 {len(table):,}개)")
+    print("="*80)
+
+    start = time.perf_counter()
+    normalizer = SlangNormalizer(table)
+    compiled = time.perf_counter() - start
+    dialogues = pd.read_csv(csv_path)['dialogue'].tolist()
+
+    start = time.perf_counter()
+    normalized = normalizer.normalize_many(dialogues)
+    elapsed = time.perf_counter() - start
+
+    changed = [i for i, (a, b) in enumerate(zip(dialogues, normalized)) if a != b]
+    print(f"\n⏱️  컴파일 {compiled:.3f}초, 치환 {elapsed:.3f}초 ({len(dialogues):,}개 대화)")
+    print(f"✏️  바뀐 대화: {len(changed):,}개 ({len(changed) / max(len(dialogues), 1) * 100:.1f}%)")
+    if changed:
+        print(f"\n📝 예시:\n  전: {dialogues[changed[0]][:200]}\n  후: {normalized[changed[0]][:200]}")
+    print(f"\n" + "="*80 + "\n")
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+대용량 예측 파일 청크 스트리밍 품질 통계
+========================================
+pd.read_csv로 파일 전체를 올린 뒤 리스트/Counter를 만들던 분석을 고정 크기 청크 단위로
+
+- 청크마다 feature_store.extract_features로 샘플별 특징을 계산한 뒤 병합 가능한 누적기에 반영
+  · Moments: 개수/평균/M2/최소/최대 (Chan 병합) → 평균, 표준편차 (pandas std와 같은 ddof=1)
+  · IntHistogram: 정수 값 히스토그램 → 중앙값 (pandas median과 같은 중간 두 값 평균), 임계값 초과 수
+  · DistinctCounter: 고유 단어 수 — max_exact개까지 정확한 집합, 넘으면 HyperLogLog(2^14 레지스터)로 전환
+  · TopDuplicates: 요약 안 중복 바이그램 상위 n개 (횟수 내림차순, 같은 횟수는 파일 내 등장 순서)
+- 누적기는 모두 merge() 가능 → 샤드로 나뉜 출력 파일도 합쳐서 하나의 통계
+- 메모리: 청크 1개 + 히스토그램(길이 종류 수) + 고유 단어 집합 상한 + 상위 n개
+
+사용:
+    stats = analyze_file('./prediction/submit_solar_v4.csv', chunksize=50_000)
+    stats.report()['words']['mean'], stats.report()['lexical_diversity']
+    reports = analyze_files({'v4': './prediction/v4.csv',
+                             'v5': ['./prediction/v5_part0.csv', './prediction/v5_part1.csv']})
+
+    python streaming_stats.py ./prediction/a.csv ./prediction/b.csv [--chunksize 50000]
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from feature_store import extract_features
+
+
+class Moments:
+    """개수/평균/제곱편차합(M2)/최소/최대 누적기 (병합은 Chan et al. 병렬 공식)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            other = Moments()
+            other.count = values.size
+            other.mean = float(values.mean())
+            other.m2 = float(((values - other.mean) ** 2).sum())
+            other.min, other.max = float(values.min()), float(values.max())
+            self.merge(other)
+
+    def merge(self, other: 'Moments'):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+
+class IntHistogram:
+    """정수 값 히스토그램 (단어 수/문장 수처럼 값 종류가 적은 컬럼의 정확한 중앙값)"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    def add(self, values: np.ndarray):
+        keys, counts = np.unique(np.asarray(values, dtype=np.int64), return_counts=True)
+        self.counts.update(dict(zip(keys.tolist(), counts.tolist())))
+
+    def merge(self, other: 'IntHistogram'):
+        self.counts.update(other.counts)
+
+    def _value_at(self, rank: int) -> int:
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen > rank:
+                return value
+        raise IndexError(rank)
+
+    @property
+    def median(self) -> float:
+        n = sum(self.counts.values())
+        if not n:
+            return float('nan')
+        return (self._value_at((n - 1) // 2) + self._value_at(n // 2)) / 2
+
+    def count_above(self, threshold: int) -> int:
+        return sum(c for value, c in self.counts.items() if value > threshold)
+
+
+class DistinctCounter:
+    """
+    고유 원소 수 누적기
+
+    max_exact개까지는 정확한 집합, 넘으면 HyperLogLog 레지스터로 전환 (상대 오차 약 1.04/√2^precision)
+    """
+
+    def __init__(self, max_exact: int = 500_000, precision: int = 14):
+        self.max_exact = max_exact
+        self.precision = precision
+        self.exact: Optional[set] = set()
+        self.registers: Optional[np.ndarray] = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self.exact is not None
+
+    def _hashes(self, items: Iterable[str]) -> np.ndarray:
+        return np.fromiter((int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+                            for item in items), dtype=np.uint64)
+
+    def _to_sketch(self):
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        self._add_hashes(self._hashes(self.exact))
+        self.exact = None
+
+    def _add_hashes(self, hashes: np.ndarray):
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = (hashes << np.uint64(p)) | np.uint64(1 << (p - 1))  # 선행 0 개수 상한 64 - p
+        # 선행 0 개수 + 1: 64비트 중 최상위 1의 위치로 계산
+        rank = (64 - np.floor(np.log2(rest.astype(np.float64))).astype(np.int64)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def add(self, items: Iterable[str]):
+        if self.exact is not None:
+            self.exact.update(items)
+            if len(self.exact) > self.max_exact:
+                self._to_sketch()
+        else:
+            self._add_hashes(self._hashes(set(items)))
+
+    def merge(self, other: 'DistinctCounter'):
+        if self.exact is not None and other.exact is not None:
+            self.exact |= other.exact
+            if len(self.exact) > self.max_exact:
+                self._to_sketch()
+            return
+        if self.exact is not None:
+            self._to_sketch()
+        if other.exact is not None:
+            self._add_hashes(self._hashes(other.exact))
+        else:
+            np.maximum(self.registers, other.registers, out=self.registers)
+
+    def __len__(self) -> int:
+        if self.exact is not None:
+            return len(self.exact)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.power(2.0, -self.registers.astype(np.float64)).sum()
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # 작은 범위 보정 (linear counting)
+        return int(round(estimate))
+
+
+class TopDuplicates:
+    """(바이그램, 횟수) 상위 n개 — 횟수 내림차순, 같은 횟수는 등장 순서 (sorted(..., reverse=True)와 동일)"""
+
+    def __init__(self, n: int = 10):
+        self.n = n
+        self.items: List[Tuple[int, int, str]] = []  # (횟수, 등장 순서, 바이그램)
+
+    def add(self, items: Iterable[Tuple[int, int, str]]):
+        self.items = heapq.nsmallest(self.n, list(self.items) + list(items), key=lambda x: (-x[0], x[1]))
+
+    def merge(self, other: 'TopDuplicates', offset: int = 0):
+        """other의 등장 순서에 offset을 더해 병합 (샤드 순서대로 병합할 것)"""
+        self.add((count, order + offset, bigram) for count, order, bigram in other.items)
+
+    def pairs(self) -> List[Tuple[str, int]]:
+        return [(bigram, count) for count, _, bigram in self.items]
+
+
+class StreamingQualityStats:
+    """
+    요약 컬럼 품질 통계 누적기 (청크 단위 update, 샤드 단위 merge)
+
+    Args:
+        top_n: 보관할 중복 바이그램 상위 개수
+        max_exact_words: 고유 단어 집합을 정확히 유지하는 상한
+    """
+
+    def __init__(self, top_n: int = 10, max_exact_words: int = 500_000):
+        self.rows = 0
+        self.words = Moments()
+        self.word_histogram = IntHistogram()
+        self.sentences = Moments()
+        self.repeated_bigrams = 0
+        self.top_duplicates = TopDuplicates(top_n)
+        self.incomplete = 0
+        self.modifiers = 0
+        self.distinct_words = DistinctCounter(max_exact_words)
+        self._order = 0  # 중복 바이그램 등장 순서 (파일 전체 기준)
+
+    def update(self, summaries: Sequence[str]):
+        """청크 1개 반영"""
+        features = extract_features(summaries)
+        self.rows += len(features)
+        self.words.add(features['words'].to_numpy())
+        self.word_histogram.add(features['words'].to_numpy())
+        self.sentences.add(features['sentences'].to_numpy())
+        self.repeated_bigrams += int(features['repeated_bigrams'].sum())
+        self.incomplete += int(features['incomplete'].sum())
+        self.modifiers += int(features['modifiers'].sum())
+
+        duplicates = []
+        for bigrams, counts in zip(features['dup_bigrams'], features['dup_bigram_counts']):
+            for bigram, count in zip(bigrams, counts):
+                duplicates.append((int(count), self._order, bigram))
+                self._order += 1
+        self.top_duplicates.add(duplicates)
+
+        texts = (t if isinstance(t, str) else str(t) for t in summaries)
+        self.distinct_words.add(w for t in texts for w in t.split())
+
+    def merge(self, other: 'StreamingQualityStats'):
+        """다른 샤드의 통계 병합 (self 뒤에 이어지는 샤드)"""
+        self.top_duplicates.merge(other.top_duplicates, offset=self._order)
+        self._order += other._order
+        self.rows += other.rows
+        self.words.merge(other.words)
+        self.word_histogram.merge(other.word_histogram)
+        self.sentences.merge(other.sentences)
+        self.repeated_bigrams += other.repeated_bigrams
+        self.incomplete += other.incomplete
+        self.modifiers += other.modifiers
+        self.distinct_words.merge(other.distinct_words)
+
+    def report(self) -> Dict:
+        total_words = self.words.mean * self.words.count
+        return {
+            'rows': self.rows,
+            'words': {'mean': self.words.mean, 'median': self.word_histogram.median, 'std': self.words.std,
+                      'min': self.words.min, 'max': self.words.max},
+            'sentences_mean': self.sentences.mean,
+            'over_20_words': self.word_histogram.count_above(20),
+            'over_25_words': self.word_histogram.count_above(25),
+            'repeated_bigrams': self.repeated_bigrams,
+            'top_duplicate_bigrams': self.top_duplicates.pairs(),
+            'incomplete': self.incomplete,
+            'modifiers': self.modifiers,
+            'lexical_diversity': len(self.distinct_words) / total_words if total_words else 0,
+            'lexical_diversity_exact': self.distinct_words.is_exact,
+        }
+
+
+def analyze_file(path: str, column: str = 'summary', chunksize: int = 50_000, **kwargs) -> StreamingQualityStats:
+    """CSV 1개를 chunksize 행씩 읽어 통계 누적 (요약 컬럼만 읽음)"""
+    stats = StreamingQualityStats(**kwargs)
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+        stats.update(chunk[column].tolist())
+    return stats
+
+
+def analyze_files(paths: Mapping[str, Union[str, Sequence[str]]], column: str = 'summary',
+                  chunksize: int = 50_000, **kwargs) -> Dict[str, StreamingQualityStats]:
+    """{버전 이름: CSV 경로 또는 샤드 경로 리스트} → 버전별 통계 (샤드는 순서대로 병합)"""
+    results = {}
+    for name, shards in paths.items():
+        shards = [shards] if isinstance(shards, str) else list(shards)
+        stats = analyze_file(shards[0], column, chunksize, **kwargs)
+        for shard in shards[1:]:
+            stats.merge(analyze_file(shard, column, chunksize, **kwargs))
+        results[name] = stats
+    return results
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    chunksize = 50_000
+    if '--chunksize' in args:
+        k = args.index('--chunksize')
+        chunksize = int(args[k + 1])
+        del args[k:k + 2]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    print("\n" + "="*100)
+    print(f"📊 스트리밍 품질 통계 (청크 {chunksize:,}행)")
+    print("="*100)
+
+    reports = {path: stats.report() for path, stats in analyze_files({p: p for p in args}, chunksize=chunksize).items()}
+    print(f"\n  {'File':<40s} {'행':>10s} {'평균':>7s} {'중앙값':>7s} {'표준편차':>7s} {'문장':>5s} "
+          f"{'반복BG':>8s} {'불완전':>8s} {'다양성':>8s}")
+    print(f"  {'-'*100}")
+    for path, r in reports.items():
+        w = r['words']
+        diversity = f"{r['lexical_diversity']:.4f}" + ('' if r['lexical_diversity_exact'] else '~')
+        name = os.path.basename(path)[:40]
+        print(f"  {name:<40s} {r['rows']:>10,d} {w['mean']:>7.1f} {w['median']:>7.0f} {w['std']:>7.1f} "
+              f"{r['sentences_mean']:>5.1f} {r['repeated_bigrams']:>8,d} {r['incomplete']:>8,d} {diversity:>8s}")
+    print()
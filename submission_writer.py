@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+스트리밍 제출 파일 작성기
+=========================
+추론 결과를 메모리에 모았다가 마지막에 submit_*.csv를 쓰던 것을 청크 단위 추가 기록으로
+
+- 진행 파일({path}.partial): fname,summary 행을 청크마다 추가 → flush + fsync
+- 체크포인트({path}.partial.ckpt): fsync까지 끝난 바이트 길이 (임시 파일 + os.replace로 교체)
+  → 청크를 쓰다 중단돼도 재개 시 체크포인트 길이로 잘라 깨진 행을 버림
+- 재개(resume=True): 진행 파일에 이미 있는 fname은 pending()에서 제외 → 남은 행만 추론
+- finalize(fnames): test.csv 순서로 정렬해 기존과 같은 형식(to_csv(index=False))으로 저장 후 진행 파일 삭제
+
+사용:
+    with SubmissionWriter('./prediction/submit_solar_v5.csv') as writer:
+        todo = writer.pending(test_df['fname'])             # 아직 안 쓴 행 위치
+        for rows, summaries in generator.iter_summarize(test_df['dialogue'].iloc[todo], PROMPT, **params):
+            writer.write_many(test_df['fname'].iloc[[todo[r] for r in rows]], summaries)
+        submission = writer.finalize(test_df['fname'])
+"""
+
+import csv
+import os
+from typing import Iterable, List, Sequence
+
+import pandas as pd
+
+COLUMNS = ['fname', 'summary']
+
+
+class SubmissionWriter:
+    """
+    fname,summary 행 스트리밍 기록 + 재개
+
+    Args:
+        path: 최종 제출 파일 경로
+        chunk_size: 이 행 수만큼 모이면 디스크에 기록 (fsync)
+        resume: 기존 진행 파일을 이어서 사용 (False면 새로 시작)
+    """
+
+    def __init__(self, path: str, chunk_size: int = 64, resume: bool = True):
+        self.path = path
+        self.partial_path = path + '.partial'
+        self.ckpt_path = self.partial_path + '.ckpt'
+        self.chunk_size = chunk_size
+        self._buffer: List[Sequence[str]] = []
+        self.written = set()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if resume and os.path.exists(self.partial_path):
+            self._recover()
+        else:
+            with open(self.partial_path, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerow(COLUMNS)
+            self._checkpoint()
+        self._file = open(self.partial_path, 'a', encoding='utf-8', newline='')
+        self._csv = csv.writer(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.written) + len(self._buffer)
+
+    # ------------------------------------------------------------------
+    # 체크포인트 / 재개
+    # ------------------------------------------------------------------
+
+    def _checkpoint(self):
+        size = os.path.getsize(self.partial_path)
+        tmp_path = self.ckpt_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(size))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.ckpt_path)
+
+    def _recover(self):
+        """체크포인트 이후의 (fsync 안 된) 꼬리를 잘라내고 기록된 fname 수집"""
+        if os.path.exists(self.ckpt_path):
+            with open(self.ckpt_path) as f:
+                size = int(f.read().strip() or 0)
+            with open(self.partial_path, 'r+b') as f:
+                f.truncate(size)
+        with open(self.partial_path, encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        if not rows or rows[0] != COLUMNS:
+            raise ValueError(f'진행 파일 형식 오류: {self.partial_path}')
+        self.written = {row[0] for row in rows[1:]}
+        self._checkpoint()
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+
+    def pending(self, fnames: Iterable[str]) -> List[int]:
+        """아직 기록하지 않은 fname의 위치 리스트"""
+        return [i for i, fname in enumerate(fnames) if fname not in self.written]
+
+    def write(self, fname: str, summary: str):
+        self._buffer.append((fname, summary))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_many(self, fnames: Iterable[str], summaries: Iterable[str]):
+        for fname, summary in zip(fnames, summaries):
+            self.write(fname, summary)
+
+    def flush(self):
+        """버퍼를 진행 파일에 추가하고 fsync 후 체크포인트 갱신"""
+        if not self._buffer:
+            return
+        self._csv.writerows(self._buffer)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.written.update(fname for fname, _ in self._buffer)
+        self._buffer = []
+        self._checkpoint()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def finalize(self, fnames: Sequence[str]) -> pd.DataFrame:
+        """fnames 순서의 제출 DataFrame을 path에 저장하고 진행 파일 정리"""
+        self.close()
+        df = pd.read_csv(self.partial_path, dtype=str, keep_default_na=False)
+        df = df.drop_duplicates('fname', keep='last').set_index('fname')
+        missing = [fname for fname in fnames if fname not in df.index]
+        if missing:
+            raise ValueError(f'요약이 없는 fname {len(missing)}개: {missing[:5]} ...')
+
+        submission = pd.DataFrame({'fname': list(fnames), 'summary': df.loc[list(fnames), 'summary'].tolist()})
+        tmp_path = self.path + '.tmp'
+        submission.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        os.remove(self.partial_path)
+        os.remove(self.ckpt_path)
+        return submission
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+요약 컬럼 통계 (벡터화)
+==========================
+생성/분석 스크립트에서 반복되는 길이·변화 통계를 .iloc 루프 없이 계산
+
+- word_counts: len(str(x).split())와 동일한 단어 수
+- changed_mask: 원본 대비 바뀐 행 (NumPy 불리언 배열)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_series(column) -> pd.Series:
+    if isinstance(column, pd.Series):
+        return column
+    if type(column).__module__.startswith('pyarrow'):
+        return column.to_pandas()
+    return pd.Series(list(column))
+
+
+def word_counts(column) -> pd.Series:
+    """요약별 단어 수 (공백 기준, 결측값은 str(x)처럼 'nan' 1단어)"""
+    column = _as_series(column)
+    return column.map(str).str.split().str.len()
+
+
+def changed_mask(before, after) -> np.ndarray:
+    """before와 after가 다른 행의 불리언 마스크 (위치 기준 비교, 양쪽 결측은 같은 값)"""
+    before = _as_series(before)
+    after = _as_series(after)
+    both_na = before.isna().to_numpy() & after.isna().to_numpy()
+    return (before.to_numpy(dtype=object) != after.to_numpy(dtype=object)) & ~both_na
+
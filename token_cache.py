@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+전처리/토큰화 결과 메모리 맵 캐시
+=================================
+노트북 시작마다 train/dev/test.csv 읽기 → clean_text → 토큰화를 반복하던 것을 1회로
+
+- 코퍼스 1개 = 디렉터리 1개, 컬럼마다 평평한 버퍼({컬럼}.data.npy) + 오프셋({컬럼}.offsets.npy)
+  · 토큰 컬럼: int32 토큰 ID 연속 배열 → 행 i = data[offsets[i]:offsets[i+1]] (복사 없는 뷰)
+  · 텍스트 컬럼: UTF-8 바이트 연속 배열 (정제한 dialogue/summary, fname)
+- np.load(mmap_mode='r')로 열기 → 재시작/DataLoader 워커가 같은 페이지 캐시를 공유
+  (피클 시 경로만 넘기고 워커에서 다시 매핑 → spawn 워커도 배열을 복사하지 않음)
+- 키: 토크나이저 해시 + special_tokens + 최대 길이들 + 레시피 이름 + 원본 CSV 내용 해시
+  → 하나라도 바뀌면 새 디렉터리에 다시 생성
+- 쓰기는 임시 디렉터리에 한 뒤 교체 (중단돼도 깨진 캐시가 남지 않음)
+
+사용:
+    cache = TokenCache(tokenizer_v2, CONF_V2['tokenizer']['special_tokens'],
+                       {'encoder_max_len': 512, 'decoder_max_len': 150})
+    corpus = cache.get('kobart_v2', './data/train.csv', build)   # build(df) → {컬럼: 텍스트들 또는 토큰 리스트들}
+    corpus['input_ids'][0]      # np.ndarray (int32, 메모리 맵 뷰)
+    corpus.frame(['fname', 'dialogue', 'summary'])   # 정제된 텍스트 DataFrame
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from torch.utils.data import Dataset
+
+Column = Union[Sequence[str], Sequence[Sequence[int]]]
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """토크나이저 어휘/병합 규칙/추가 토큰의 해시"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(type(tokenizer).__name__.encode('utf-8'))
+    backend = getattr(tokenizer, 'backend_tokenizer', None)
+    if backend is not None:
+        digest.update(backend.to_str().encode('utf-8'))
+    else:
+        digest.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode('utf-8'))
+    digest.update(json.dumps(tokenizer.special_tokens_map, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(json.dumps(sorted(tokenizer.get_added_vocab().items())).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FlatColumn:
+    """
+    평평한 버퍼 + 오프셋으로 저장된 가변 길이 컬럼 (읽기 전용 메모리 맵)
+
+    Args:
+        prefix: 파일 경로 접두부 ({prefix}.data.npy, {prefix}.offsets.npy)
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.data = np.load(prefix + '.data.npy', mmap_mode='r')
+        self.offsets = np.load(prefix + '.offsets.npy', mmap_mode='r')
+        self.is_text = self.data.dtype == np.uint8
+
+    @staticmethod
+    def write(prefix: str, values: Column):
+        """텍스트(str) 또는 토큰 ID 시퀀스 리스트 저장"""
+        values = list(values)
+        if values and isinstance(values[0], str):
+            chunks = [np.frombuffer(v.encode('utf-8'), dtype=np.uint8) for v in values]
+            dtype = np.uint8
+        else:
+            chunks = [np.asarray(v, dtype=np.int32) for v in values]
+            dtype = np.int32
+        lengths = np.fromiter((len(c) for c in chunks), dtype=np.int64, count=len(chunks))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        data = np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+        np.save(prefix + '.data.npy', data.astype(dtype, copy=False))
+        np.save(prefix + '.offsets.npy', offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int):
+        row = self.data[self.offsets[i]:self.offsets[i + 1]]
+        return row.tobytes().decode('utf-8') if self.is_text else row
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def tolist(self) -> List:
+        return list(self)
+
+    # 피클(DataLoader 워커 전달)은 경로만 → 워커에서 다시 메모리 맵
+    def __getstate__(self):
+        return {'prefix': self.prefix}
+
+    def __setstate__(self, state):
+        self.__init__(state['prefix'])
+
+
+class TokenCorpus:
+    """캐시 디렉터리 1개 = {컬럼 이름: FlatColumn}"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.columns = {name: FlatColumn(os.path.join(path, name)) for name in self.meta['columns']}
+
+    def __len__(self) -> int:
+        return self.meta['rows']
+
+    def __getitem__(self, name: str) -> FlatColumn:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def frame(self, names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """텍스트 컬럼들 → DataFrame (원본 CSV 대신 사용)"""
+        names = names or [n for n, c in self.columns.items() if c.is_text]
+        return pd.DataFrame({name: self.columns[name].tolist() for name in names})
+
+
+class TokenCache:
+    """
+    (토크나이저, special_tokens, 최대 길이) 단위 코퍼스 캐시
+
+    Args:
+        tokenizer: 토큰화에 쓰는 토크나이저 (special token 추가 후)
+        special_tokens: 추가한 special token 목록 (config.yaml tokenizer.special_tokens)
+        max_lengths: 토큰화 최대 길이들 (예: {'encoder_max_len': 512, 'decoder_max_len': 150})
+        root: 캐시 루트 디렉터리
+    """
+
+    def __init__(self, tokenizer, special_tokens: Sequence[str], max_lengths: Mapping[str, int],
+                 root: str = './cache/tokens'):
+        self.tokenizer = tokenizer
+        self.special_tokens = list(special_tokens)
+        self.max_lengths = dict(max_lengths)
+        self.root = root
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = tokenizer_fingerprint(self.tokenizer)
+        return self._fingerprint
+
+    def key(self, recipe: str, source_path: str) -> str:
+        parts = {
+            'tokenizer': self.fingerprint,
+            'special_tokens': self.special_tokens,
+            'max_lengths': self.max_lengths,
+            'recipe': recipe,
+            'source': _file_digest(source_path),
+        }
+        return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, recipe: str, source_path: str, build: Callable[[pd.DataFrame], Mapping[str, Column]]) -> TokenCorpus:
+        """
+        캐시된 코퍼스 (없으면 build(원본 DataFrame)로 생성 후 저장)
+
+        recipe: 전처리/토큰화 방식 이름 — clean_text나 프롬프트를 바꾸면 이름도 바꿀 것
+        """
+        name = f"{os.path.splitext(os.path.basename(source_path))[0]}-{recipe}-{self.key(recipe, source_path)}"
+        path = os.path.join(self.root, name)
+        if os.path.exists(os.path.join(path, 'meta.json')):
+            return TokenCorpus(path)
+
+        columns = build(pd.read_csv(source_path))
+        rows = {len(values) for values in columns.values()}
+        if len(rows) != 1:
+            raise ValueError(f'컬럼 길이 불일치: { {n: len(v) for n, v in columns.items()} }')
+
+        tmp_path = f'{path}.tmp{os.getpid()}'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for column, values in columns.items():
+            FlatColumn.write(os.path.join(tmp_path, column), values)
+        with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'columns': list(columns), 'rows': rows.pop(), 'recipe': recipe,
+                       'source': source_path, 'special_tokens': self.special_tokens,
+                       'max_lengths': self.max_lengths}, f, ensure_ascii=False, indent=1)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:  # 다른 프로세스가 먼저 생성
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return TokenCorpus(path)
+
+
+def seq2seq_columns(tokenizer, dialogues: Sequence[str], summaries: Optional[Sequence[str]] = None,
+                    encoder_max_len: int = 512, decoder_max_len: int = 150) -> Dict[str, List[List[int]]]:
+    """KoBART 입력 토큰 컬럼 (input_ids, decoder_input_ids = bos + 요약, labels = 요약 + eos)"""
+    columns = {'input_ids': tokenizer(list(dialogues), truncation=True, max_length=encoder_max_len)['input_ids']}
+    if summaries is not None:
+        summaries = [str(s) for s in summaries]
+        columns['decoder_input_ids'] = tokenizer([tokenizer.bos_token + s for s in summaries],
+                                                 truncation=True, max_length=decoder_max_len)['input_ids']
+        columns['labels'] = tokenizer([s + tokenizer.eos_token for s in summaries],
+                                      truncation=True, max_length=decoder_max_len)['input_ids']
+    return columns
+
+
+def sft_columns(tokenizer, texts: Sequence[str], max_length: int) -> Dict[str, List[List[int]]]:
+    """SFT 학습 텍스트 → input_ids (SFTTrainer 토큰화와 같이 eos를 붙인 뒤 max_length로 자름)"""
+    input_ids = []
+    for ids in tokenizer(list(texts))['input_ids']:
+        if not ids or ids[-1] != tokenizer.eos_token_id:
+            ids = ids + [tokenizer.eos_token_id]
+        input_ids.append(ids[:max_length])
+    return {'input_ids': input_ids}
+
+
+class TokenIdsDataset(Dataset):
+    """
+    토큰 컬럼 → {'input_ids': [...]} 데이터셋 (SFTTrainer에 토큰화 없이 전달)
+
+    행은 메모리 맵에서 바로 읽고, collator용으로 그 행만 리스트로 변환
+    """
+
+    def __init__(self, column: FlatColumn):
+        self.column = column
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def __getitem__(self, i: int) -> Dict:
+        return {'input_ids': self.column[i].tolist()}
@@ -7,9 +7,12 @@ v4 Salvageability Analysis
 
 import pandas as pd
 import numpy as np
-from evaluate import load
-import re
-from collections import Counter
+
+from dialogue_store import DialogueStore
+from fast_rouge import FastRouge
+from feature_store import FeatureStore, top_duplicate_bigrams
+from postprocess_rules import load_profiles
+from summary_stats import changed_mask, word_counts
 
 print("\n" + "="*100)
 print("🎯 v4 SALVAGEABILITY ANALYSIS")
@@ -18,17 +21,24 @@ print("\n질문: 제출해서 51.7703점 받았던 submit_solar_v4.csv 파일은
 print("답변: ✅ 가능성이 있습니다! 하지만 기대를 크게 하지는 마세요.\n")
 
 # 파일 로드
-v4 = pd.read_csv('./prediction/submit_solar_v4.csv')
-v3_micro = pd.read_csv('./prediction/submit_solar_v3_microtuned.csv')
-dev_df = pd.read_csv('./data/dev.csv')
+v4_path = './prediction/submit_solar_v4.csv'
+v3_micro_path = './prediction/submit_solar_v3_microtuned.csv'
+v4 = pd.read_csv(v4_path)
+v3_micro = pd.read_csv(v3_micro_path)
+
+# 샘플별 특징 (길이, 문장 수, 중복 바이그램, 수식어, 불완전 종결): (파일, 내용 해시) 단위 캐시
+features = FeatureStore()
+v4_features = features.load(v4_path)
+v3_features = features.load(v3_micro_path)
+dev_df = DialogueStore().frame('dev')
 
 print("="*100)
 print("📊 SECTION 1: v4 현재 성능 분석")
 print("="*100)
 
 # 기본 통계
-v4_lengths = v4['summary'].apply(lambda x: len(str(x).split()))
-v3_lengths = v3_micro['summary'].apply(lambda x: len(str(x).split()))
+v4_lengths = v4_features['words']
+v3_lengths = v3_features['words']
 
 print(f"\n📈 길이 통계:")
 print(f"  v4 (현재 리더보드: 51.7703점)")
@@ -50,8 +60,8 @@ print(f"  👉 해석: v4는 최적화 여지가 있음!")
 
 # 문장 구조 분석
 print(f"\n📝 문장 구조 분석:")
-v4_sentences = v4['summary'].apply(lambda x: len(re.split(r'[.!?]', str(x).strip())))
-v3_sentences = v3_micro['summary'].apply(lambda x: len(re.split(r'[.!?]', str(x).strip())))
+v4_sentences = v4_features['sentences']
+v3_sentences = v3_features['sentences']
 
 print(f"  v4 평균 문장 수: {v4_sentences.mean():.1f}")
 print(f"  v3 평균 문장 수: {v3_sentences.mean():.1f}")
@@ -111,19 +121,7 @@ print("🎯 SECTION 4: 최적화 기회 분석")
 print("="*100)
 
 # 중복 바이그램
-def count_bigrams(text):
-    words = text.split()
-    bigrams = [' '.join(words[i:i+2]) for i in range(len(words)-1)]
-    return Counter(bigrams)
-
-v4_bigrams = v4['summary'].apply(count_bigrams)
-dup_bigrams = []
-for bigram_dict in v4_bigrams:
-    for bigram, count in bigram_dict.items():
-        if count > 1:
-            dup_bigrams.append((bigram, count))
-
-dup_bigrams_sorted = sorted(dup_bigrams, key=lambda x: x[1], reverse=True)[:10]
+dup_bigrams_sorted = top_duplicate_bigrams(v4_features, 10)
 
 print(f"\n1️⃣ 중복 바이그램 (ROUGE-2 영향):")
 for bigram, count in dup_bigrams_sorted[:5]:
@@ -137,21 +135,14 @@ print(f"   25단어 이상: {long_count}개 ({100*long_count/len(v4):.1f}%)")
 print(f"   👉 개선: 긴 문장 단축 → 정보 밀도 향상")
 
 # 불완전한 문장
-incomplete = 0
-for text in v4['summary']:
-    if not text.strip().endswith(('.', '!', '?', '다', '요', '습니다', '니다')):
-        incomplete += 1
+incomplete = int(v4_features['incomplete'].sum())
 
 print(f"\n3️⃣ 불완전한 문장:")
 print(f"   끝이 불명확한 문장: {incomplete}개")
 print(f"   👉 개선: 완전성 검증 → 품질 보장")
 
-# 불필요한 수식어
-modifiers = ['매우', '정말', '아주', '꽤', '많이']
-modifier_count = 0
-for text in v4['summary']:
-    for mod in modifiers:
-        modifier_count += text.count(mod)
+# 불필요한 수식어 ('매우', '정말', '아주', '꽤', '많이')
+modifier_count = int(v4_features['modifiers'].sum())
 
 print(f"\n4️⃣ 불필요한 수식어:")
 print(f"   수식어 총 {modifier_count}회 사용")
@@ -162,47 +153,25 @@ print("\n" + "="*100)
 print("🛠️ SECTION 5: 미세조정 전략 구현")
 print("="*100)
 
-def micro_tune_v4_conservative(summary: str) -> str:
-    """v3 성공 전략: 보수적 미세조정"""
-    summary = re.sub(r'\s+', ' ', summary).strip()
-    summary = re.sub(r'에게\s+에게', '에게', summary)
-    summary = re.sub(r'에서\s+에서', '에서', summary)
-    summary = re.sub(r'합니다\s+합니다', '합니다', summary)
-    summary = re.sub(r'한다\s+한다', '한다', summary)
-    summary = re.sub(r'하고\s+있습니다', '합니다', summary)
-    summary = re.sub(r'\s+', ' ', summary).strip()
-    return summary
-
-def micro_tune_v4_moderate(summary: str) -> str:
-    """중간 강도 미세조정"""
-    summary = micro_tune_v4_conservative(summary)
-    summary = re.sub(r'매우\s+많이', '많이', summary)
-    summary = re.sub(r'정말\s+많이', '많이', summary)
-    summary = re.sub(r'라고\s+말합니다', '라고 합니다', summary)
-    summary = re.sub(r'이라고\s+말합니다', '이라고 합니다', summary)
-    return summary
-
-def micro_tune_v4_aggressive(summary: str) -> str:
-    """최대 최적화 (3문장 제한 - v3 성공 기법)"""
-    summary = micro_tune_v4_moderate(summary)
-    sentences = re.split(r'(?<=[.!?])\s+', summary.strip())
-    summary = ' '.join(sentences[:3])
-    if summary and not summary[-1] in '.!?다요습니다니다':
-        sentences = re.split(r'(?<=[.!?])\s+', summary)
-        summary = ' '.join(sentences[:-1]) if len(sentences) > 1 else sentences[0]
-    return summary.strip()
+# 3가지 미세조정 전략 (config.yaml postprocess.profiles)
+# - conservative: v3 성공 전략 (보수적 미세조정)
+# - moderate: conservative + 중복 수식어/동사 형태 정리
+# - aggressive: moderate + 3문장 제한 (v3 성공 기법)
+# 공통 접두사(conservative → moderate)는 한 번만 계산
+profiles = load_profiles()
 
 print(f"\n🔄 3가지 미세조정 전략 적용 중...\n")
 
-tuned_conservative = v4['summary'].apply(micro_tune_v4_conservative).tolist()
-tuned_moderate = v4['summary'].apply(micro_tune_v4_moderate).tolist()
-tuned_aggressive = v4['summary'].apply(micro_tune_v4_aggressive).tolist()
+tuned = profiles.transform(v4['summary'], ['conservative', 'moderate', 'aggressive'])
+tuned_conservative = tuned['conservative']
+tuned_moderate = tuned['moderate']
+tuned_aggressive = tuned['aggressive']
 
 # 통계 비교
 v4_mean = v4_lengths.mean()
-cons_mean = sum(len(s.split()) for s in tuned_conservative) / len(tuned_conservative)
-mod_mean = sum(len(s.split()) for s in tuned_moderate) / len(tuned_moderate)
-agg_mean = sum(len(s.split()) for s in tuned_aggressive) / len(tuned_aggressive)
+cons_mean = word_counts(tuned_conservative).mean()
+mod_mean = word_counts(tuned_moderate).mean()
+agg_mean = word_counts(tuned_aggressive).mean()
 
 print(f"📊 버전별 길이 변화:\n")
 print(f"  [원본 v4]       평균: {v4_mean:5.1f} 단어")
@@ -212,9 +181,9 @@ print(f"  [aggressive]    평균: {agg_mean:5.1f} 단어 ({agg_mean - v4_mean:+.
 print(f"  [목표: v3]      평균: {v3_lengths.mean():5.1f} 단어")
 
 # 변화 케이스 카운트
-changed_cons = sum(1 for i in range(len(v4)) if v4.iloc[i]['summary'] != tuned_conservative[i])
-changed_mod = sum(1 for i in range(len(v4)) if v4.iloc[i]['summary'] != tuned_moderate[i])
-changed_agg = sum(1 for i in range(len(v4)) if v4.iloc[i]['summary'] != tuned_aggressive[i])
+changed_cons = int(changed_mask(v4['summary'], tuned_conservative).sum())
+changed_mod = int(changed_mask(v4['summary'], tuned_moderate).sum())
+changed_agg = int(changed_mask(v4['summary'], tuned_aggressive).sum())
 
 print(f"\n🔄 변화된 케이스 수:\n")
 print(f"  conservative: {changed_cons}개 ({100*changed_cons/len(v4):.1f}%)")
@@ -226,29 +195,31 @@ print("\n" + "="*100)
 print("📈 SECTION 6: Dev 셋 ROUGE 평가")
 print("="*100)
 
-rouge = load("rouge")
+rouge = FastRouge(dev_df['summary'])
 
-print(f"\n⏳ Dev 셋 평가 중 (이 작업은 1-2분 소요)...\n")
+print(f"\n⏳ Dev 셋 평가 중...\n")
 
-versions_to_test = {
-    'original_v4': v4['summary'].tolist(),
-    'v3_microtuned': v3_micro['summary'].tolist(),
-    'conservative': tuned_conservative,
-    'moderate': tuned_moderate,
-    'aggressive': tuned_aggressive,
+# 원본 v4를 기준 실행으로 한 번 채점하고, 미세조정 버전은 바뀐 행만 재채점
+baseline_run = rouge.score_run(v4['summary'])
+runs = {
+    'original_v4': baseline_run,
+    'v3_microtuned': rouge.score_run(v3_micro['summary']),
+    'conservative': rouge.rescore(baseline_run, tuned_conservative),
+    'moderate': rouge.rescore(baseline_run, tuned_moderate),
+    'aggressive': rouge.rescore(baseline_run, tuned_aggressive),
 }
 
 results = {}
-for name, summaries in versions_to_test.items():
-    print(f"  평가 중: {name:20s}", end='', flush=True)
-    scores = rouge.compute(predictions=summaries, references=dev_df['summary'].tolist())
+for name, run in runs.items():
+    scores = run.corpus
     results[name] = {
         'R1': scores['rouge1'] * 100,
         'R2': scores['rouge2'] * 100,
         'RL': scores['rougeL'] * 100,
         'Combined': (scores['rouge1'] + scores['rouge2'] + scores['rougeL']) / 3 * 100
     }
-    print(" ✅")
+    rescored = f" (재채점 {len(run.changed)}행)" if run.changed is not None else ""
+    print(f"  평가 완료: {name:20s} ✅{rescored}")
 
 # 결과 정리 및 정렬
 print(f"\n" + "="*80)